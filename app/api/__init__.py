@@ -1,7 +1,22 @@
 """API routes module."""
 
-from .status import router as status_router
-from .actions import router as actions_router
-from .setup import router as setup_router
+import importlib
+
+# Routers are imported on first access (PEP 562) so importing app.api does
+# not pull in the service layer and the Google API client until needed.
+_ROUTERS = {
+    "actions_router": "actions",
+    "setup_router": "setup",
+    "status_router": "status",
+}
 
 __all__ = ["actions_router", "setup_router", "status_router"]
+
+
+def __getattr__(name: str):
+    if name in _ROUTERS:
+        module = importlib.import_module(f".{_ROUTERS[name]}", __name__)
+        router = module.router
+        globals()[name] = router
+        return router
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -5,8 +5,13 @@ POST endpoints for triggering operations.
 """
 
 import logging
-from functools import partial
-from fastapi import APIRouter, BackgroundTasks, HTTPException, status
+from typing import Any, Callable, Coroutine
+
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import Response
+from fastapi.routing import APIRoute
+from starlette.status import HTTP_500_INTERNAL_SERVER_ERROR
 
 from app.models import (
     ScanRequest,
@@ -21,6 +26,7 @@ from app.models import (
     RemoveLabelRequest,
     ArchiveRequest,
     MarkImportantRequest,
+    NonBlankStr,
 )
 from app.services import (
     scan_emails,
@@ -40,89 +46,104 @@ from app.services import (
     mark_important_background,
 )
 
-from app.core.exceptions import (
-    GmailCleanerError,
-    AuthError,
-    NetworkError,
-    GmailApiError,
-    QuotaExceededError,
-    ResourceNotFoundError,
-    ValidationError,
-)
+from app.core.exceptions import GmailCleanerError
+from app.core.tasks import run_in_io_pool
 
-router = APIRouter(prefix="/api", tags=["Actions"])
 logger = logging.getLogger(__name__)
 
-
-def _handle_api_error(e: Exception, default_message: str):
-    """Helper to map application exceptions to HTTP exceptions."""
-    if isinstance(e, AuthError):
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
-    elif isinstance(e, ResourceNotFoundError):
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
-    elif isinstance(e, QuotaExceededError):
-        raise HTTPException(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e)
-        )
-    elif isinstance(e, ValidationError):
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
-    elif isinstance(e, (NetworkError, GmailApiError)):
-        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(e))
-    elif isinstance(e, GmailCleanerError):
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
-        )
-
-    logger.exception(default_message)
-    raise HTTPException(
-        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-        detail=default_message,
-    ) from e
+# Detail returned when an endpoint fails with an unexpected (non-application)
+# error. Application errors are mapped by the app-level handler in errors.py.
+# Keyed by endpoint function name; tests check every route has an entry.
+_FAILURE_DETAILS = {
+    "api_scan": "Failed to start scan",
+    "api_sign_in": "Failed to start sign-in",
+    "api_sign_out": "Failed to sign out",
+    "api_unsubscribe": "Failed to unsubscribe",
+    "api_mark_read": "Failed to start marking emails as read",
+    "api_delete_scan": "Failed to start delete scan",
+    "api_delete_emails": "Failed to delete emails",
+    "api_delete_emails_bulk": "Failed to start bulk delete",
+    "api_download_emails": "Failed to start download",
+    "api_create_label": "Failed to create label",
+    "api_delete_label": "Failed to delete label",
+    "api_apply_label": "Failed to start applying label",
+    "api_remove_label": "Failed to start removing label",
+    "api_archive": "Failed to start archiving",
+    "api_mark_important": "Failed to start marking emails as important",
+}
+
+
+class _ActionRoute(APIRoute):
+    """Route that converts unexpected endpoint errors into a logged 500."""
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+        failure_detail = _FAILURE_DETAILS.get(self.name, "Request failed")
+
+        async def route_handler(request: Request) -> Response:
+            try:
+                return await handler(request)
+            except (HTTPException, RequestValidationError, GmailCleanerError):
+                raise
+            except Exception as e:
+                logger.exception(failure_detail)
+                raise HTTPException(
+                    status_code=HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=failure_detail,
+                ) from e
+
+        return route_handler
+
+
+router = APIRouter(prefix="/api", tags=["Actions"], route_class=_ActionRoute)
+
+# Acknowledgement bodies for background-task endpoints, serialized once.
+# A fresh Response is still built per request: FastAPI attaches the request's
+# background tasks to the returned response, so instances cannot be shared.
+_STARTED = b'{"status":"started"}'
+_SIGNING_IN = b'{"status":"signing_in"}'
+
+
+def _ack(body: bytes) -> Response:
+    """Wrap a pre-serialized JSON body, skipping the response encoder."""
+    return Response(content=body, media_type="application/json")
 
 
 @router.post("/scan")
 async def api_scan(request: ScanRequest, background_tasks: BackgroundTasks):
     """Start email scan for unsubscribe links."""
-    filters_dict = (
-        request.filters.model_dump(exclude_none=True) if request.filters else None
-    )
-    background_tasks.add_task(scan_emails, request.limit, filters_dict)
-    return {"status": "started"}
+    filters_dict = request.filters.to_query_dict() if request.filters else None
+    background_tasks.add_task(run_in_io_pool, scan_emails, request.limit, filters_dict)
+    return _ack(_STARTED)
 
 
 @router.post("/sign-in")
 async def api_sign_in(background_tasks: BackgroundTasks):
     """Trigger OAuth sign-in flow."""
-    background_tasks.add_task(get_gmail_service)
-    return {"status": "signing_in"}
+    background_tasks.add_task(run_in_io_pool, get_gmail_service)
+    return _ack(_SIGNING_IN)
 
 
 @router.post("/sign-out")
-async def api_sign_out():
+async def api_sign_out() -> dict:
     """Sign out and clear credentials."""
-    try:
-        return sign_out()
-    except Exception as e:
-        _handle_api_error(e, "Failed to sign out")
+    return sign_out()
 
 
 @router.post("/unsubscribe")
-async def api_unsubscribe(request: UnsubscribeRequest):
+async def api_unsubscribe(request: UnsubscribeRequest) -> dict:
     """Unsubscribe from a single sender."""
-    try:
-        return unsubscribe_single(request.domain, request.link)
-    except Exception as e:
-        _handle_api_error(e, "Failed to unsubscribe")
+    return unsubscribe_single(request.domain, request.link)
 
 
 @router.post("/mark-read")
 async def api_mark_read(request: MarkReadRequest, background_tasks: BackgroundTasks):
     """Mark emails as read."""
-    filters_dict = (
-        request.filters.model_dump(exclude_none=True) if request.filters else None
+    filters_dict = request.filters.to_query_dict() if request.filters else None
+    background_tasks.add_task(
+        run_in_io_pool, mark_emails_as_read, request.count, filters_dict
     )
-    background_tasks.add_task(mark_emails_as_read, request.count, filters_dict)
-    return {"status": "started"}
+    return _ack(_STARTED)
 
 
 @router.post("/delete-scan")
@@ -130,25 +151,17 @@ async def api_delete_scan(
     request: DeleteScanRequest, background_tasks: BackgroundTasks
 ):
     """Scan senders for bulk delete."""
-    filters_dict = (
-        request.filters.model_dump(exclude_none=True) if request.filters else None
+    filters_dict = request.filters.to_query_dict() if request.filters else None
+    background_tasks.add_task(
+        run_in_io_pool, scan_senders_for_delete, request.limit, filters_dict
     )
-    background_tasks.add_task(scan_senders_for_delete, request.limit, filters_dict)
-    return {"status": "started"}
+    return _ack(_STARTED)
 
 
 @router.post("/delete-emails")
-async def api_delete_emails(request: DeleteEmailsRequest):
+async def api_delete_emails(request: DeleteEmailsRequest) -> dict:
     """Delete emails from a specific sender."""
-    if not request.sender or not request.sender.strip():
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Sender email is required",
-        )
-    try:
-        return delete_emails_by_sender(request.sender)
-    except Exception as e:
-        _handle_api_error(e, "Failed to delete emails")
+    return delete_emails_by_sender(request.sender)
 
 
 @router.post("/delete-emails-bulk")
@@ -156,8 +169,10 @@ async def api_delete_emails_bulk(
     request: DeleteBulkRequest, background_tasks: BackgroundTasks
 ):
     """Delete emails from multiple senders (background task with progress)."""
-    background_tasks.add_task(delete_emails_bulk_background, request.senders)
-    return {"status": "started"}
+    background_tasks.add_task(
+        run_in_io_pool, delete_emails_bulk_background, request.senders
+    )
+    return _ack(_STARTED)
 
 
 @router.post("/download-emails")
@@ -166,34 +181,25 @@ async def api_download_emails(
 ):
     """Start downloading email metadata for selected senders."""
     # Note: Empty list is allowed - service function will handle it gracefully
-    background_tasks.add_task(download_emails_background, request.senders)
-    return {"status": "started"}
+    background_tasks.add_task(
+        run_in_io_pool, download_emails_background, request.senders
+    )
+    return _ack(_STARTED)
 
 
 # ----- Label Management Endpoints -----
 
 
 @router.post("/labels")
-async def api_create_label(request: CreateLabelRequest):
+async def api_create_label(request: CreateLabelRequest) -> dict:
     """Create a new Gmail label."""
-    try:
-        return create_label(request.name)
-    except Exception as e:
-        _handle_api_error(e, "Failed to create label")
+    return create_label(request.name)
 
 
 @router.delete("/labels/{label_id}")
-async def api_delete_label(label_id: str):
+async def api_delete_label(label_id: NonBlankStr) -> dict:
     """Delete a Gmail label."""
-    if not label_id or not label_id.strip():
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Label ID is required",
-        )
-    try:
-        return delete_label(label_id)
-    except Exception as e:
-        _handle_api_error(e, "Failed to delete label")
+    return delete_label(label_id)
 
 
 @router.post("/apply-label")
@@ -201,20 +207,13 @@ async def api_apply_label(
     request: ApplyLabelRequest, background_tasks: BackgroundTasks
 ):
     """Apply a label to emails from selected senders."""
-    if not request.label_id or not request.label_id.strip():
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Label ID is required",
-        )
-    if not request.senders:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="At least one sender is required",
-        )
     background_tasks.add_task(
-        apply_label_to_senders_background, request.label_id, request.senders
+        run_in_io_pool,
+        apply_label_to_senders_background,
+        request.label_id,
+        request.senders,
     )
-    return {"status": "started"}
+    return _ack(_STARTED)
 
 
 @router.post("/remove-label")
@@ -222,32 +221,22 @@ async def api_remove_label(
     request: RemoveLabelRequest, background_tasks: BackgroundTasks
 ):
     """Remove a label from emails from selected senders."""
-    if not request.label_id or not request.label_id.strip():
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Label ID is required",
-        )
-    if not request.senders:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="At least one sender is required",
-        )
     background_tasks.add_task(
-        remove_label_from_senders_background, request.label_id, request.senders
+        run_in_io_pool,
+        remove_label_from_senders_background,
+        request.label_id,
+        request.senders,
     )
-    return {"status": "started"}
+    return _ack(_STARTED)
 
 
 @router.post("/archive")
 async def api_archive(request: ArchiveRequest, background_tasks: BackgroundTasks):
     """Archive emails from selected senders (remove from inbox)."""
-    if not request.senders:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="At least one sender is required",
-        )
-    background_tasks.add_task(archive_emails_background, request.senders)
-    return {"status": "started"}
+    background_tasks.add_task(
+        run_in_io_pool, archive_emails_background, request.senders
+    )
+    return _ack(_STARTED)
 
 
 @router.post("/mark-important")
@@ -255,12 +244,10 @@ async def api_mark_important(
     request: MarkImportantRequest, background_tasks: BackgroundTasks
 ):
     """Mark/unmark emails from selected senders as important."""
-    if not request.senders:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="At least one sender is required",
-        )
     background_tasks.add_task(
-        partial(mark_important_background, request.senders, important=request.important)
+        run_in_io_pool,
+        mark_important_background,
+        request.senders,
+        important=request.important,
     )
-    return {"status": "started"}
+    return _ack(_STARTED)
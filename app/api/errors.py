@@ -0,0 +1,54 @@
+"""
+API Error Handling
+------------------
+Maps application exceptions to HTTP responses.
+"""
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from starlette.status import (
+    HTTP_400_BAD_REQUEST,
+    HTTP_401_UNAUTHORIZED,
+    HTTP_404_NOT_FOUND,
+    HTTP_429_TOO_MANY_REQUESTS,
+    HTTP_500_INTERNAL_SERVER_ERROR,
+    HTTP_502_BAD_GATEWAY,
+)
+
+from app.core.exceptions import (
+    GmailCleanerError,
+    AuthError,
+    NetworkError,
+    GmailApiError,
+    QuotaExceededError,
+    ResourceNotFoundError,
+    ValidationError,
+)
+
+_ERROR_MAP = {
+    AuthError: HTTP_401_UNAUTHORIZED,
+    ResourceNotFoundError: HTTP_404_NOT_FOUND,
+    QuotaExceededError: HTTP_429_TOO_MANY_REQUESTS,
+    ValidationError: HTTP_400_BAD_REQUEST,
+    NetworkError: HTTP_502_BAD_GATEWAY,
+    GmailApiError: HTTP_502_BAD_GATEWAY,
+    GmailCleanerError: HTTP_500_INTERNAL_SERVER_ERROR,
+}
+
+
+def status_code_for(exc: GmailCleanerError) -> int:
+    """Resolve the HTTP status code for an application exception."""
+    # Walk the MRO so subclasses resolve to their most specific mapping
+    # (e.g. QuotaExceededError before its GmailApiError base).
+    for cls in type(exc).__mro__:
+        status_code = _ERROR_MAP.get(cls)
+        if status_code is not None:
+            return status_code
+    return HTTP_500_INTERNAL_SERVER_ERROR
+
+
+async def gmail_cleaner_error_handler(
+    request: Request, exc: GmailCleanerError
+) -> JSONResponse:
+    """App-level handler turning application exceptions into JSON errors."""
+    return JSONResponse(status_code=status_code_for(exc), content={"detail": str(exc)})
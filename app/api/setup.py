@@ -4,56 +4,88 @@ Setup API Routes
 Endpoints for initial application setup (uploading credentials).
 """
 
-import json
+import asyncio
 import logging
 import os
+import shutil
+import tempfile
+from typing import BinaryIO
 
-from fastapi import APIRouter, File, HTTPException, UploadFile, status
+from fastapi import APIRouter, File, HTTPException, UploadFile
+from pydantic import ValidationError
+from starlette.status import (
+    HTTP_400_BAD_REQUEST,
+    HTTP_409_CONFLICT,
+    HTTP_500_INTERNAL_SERVER_ERROR,
+)
 
 from app.core import settings
+from app.models import OAuthClientConfig
 
 router = APIRouter(prefix="/api", tags=["Setup"])
 logger = logging.getLogger(__name__)
 
+_COPY_CHUNK_SIZE = 64 * 1024
+
+
+def _store_credentials(upload: BinaryIO, destination: str) -> None:
+    """Validate an uploaded client config and move it into place atomically.
+
+    Blocking file I/O; runs in a worker thread. Raises HTTPException(400)
+    for files that are not Google OAuth client configurations.
+    """
+    target_dir = os.path.dirname(os.path.abspath(destination))
+    os.makedirs(target_dir, exist_ok=True)
+
+    tmp_path = None
+    try:
+        # Stream the upload next to its destination so the final rename is atomic
+        with tempfile.NamedTemporaryFile(
+            dir=target_dir, suffix=".tmp", delete=False
+        ) as tmp:
+            tmp_path = tmp.name
+            shutil.copyfileobj(upload, tmp, _COPY_CHUNK_SIZE)
+
+        # Parse and validate in one pass (must be Google OAuth credentials)
+        with open(tmp_path, "rb") as f:
+            raw = f.read()
+        try:
+            OAuthClientConfig.model_validate_json(raw)
+        except ValidationError as e:
+            if e.errors()[0]["type"] == "json_invalid":
+                detail = "Invalid JSON file"
+            else:
+                detail = "Invalid credentials file. Must contain 'installed' or 'web' client configuration."
+            raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail=detail)
+
+        os.replace(tmp_path, destination)
+        tmp_path = None
+    finally:
+        if tmp_path is not None:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
 
 @router.post("/setup")
-async def setup_credentials(file: UploadFile = File(...)):
+async def setup_credentials(file: UploadFile = File(...)) -> dict:
     """Upload credentials.json file."""
-    # Check if credentials already exist
+    # Check if credentials already exist. This is one stat per upload and is
+    # deliberately not cached: the file can be removed by hand (as the 409
+    # below instructs), which an in-process flag would not observe.
     if os.path.exists(settings.credentials_file):
         raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
+            status_code=HTTP_409_CONFLICT,
             detail="Credentials file already exists. Please delete it manually to upload a new one.",
         )
 
     try:
-        content = await file.read()
-
-        # Validate JSON structure
-        try:
-            data = json.loads(content)
-        except json.JSONDecodeError:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid JSON file",
-            )
-
-        # Validate content (must be Google OAuth credentials)
-        if "installed" not in data and "web" not in data:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid credentials file. Must contain 'installed' or 'web' client configuration.",
-            )
-
-        # Ensure directory exists
-        os.makedirs(
-            os.path.dirname(os.path.abspath(settings.credentials_file)), exist_ok=True
+        # Keep disk I/O off the event loop
+        await asyncio.to_thread(
+            _store_credentials, file.file, settings.credentials_file
         )
 
-        # Save to settings.credentials_file
-        with open(settings.credentials_file, "wb") as f:
-            f.write(content)
-
         logger.info(f"Credentials uploaded successfully to {settings.credentials_file}")
         return {
             "message": "Credentials uploaded successfully",
@@ -64,6 +96,6 @@ async def setup_credentials(file: UploadFile = File(...)):
     except Exception as e:
         logger.exception("Error uploading credentials")
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            status_code=HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to upload credentials. Please check server logs.",
         ) from e
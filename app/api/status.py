@@ -7,9 +7,11 @@ GET endpoints for checking status of various operations.
 import logging
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, status
 from fastapi.responses import Response
 
+from app.core import state
+
 from app.services import (
     get_scan_status,
     get_scan_results,
@@ -31,10 +33,38 @@ from app.services import (
 router = APIRouter(prefix="/api", tags=["Status"])
 logger = logging.getLogger(__name__)
 
+# Longest a status request may be held open waiting for a change
+_MAX_STATUS_WAIT = 25.0
+
+_STATUS_VERSION_HEADER = "X-Status-Version"
+
+
+async def _wait_for_status(
+    response: Response, name: str, since: int | None, wait: float
+) -> None:
+    """Long-poll support for status endpoints.
+
+    Clients echo back the X-Status-Version header from their previous
+    response as `since`; the request is then held until the status stored in
+    state attribute `name` changes (or `wait` seconds pass) instead of
+    returning an unchanged snapshot.
+    """
+    version = state.status_version(name)
+    if since is not None and wait > 0:
+        version = await state.wait_for_status_change(name, since, wait)
+    # Read before the status itself, so a change in between only makes the
+    # client's next poll return immediately
+    response.headers[_STATUS_VERSION_HEADER] = str(version)
+
 
 @router.get("/status")
-async def api_status():
-    """Get email scan status."""
+async def api_status(
+    response: Response,
+    since: int | None = None,
+    wait: float = Query(default=0, ge=0, le=_MAX_STATUS_WAIT),
+) -> dict:
+    """Get email scan status, optionally waiting for a change."""
+    await _wait_for_status(response, "scan_status", since, wait)
     try:
         return get_scan_status()
     except Exception as e:
@@ -46,7 +76,7 @@ async def api_status():
 
 
 @router.get("/results")
-async def api_results():
+async def api_results() -> list:
     """Get email scan results."""
     try:
         return get_scan_results()
@@ -59,7 +89,7 @@ async def api_results():
 
 
 @router.get("/auth-status")
-async def api_auth_status():
+async def api_auth_status() -> dict:
     """Get authentication status."""
     try:
         return check_login_status()
@@ -72,7 +102,7 @@ async def api_auth_status():
 
 
 @router.get("/web-auth-status")
-async def api_web_auth_status():
+async def api_web_auth_status() -> dict:
     """Get web auth status for Docker/headless mode."""
     try:
         return get_web_auth_status()
@@ -85,7 +115,7 @@ async def api_web_auth_status():
 
 
 @router.get("/unread-count")
-async def api_unread_count():
+async def api_unread_count() -> dict:
     """Get unread email count."""
     try:
         return get_unread_count()
@@ -98,8 +128,13 @@ async def api_unread_count():
 
 
 @router.get("/mark-read-status")
-async def api_mark_read_status():
-    """Get mark-as-read operation status."""
+async def api_mark_read_status(
+    response: Response,
+    since: int | None = None,
+    wait: float = Query(default=0, ge=0, le=_MAX_STATUS_WAIT),
+) -> dict:
+    """Get mark-as-read operation status, optionally waiting for a change."""
+    await _wait_for_status(response, "mark_read_status", since, wait)
     try:
         return get_mark_read_status()
     except Exception as e:
@@ -111,8 +146,13 @@ async def api_mark_read_status():
 
 
 @router.get("/delete-scan-status")
-async def api_delete_scan_status():
-    """Get delete scan status."""
+async def api_delete_scan_status(
+    response: Response,
+    since: int | None = None,
+    wait: float = Query(default=0, ge=0, le=_MAX_STATUS_WAIT),
+) -> dict:
+    """Get delete scan status, optionally waiting for a change."""
+    await _wait_for_status(response, "delete_scan_status", since, wait)
     try:
         return get_delete_scan_status()
     except Exception as e:
@@ -124,7 +164,7 @@ async def api_delete_scan_status():
 
 
 @router.get("/delete-scan-results")
-async def api_delete_scan_results():
+async def api_delete_scan_results() -> list:
     """Get delete scan results (senders grouped by count)."""
     try:
         return get_delete_scan_results()
@@ -137,8 +177,13 @@ async def api_delete_scan_results():
 
 
 @router.get("/download-status")
-async def api_download_status():
-    """Get download operation status."""
+async def api_download_status(
+    response: Response,
+    since: int | None = None,
+    wait: float = Query(default=0, ge=0, le=_MAX_STATUS_WAIT),
+) -> dict:
+    """Get download operation status, optionally waiting for a change."""
+    await _wait_for_status(response, "download_status", since, wait)
     try:
         return get_download_status()
     except Exception as e:
@@ -178,8 +223,13 @@ async def api_download_csv():
 
 
 @router.get("/delete-bulk-status")
-async def api_delete_bulk_status():
-    """Get bulk delete operation status."""
+async def api_delete_bulk_status(
+    response: Response,
+    since: int | None = None,
+    wait: float = Query(default=0, ge=0, le=_MAX_STATUS_WAIT),
+) -> dict:
+    """Get bulk delete operation status, optionally waiting for a change."""
+    await _wait_for_status(response, "delete_bulk_status", since, wait)
     try:
         return get_delete_bulk_status()
     except Exception as e:
@@ -194,7 +244,7 @@ async def api_delete_bulk_status():
 
 
 @router.get("/labels")
-async def api_get_labels():
+async def api_get_labels() -> dict:
     """Get all Gmail labels."""
     try:
         return get_labels()
@@ -207,8 +257,13 @@ async def api_get_labels():
 
 
 @router.get("/label-operation-status")
-async def api_label_operation_status():
-    """Get label operation status (apply/remove)."""
+async def api_label_operation_status(
+    response: Response,
+    since: int | None = None,
+    wait: float = Query(default=0, ge=0, le=_MAX_STATUS_WAIT),
+) -> dict:
+    """Get label apply/remove status, optionally waiting for a change."""
+    await _wait_for_status(response, "label_operation_status", since, wait)
     try:
         return get_label_operation_status()
     except Exception as e:
@@ -220,8 +275,13 @@ async def api_label_operation_status():
 
 
 @router.get("/archive-status")
-async def api_archive_status():
-    """Get archive operation status."""
+async def api_archive_status(
+    response: Response,
+    since: int | None = None,
+    wait: float = Query(default=0, ge=0, le=_MAX_STATUS_WAIT),
+) -> dict:
+    """Get archive operation status, optionally waiting for a change."""
+    await _wait_for_status(response, "archive_status", since, wait)
     try:
         return get_archive_status()
     except Exception as e:
@@ -233,8 +293,13 @@ async def api_archive_status():
 
 
 @router.get("/important-status")
-async def api_important_status():
-    """Get mark important operation status."""
+async def api_important_status(
+    response: Response,
+    since: int | None = None,
+    wait: float = Query(default=0, ge=0, le=_MAX_STATUS_WAIT),
+) -> dict:
+    """Get mark important operation status, optionally waiting for a change."""
+    await _wait_for_status(response, "important_status", since, wait)
     try:
         return get_important_status()
     except Exception as e:
@@ -1,4 +1,4 @@
 """Core module exports."""
 
-from .config import settings
+from .config import get_settings, settings
 from .state import state
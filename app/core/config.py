@@ -6,10 +6,44 @@ Central configuration and settings for the application.
 
 import logging
 import os
+from functools import lru_cache
+from typing import Literal
+
 import platformdirs
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# Accepted spellings of "true" for boolean environment variables
+_TRUTHY_VALUES = frozenset({"true", "1", "yes", "on"})
+
+# Docker images mount persistent storage here; checked once per process
+_IS_DOCKER = os.path.isdir("/app/data")
+
+
+def _ensure_data_dir(path: str) -> str:
+    """Create the data directory, falling back to the working directory."""
+    try:
+        os.makedirs(path, exist_ok=True)
+    except OSError:
+        logging.warning(
+            f"Could not create data directory '{path}'. Falling back to current working directory."
+        )
+        # Fallback to current directory if we can't create the data dir
+        # This might happen in some restricted environments
+        return os.getcwd()
+    return path
+
+
+@lru_cache(maxsize=1)
+def _default_data_dir() -> str:
+    """Resolve and create the default data directory once per process."""
+    if _IS_DOCKER:
+        return "/app/data"
+    # Local environment - use platform-specific user data dir
+    return _ensure_data_dir(
+        platformdirs.user_data_dir("gmail-cleaner", "Gururagavendra")
+    )
+
 
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
@@ -18,10 +52,17 @@ class Settings(BaseSettings):
     app_name: str = "Gmail Cleaner"
     app_version: str = "1.0.0"
     debug: bool = False
-    port: int = 8766
-    oauth_port: int = 8767
+    # Ports are validated here so bad values fail at startup, not mid-OAuth
+    port: int = Field(default=8766, ge=1, le=65535)
+    oauth_port: int = Field(default=8767, ge=1, le=65535)
+    cache_bust_strategy: Literal["git", "version"] = Field(
+        default="git",
+        description="How static asset URLs are versioned: 'git' fingerprints the checkout, 'version' uses app_version only",
+    )
     oauth_external_port: int | None = Field(
         default=None,
+        ge=1,
+        le=65535,
         description="External port for OAuth redirect URI (when different from oauth_port, e.g., Docker port mapping)",
     )
 
@@ -42,40 +83,25 @@ class Settings(BaseSettings):
         if isinstance(v, bool):
             return v
         if isinstance(v, str):
-            normalized = v.lower().strip()
-            return normalized in ("true", "1", "yes", "on")
+            # Already-normalized values skip the strip()/lower() copies
+            return v in _TRUTHY_VALUES or v.strip().lower() in _TRUTHY_VALUES
         return bool(v)
 
     credentials_file: str = "credentials.json"
     token_file: str = "token.json"
+    delete_scan_cache_file: str = "delete_scan_cache.json"
     data_dir: str = ""
 
     def __init__(self, **kwargs):
         """Initialize settings and auto-detect data directory for token persistence."""
         super().__init__(**kwargs)
 
-        # 1. Determine Data Directory
-        # Only set if not already provided via env var
-        if not self.data_dir:
-            # Check for Docker environment first
-            if os.path.exists("/app/data") and os.path.isdir("/app/data"):
-                self.data_dir = "/app/data"
-            else:
-                # Local environment - use platform-specific user data dir
-                self.data_dir = platformdirs.user_data_dir(
-                    "gmail-cleaner", "Gururagavendra"
-                )
-
-        # 2. Ensure directory exists
-        try:
-            os.makedirs(self.data_dir, exist_ok=True)
-        except OSError:
-            logging.warning(
-                f"Could not create data directory '{self.data_dir}'. Falling back to current working directory."
-            )
-            # Fallback to current directory if we can't create the data dir
-            # This might happen in some restricted environments
-            self.data_dir = os.getcwd()
+        # 1. Determine Data Directory (and ensure it exists)
+        # Only resolve the default if not already provided via env var
+        if self.data_dir:
+            self.data_dir = _ensure_data_dir(self.data_dir)
+        else:
+            self.data_dir = _default_data_dir()
 
         # 3. Resolve file paths
         # If the file paths are just filenames (default), join with data_dir
@@ -85,6 +111,11 @@ class Settings(BaseSettings):
         if not os.path.isabs(self.token_file):
             self.token_file = os.path.join(self.data_dir, self.token_file)
 
+        if not os.path.isabs(self.delete_scan_cache_file):
+            self.delete_scan_cache_file = os.path.join(
+                self.data_dir, self.delete_scan_cache_file
+            )
+
     # Gmail API
     scopes: list[str] = [
         "https://www.googleapis.com/auth/gmail.readonly",
@@ -104,6 +135,12 @@ class Settings(BaseSettings):
         le=10,
         description="Maximum number of parallel workers for processing",
     )
+    sender_query_group_size: int = Field(
+        default=20,
+        ge=1,
+        le=50,
+        description="Senders combined into one OR'ed search query (1-50)",
+    )
     chunk_size: int = Field(
         default=1000,
         ge=100,
@@ -132,5 +169,11 @@ class Settings(BaseSettings):
     )
 
 
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide settings, built on first use."""
+    return Settings()
+
+
 # Global settings instance
-settings = Settings()
+settings = get_settings()
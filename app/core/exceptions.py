@@ -11,80 +11,97 @@ from typing import Optional, Dict, Any
 class GmailCleanerError(Exception):
     """Base exception for all application errors."""
 
+    code = "INTERNAL_ERROR"
+
     def __init__(
         self,
         message: str,
-        code: str = "INTERNAL_ERROR",
+        code: Optional[str] = None,
         details: Optional[Dict[str, Any]] = None,
     ):
         self.message = message
-        self.code = code
+        if code is not None:
+            self.code = code
         self.details = details or {}
-        super().__init__(self.message)
+        super().__init__(message)
 
 
 class NetworkError(GmailCleanerError):
     """Raised when network connectivity issues occur."""
 
+    code = "NETWORK_ERROR"
+
     def __init__(
         self,
         message: str = "Network connection failed",
         details: Optional[Dict[str, Any]] = None,
     ):
-        super().__init__(message, code="NETWORK_ERROR", details=details)
+        super().__init__(message, details=details)
 
 
 class AuthError(GmailCleanerError):
     """Raised when authentication fails (expired token, invalid credentials)."""
 
+    code = "AUTH_ERROR"
+
     def __init__(
         self,
         message: str = "Authentication failed",
         details: Optional[Dict[str, Any]] = None,
     ):
-        super().__init__(message, code="AUTH_ERROR", details=details)
+        super().__init__(message, details=details)
 
 
 class GmailApiError(GmailCleanerError):
     """Raised when Gmail API returns an error (4xx, 5xx)."""
 
+    code = "GMAIL_API_ERROR"
+
     def __init__(
         self,
         message: str,
         status_code: int = 500,
         details: Optional[Dict[str, Any]] = None,
     ):
+        super().__init__(message, details=details)
         self.status_code = status_code
-        super().__init__(message, code="GMAIL_API_ERROR", details=details)
 
 
 class QuotaExceededError(GmailApiError):
     """Raised when Gmail API quota is exceeded."""
 
+    code = "QUOTA_EXCEEDED"
+
     def __init__(
         self,
         message: str = "Gmail API quota exceeded",
         details: Optional[Dict[str, Any]] = None,
+        retry_after: Optional[float] = None,
     ):
         super().__init__(message, status_code=429, details=details)
-        self.code = "QUOTA_EXCEEDED"
+        # Seconds the server asked us to wait before retrying, if it said
+        self.retry_after = retry_after
 
 
 class ResourceNotFoundError(GmailCleanerError):
     """Raised when a requested resource (email, label) is not found."""
 
+    code = "NOT_FOUND"
+
     def __init__(
         self,
         message: str = "Resource not found",
         details: Optional[Dict[str, Any]] = None,
     ):
-        super().__init__(message, code="NOT_FOUND", details=details)
+        super().__init__(message, details=details)
 
 
 class ValidationError(GmailCleanerError):
     """Raised when input validation fails."""
 
+    code = "VALIDATION_ERROR"
+
     def __init__(
         self, message: str = "Invalid input", details: Optional[Dict[str, Any]] = None
     ):
-        super().__init__(message, code="VALIDATION_ERROR", details=details)
+        super().__init__(message, details=details)
@@ -4,64 +4,117 @@ Global Application State
 Shared state across the application.
 """
 
+import asyncio
 import threading
+from functools import partial
+from typing import Callable
+
+
+class StatusDict(dict):
+    """Operation status that reports every change to its owner."""
+
+    def __init__(self, on_change: Callable[[], None], initial: dict) -> None:
+        super().__init__(initial)
+        self._on_change = on_change
+
+    def __setitem__(self, key, value) -> None:
+        super().__setitem__(key, value)
+        self._on_change()
+
+    def update(self, *args, **kwargs) -> None:
+        """Apply several fields as one change.
+
+        dict.update runs without releasing the GIL, so a concurrent copy()
+        never sees a half-applied update, and waiting pollers wake once.
+        """
+        super().update(*args, **kwargs)
+        self._on_change()
 
 
 class AppState:
     """Global application state container."""
 
     def __init__(self) -> None:
+        # Per-status counters bumped on every change, so clients can long-poll
+        # the status they watch instead of re-fetching it on a timer
+        self._status_versions: dict[str, int] = {}
+        self._status_lock: threading.Lock = threading.Lock()
+        # Requests long-polling each status: their event loop and the
+        # asyncio.Event to set on it. Waiting on the loop itself means an
+        # open poll never holds a worker thread.
+        self._status_waiters: dict[
+            str, set[tuple[asyncio.AbstractEventLoop, asyncio.Event]]
+        ] = {}
+
         # User state
         self.current_user: dict = {"email": None, "logged_in": False}
 
         # Scan state
         self.scan_results: list = []
-        self.scan_status: dict = {
-            "progress": 0,
-            "message": "Ready",
-            "done": False,
-            "error": None,
-        }
+        self.scan_status: dict = self._status(
+            "scan_status",
+            {
+                "progress": 0,
+                "message": "Ready",
+                "done": False,
+                "error": None,
+            },
+        )
 
         # Mark read state
-        self.mark_read_status: dict = {
-            "progress": 0,
-            "message": "Ready",
-            "done": False,
-            "error": None,
-            "marked_count": 0,
-        }
+        self.mark_read_status: dict = self._status(
+            "mark_read_status",
+            {
+                "progress": 0,
+                "message": "Ready",
+                "done": False,
+                "error": None,
+                "marked_count": 0,
+            },
+        )
 
         # Delete state
         self.delete_scan_results: list = []
-        self.delete_scan_status: dict = {
-            "progress": 0,
-            "message": "Ready",
-            "done": False,
-            "error": None,
-        }
+        # Unix time a delete scan covering the whole mailbox started, so its
+        # message IDs can stand in for a fresh search; None if it did not
+        self.delete_scan_complete_at: float | None = None
+        self.delete_scan_status: dict = self._status(
+            "delete_scan_status",
+            {
+                "progress": 0,
+                "message": "Ready",
+                "done": False,
+                "error": None,
+            },
+        )
 
         # Delete bulk operation state
-        self.delete_bulk_status: dict = {
-            "progress": 0,
-            "message": "Ready",
-            "done": False,
-            "error": None,
-            "deleted_count": 0,
-            "total_senders": 0,
-            "current_sender": 0,
-        }
+        self.delete_bulk_status: dict = self._status(
+            "delete_bulk_status",
+            {
+                "progress": 0,
+                "message": "Ready",
+                "done": False,
+                "error": None,
+                "deleted_count": 0,
+                "total_senders": 0,
+                "current_sender": 0,
+            },
+        )
 
         # Download emails state
-        self.download_status: dict = {
-            "progress": 0,
-            "message": "Ready",
-            "done": False,
-            "error": None,
-            "total_emails": 0,
-            "fetched_count": 0,
-            "csv_data": None,
-        }
+        self.download_status: dict = self._status(
+            "download_status",
+            {
+                "progress": 0,
+                "message": "Ready",
+                "done": False,
+                "error": None,
+                "total_emails": 0,
+                "fetched_count": 0,
+                "csv_data": None,
+            },
+        )
 
         # Auth state
         self.pending_auth_url: dict = {"url": None}
@@ -70,127 +123,218 @@ class AppState:
         self.oauth_state_lock: threading.Lock = threading.Lock()
 
         # Label operation state
-        self.label_operation_status: dict = {
-            "progress": 0,
-            "message": "Ready",
-            "done": False,
-            "error": None,
-            "affected_count": 0,
-            "total_senders": 0,
-            "current_sender": 0,
-        }
+        self.label_operation_status: dict = self._status(
+            "label_operation_status",
+            {
+                "progress": 0,
+                "message": "Ready",
+                "done": False,
+                "error": None,
+                "affected_count": 0,
+                "total_senders": 0,
+                "current_sender": 0,
+            },
+        )
 
         # Archive state
-        self.archive_status: dict = {
-            "progress": 0,
-            "message": "Ready",
-            "done": False,
-            "error": None,
-            "archived_count": 0,
-            "total_senders": 0,
-            "current_sender": 0,
-        }
+        self.archive_status: dict = self._status(
+            "archive_status",
+            {
+                "progress": 0,
+                "message": "Ready",
+                "done": False,
+                "error": None,
+                "archived_count": 0,
+                "total_senders": 0,
+                "current_sender": 0,
+            },
+        )
 
         # Mark important state
-        self.important_status: dict = {
-            "progress": 0,
-            "message": "Ready",
-            "done": False,
-            "error": None,
-            "affected_count": 0,
-            "total_senders": 0,
-            "current_sender": 0,
-        }
+        self.important_status: dict = self._status(
+            "important_status",
+            {
+                "progress": 0,
+                "message": "Ready",
+                "done": False,
+                "error": None,
+                "affected_count": 0,
+                "total_senders": 0,
+                "current_sender": 0,
+            },
+        )
+
+    def _status(self, name: str, initial: dict) -> StatusDict:
+        """Create the status dict stored in attribute `name`."""
+        return StatusDict(partial(self._notify_status_change, name), initial)
+
+    def status_version(self, name: str) -> int:
+        """Current version of the status stored in attribute `name`."""
+        with self._status_lock:
+            return self._status_versions.get(name, 0)
+
+    def _notify_status_change(self, name: str) -> None:
+        with self._status_lock:
+            self._status_versions[name] = self._status_versions.get(name, 0) + 1
+            waiters = list(self._status_waiters.pop(name, ()))
+        # Status changes mostly come from worker threads, so wake each
+        # waiter on its own loop
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # The loop has closed; nobody is left waiting on it
+                pass
+
+    async def wait_for_status_change(
+        self, name: str, since: int, timeout: float
+    ) -> int:
+        """Wait until status `name` moves past version `since` or timeout.
+
+        Returns:
+            The status's current version.
+        """
+        event = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), event)
+        with self._status_lock:
+            if self._status_versions.get(name, 0) != since:
+                return self._status_versions.get(name, 0)
+            self._status_waiters.setdefault(name, set()).add(waiter)
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._status_lock:
+                waiters = self._status_waiters.get(name)
+                if waiters is not None:
+                    waiters.discard(waiter)
+                    if not waiters:
+                        del self._status_waiters[name]
+        return self.status_version(name)
 
     def reset_scan(self):
         """Reset scan state."""
         self.scan_results = []
-        self.scan_status = {
-            "progress": 0,
-            "message": "Ready",
-            "done": False,
-            "error": None,
-        }
+        self.scan_status = self._status(
+            "scan_status",
+            {
+                "progress": 0,
+                "message": "Ready",
+                "done": False,
+                "error": None,
+            },
+        )
+        self._notify_status_change("scan_status")
 
     def reset_delete_scan(self):
         """Reset delete scan state."""
         self.delete_scan_results = []
-        self.delete_scan_status = {
-            "progress": 0,
-            "message": "Ready",
-            "done": False,
-            "error": None,
-        }
+        self.delete_scan_complete_at = None
+        self.delete_scan_status = self._status(
+            "delete_scan_status",
+            {
+                "progress": 0,
+                "message": "Ready",
+                "done": False,
+                "error": None,
+            },
+        )
+        self._notify_status_change("delete_scan_status")
 
     def reset_mark_read(self):
         """Reset mark read state."""
-        self.mark_read_status = {
-            "progress": 0,
-            "message": "Ready",
-            "done": False,
-            "error": None,
-            "marked_count": 0,
-        }
+        self.mark_read_status = self._status(
+            "mark_read_status",
+            {
+                "progress": 0,
+                "message": "Ready",
+                "done": False,
+                "error": None,
+                "marked_count": 0,
+            },
+        )
+        self._notify_status_change("mark_read_status")
 
     def reset_delete_bulk(self):
         """Reset delete bulk state."""
-        self.delete_bulk_status = {
-            "progress": 0,
-            "message": "Ready",
-            "done": False,
-            "error": None,
-            "deleted_count": 0,
-            "total_senders": 0,
-            "current_sender": 0,
-        }
+        self.delete_bulk_status = self._status(
+            "delete_bulk_status",
+            {
+                "progress": 0,
+                "message": "Ready",
+                "done": False,
+                "error": None,
+                "deleted_count": 0,
+                "total_senders": 0,
+                "current_sender": 0,
+            },
+        )
+        self._notify_status_change("delete_bulk_status")
 
     def reset_download(self):
         """Reset download state."""
-        self.download_status = {
-            "progress": 0,
-            "message": "Ready",
-            "done": False,
-            "error": None,
-            "total_emails": 0,
-            "fetched_count": 0,
-            "csv_data": None,
-        }
+        self.download_status = self._status(
+            "download_status",
+            {
+                "progress": 0,
+                "message": "Ready",
+                "done": False,
+                "error": None,
+                "total_emails": 0,
+                "fetched_count": 0,
+                "csv_data": None,
+            },
+        )
+        self._notify_status_change("download_status")
 
     def reset_label_operation(self):
         """Reset label operation state."""
-        self.label_operation_status = {
-            "progress": 0,
-            "message": "Ready",
-            "done": False,
-            "error": None,
-            "affected_count": 0,
-            "total_senders": 0,
-            "current_sender": 0,
-        }
+        self.label_operation_status = self._status(
+            "label_operation_status",
+            {
+                "progress": 0,
+                "message": "Ready",
+                "done": False,
+                "error": None,
+                "affected_count": 0,
+                "total_senders": 0,
+                "current_sender": 0,
+            },
+        )
+        self._notify_status_change("label_operation_status")
 
     def reset_archive(self):
         """Reset archive state."""
-        self.archive_status = {
-            "progress": 0,
-            "message": "Ready",
-            "done": False,
-            "error": None,
-            "archived_count": 0,
-            "total_senders": 0,
-            "current_sender": 0,
-        }
+        self.archive_status = self._status(
+            "archive_status",
+            {
+                "progress": 0,
+                "message": "Ready",
+                "done": False,
+                "error": None,
+                "archived_count": 0,
+                "total_senders": 0,
+                "current_sender": 0,
+            },
+        )
+        self._notify_status_change("archive_status")
 
     def reset_important(self):
         """Reset mark important state."""
-        self.important_status = {
-            "progress": 0,
-            "message": "Ready",
-            "done": False,
-            "error": None,
-            "affected_count": 0,
-            "total_senders": 0,
-            "current_sender": 0,
-        }
+        self.important_status = self._status(
+            "important_status",
+            {
+                "progress": 0,
+                "message": "Ready",
+                "done": False,
+                "error": None,
+                "affected_count": 0,
+                "total_senders": 0,
+                "current_sender": 0,
+            },
+        )
+        self._notify_status_change("important_status")
 
 
 # Global state instance
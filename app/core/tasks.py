@@ -0,0 +1,32 @@
+"""
+Background Task Execution
+-------------------------
+Dedicated worker pool for long-running Gmail operations.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from .config import settings
+
+# Gmail operations spend most of their time waiting on the network. Running
+# them on their own pool keeps long bulk jobs from occupying the shared
+# threadpool that FastAPI uses for everything else.
+io_executor = ThreadPoolExecutor(
+    max_workers=settings.max_workers, thread_name_prefix="gmail-io"
+)
+
+# Independent API calls made inside one operation (e.g. one search per
+# sender group) fan out here. A job running on io_executor must never wait
+# on its own pool, so this pool is kept separate.
+fanout_executor = ThreadPoolExecutor(
+    max_workers=settings.max_workers, thread_name_prefix="gmail-fanout"
+)
+
+
+async def run_in_io_pool(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking Gmail operation on the dedicated I/O pool."""
+    # Executor.submit forwards keyword arguments itself, so callers never
+    # need to wrap functions in functools.partial.
+    return await asyncio.wrap_future(io_executor.submit(func, *args, **kwargs))
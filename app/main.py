@@ -4,110 +4,165 @@ Gmail Cleaner - FastAPI Application
 Main application factory and configuration.
 """
 
+import asyncio
 import hashlib
+import json
+import logging
 import subprocess
 import time
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
+from functools import lru_cache
 
+import platformdirs
 from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from starlette.types import Scope
 
 from app.core import settings
-from app.api import status_router, actions_router, setup_router
+from app.api.errors import gmail_cleaner_error_handler
+from app.core.exceptions import GmailCleanerError
 
+logger = logging.getLogger(__name__)
 
-def resource_path(relative_path):
+
+@lru_cache(maxsize=None)
+def resource_path(relative_path: str) -> str:
     """Get absolute path to resource, works for dev and for PyInstaller"""
-    base_path = getattr(sys, "_MEIPASS", os.path.abspath("."))
+    base_path = getattr(sys, "_MEIPASS", None) or os.path.abspath(".")
     return os.path.join(base_path, relative_path)
 
 
 templates = Jinja2Templates(directory=resource_path("templates"))
 
+# Static asset URLs carry a ?v=<cache_bust> fingerprint, so versioned
+# requests can be cached by the browser indefinitely.
+_IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
 
-def get_cache_bust_value() -> str:
-    """
-    Get cache-busting value using a robust strategy:
-    1. Try git commit hash (most specific)
-    2. If uncommitted changes exist in static files, append a hash of those changes
-    3. Fall back to app version from settings
-    4. Fall back to timestamp if both unavailable
-    """
-    # Skip git checks if frozen (PyInstaller)
-    if getattr(sys, "frozen", False):
-        return settings.app_version or str(int(time.time()))
 
-    base_value = None
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles that lets browsers keep fingerprinted assets forever."""
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            query_params = scope.get("query_string", b"").split(b"&")
+            if any(param.startswith(b"v=") for param in query_params):
+                response.headers["Cache-Control"] = _IMMUTABLE_CACHE_CONTROL
+            else:
+                response.headers["Cache-Control"] = "no-cache"
+        return response
 
-    # Try git commit hash first
+
+def _run_git(*args: str) -> str | None:
+    """Run a git command and return its stdout, or None if it failed."""
     try:
         result = subprocess.run(
-            ["git", "rev-parse", "--short", "HEAD"],
+            ["git", *args],
             capture_output=True,
-            text=True,
-            check=True,
             timeout=5,
         )
-        commit_hash = result.stdout.strip()
-        if commit_hash:
-            base_value = commit_hash
-    except (
-        subprocess.CalledProcessError,
-        subprocess.TimeoutExpired,
-        FileNotFoundError,
-    ):
-        pass
+    except (subprocess.TimeoutExpired, FileNotFoundError):
+        return None
+    if result.returncode != 0:
+        return None
+    # Decode ourselves rather than using text=True, which sets up a
+    # locale-dependent text wrapper for each call
+    return result.stdout.decode("utf-8", "replace")
 
-    # Check for uncommitted changes in static files
-    if base_value:
-        try:
-            # Check for uncommitted changes in static directory
-            diff_result = subprocess.run(
-                ["git", "diff", "--name-only", "static/"],
-                capture_output=True,
-                text=True,
-                check=False,
-                timeout=5,
-            )
 
-            # Also check for untracked files in static directory
-            untracked_result = subprocess.run(
-                ["git", "ls-files", "--others", "--exclude-standard", "static/"],
-                capture_output=True,
-                text=True,
-                check=False,
-                timeout=5,
-            )
+def _parse_porcelain_paths(output: str) -> list[str]:
+    """Extract file paths from `git status --porcelain=v1 -z` output."""
+    paths = []
+    records = iter(output.split("\0"))
+    for record in records:
+        # Each record is "XY <path>"
+        if len(record) < 4:
+            continue
+        status_code, path = record[:2], record[3:]
+        paths.append(path)
+        # Renames and copies are followed by a record holding the source path
+        if "R" in status_code or "C" in status_code:
+            next(records, None)
+    return paths
 
-            changed_files = diff_result.stdout.strip().splitlines()
-            untracked_files = untracked_result.stdout.strip().splitlines()
-            all_changed = [f for f in changed_files + untracked_files if f]
 
-            if all_changed:
-                # Compute hash of changed file names and their content
-                hasher = hashlib.sha256()
-                for file_path in sorted(all_changed):
-                    # Validate file path is in static directory (security check)
-                    if not file_path.startswith("static/"):
-                        continue
-                    hasher.update(file_path.encode())
+_GIT_HEAD_ARGS = ("rev-parse", "--short", "HEAD")
+_GIT_STATUS_ARGS = (
+    "status",
+    "--porcelain=v1",
+    "-z",
+    "--untracked-files=all",
+    "--",
+    "static/",
+)
+
+
+async def _run_git_async(*args: str) -> str | None:
+    """Run a git command without blocking the event loop."""
+    try:
+        process = await asyncio.create_subprocess_exec(
+            "git",
+            *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+    except FileNotFoundError:
+        return None
+    try:
+        stdout, _ = await asyncio.wait_for(process.communicate(), timeout=5)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        return None
+    if process.returncode != 0:
+        return None
+    return stdout.decode("utf-8", "replace")
+
+
+def _cache_bust_from_git(
+    head_output: str | None,
+    status_output: str | None,
+    file_stats: dict[str, os.stat_result] | None = None,
+) -> str:
+    """
+    Build the cache-busting value from git rev-parse and status output.
+
+    file_stats may hold stat results already collected for static files,
+    which are used instead of stat-ing those files again.
+    """
+    file_stats = file_stats or {}
+    base_value = head_output.strip() if head_output else None
+
+    # Check for uncommitted changes in static files
+    if base_value and status_output:
+        all_changed = _parse_porcelain_paths(status_output)
+
+        if all_changed:
+            # Fingerprint changed files by name, size and modification time;
+            # any edit to an asset changes its metadata, so contents need
+            # not be read.
+            hasher = hashlib.blake2b(digest_size=16)
+            for file_path in sorted(all_changed):
+                # Validate file path is in static directory (security check)
+                if not file_path.startswith("static/"):
+                    continue
+                hasher.update(file_path.encode())
+                stat = file_stats.get(file_path)
+                if stat is None:
                     try:
-                        with open(file_path, "rb") as f:
-                            hasher.update(f.read())
+                        stat = os.stat(file_path)
                     except OSError:
-                        # Skip files that can't be read
-                        pass
-                change_hash = hasher.hexdigest()[:8]
-                return f"{base_value}-{change_hash}"
-        except (
-            subprocess.CalledProcessError,
-            subprocess.TimeoutExpired,
-            FileNotFoundError,
-        ):
-            pass
+                        # Deleted or unreadable files contribute only their name
+                        continue
+                hasher.update(stat.st_size.to_bytes(8, "little"))
+                hasher.update(stat.st_mtime_ns.to_bytes(8, "little", signed=True))
+            change_hash = hasher.hexdigest()[:8]
+            return f"{base_value}-{change_hash}"
 
     # If we have a base value (commit hash), use it
     if base_value:
@@ -121,22 +176,263 @@ def get_cache_bust_value() -> str:
     return str(int(time.time()))
 
 
-# Cache-busting value generated at app startup
-STARTUP_CACHE_BUST = get_cache_bust_value()
+def _read_git_head(git_dir: str = ".git") -> str | None:
+    """Resolve the current commit hash by reading .git directly."""
+    try:
+        with open(os.path.join(git_dir, "HEAD")) as f:
+            head = f.read().strip()
+    except OSError:
+        return None
+    if not head.startswith("ref: "):
+        # Detached HEAD holds the commit hash itself
+        return head or None
+
+    ref = head[len("ref: ") :]
+    try:
+        with open(os.path.join(git_dir, ref)) as f:
+            return f.read().strip() or None
+    except OSError:
+        pass
+    try:
+        with open(os.path.join(git_dir, "packed-refs")) as f:
+            for line in f:
+                sha, _, name = line.strip().partition(" ")
+                if name == ref:
+                    return sha
+    except OSError:
+        pass
+    return None
+
+
+def _scan_tree(directory: str) -> tuple[int, dict[str, os.stat_result]]:
+    """
+    Walk a directory tree with os.scandir.
+
+    Returns the newest modification time in the tree and the stat result of
+    every file, keyed by its "/"-separated path as git reports it.
+    """
+    try:
+        latest = os.stat(directory).st_mtime_ns
+    except OSError:
+        return 0, {}
+    file_stats = {}
+    pending = [directory]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    latest = max(latest, stat.st_mtime_ns)
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    else:
+                        file_stats[entry.path.replace(os.sep, "/")] = stat
+        except OSError:
+            continue
+    return latest, file_stats
+
+
+def _cache_bust_memo_path() -> str:
+    return os.path.join(
+        platformdirs.user_cache_dir("gmail-cleaner", "Gururagavendra"),
+        "cache_bust.json",
+    )
+
+
+def _cache_bust_memo_key(static_mtime_ns: int) -> str | None:
+    """
+    Key identifying the inputs of the cache-bust value.
+
+    The value only changes when HEAD moves or a static file changes, and
+    any change under static/ bumps the newest mtime in that tree.
+    """
+    head = _read_git_head()
+    if not head:
+        return None
+    return f"{os.path.abspath('.')}:{head}:{static_mtime_ns}"
+
+
+def _load_cache_bust_memo(key: str) -> str | None:
+    try:
+        with open(_cache_bust_memo_path()) as f:
+            memo = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if isinstance(memo, dict) and memo.get("key") == key:
+        value = memo.get("value")
+        if isinstance(value, str):
+            return value
+    return None
+
+
+def _save_cache_bust_memo(key: str, value: str) -> None:
+    path = _cache_bust_memo_path()
+    tmp_path = f"{path}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, "w") as f:
+            json.dump({"key": key, "value": value}, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        # The memo is only an optimization; recompute next time
+        pass
+
+
+def _cache_bust_without_git() -> str | None:
+    """Return the cache-busting value when git should not be consulted."""
+    # Skip git checks if frozen (PyInstaller)
+    if getattr(sys, "frozen", False):
+        return settings.app_version or str(int(time.time()))
+
+    # Release builds bump app_version on every deploy, so it is enough
+    if settings.cache_bust_strategy == "version" and settings.app_version:
+        return settings.app_version
+
+    return None
+
+
+def _prepare_cache_bust() -> tuple[str | None, str | None, dict[str, os.stat_result]]:
+    """
+    Run the cache-bust steps that come before asking git.
+
+    Returns:
+        (value if git is not needed, memo key, stat of every static file)
+    """
+    value = _cache_bust_without_git()
+    if value:
+        return value, None, {}
+
+    # Reuse the value from a previous start if nothing has changed since
+    static_mtime_ns, static_stats = _scan_tree("static")
+    memo_key = _cache_bust_memo_key(static_mtime_ns)
+    if memo_key:
+        cached = _load_cache_bust_memo(memo_key)
+        if cached:
+            return cached, memo_key, static_stats
+    return None, memo_key, static_stats
+
+
+def _finish_cache_bust(
+    head_output: str | None,
+    status_output: str | None,
+    static_stats: dict[str, os.stat_result],
+    memo_key: str | None,
+) -> str:
+    """Build the cache-bust value from git's output and memoize it."""
+    value = _cache_bust_from_git(head_output, status_output, static_stats)
+    if memo_key and head_output:
+        _save_cache_bust_memo(memo_key, value)
+    return value
+
+
+def _run_git_queries() -> tuple[str | None, str | None]:
+    """Get the commit hash and changed/untracked static files from git."""
+    # Both run at the same time; a single status call covers both diff and
+    # untracked files
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        head_future = pool.submit(_run_git, *_GIT_HEAD_ARGS)
+        status_future = pool.submit(_run_git, *_GIT_STATUS_ARGS)
+        return head_future.result(), status_future.result()
+
+
+def get_cache_bust_value() -> str:
+    """
+    Get cache-busting value using a robust strategy:
+    1. Use the app version directly when CACHE_BUST_STRATEGY=version
+    2. Try git commit hash (most specific)
+    3. If uncommitted changes exist in static files, append a hash of those changes
+    4. Fall back to app version from settings
+    5. Fall back to timestamp if both unavailable
+    """
+    value, memo_key, static_stats = _prepare_cache_bust()
+    if value:
+        return value
+    head_output, status_output = _run_git_queries()
+    return _finish_cache_bust(head_output, status_output, static_stats, memo_key)
+
+
+async def get_cache_bust_value_async() -> str:
+    """Async variant of get_cache_bust_value used during app startup."""
+    # The static tree walk and memo file reads block, so keep them off the
+    # event loop
+    value, memo_key, static_stats = await asyncio.to_thread(_prepare_cache_bust)
+    if value:
+        return value
+
+    try:
+        head_output, status_output = await asyncio.gather(
+            _run_git_async(*_GIT_HEAD_ARGS),
+            _run_git_async(*_GIT_STATUS_ARGS),
+        )
+    except NotImplementedError:
+        # Event loops without subprocess support (e.g. the Windows selector
+        # loop) run git from worker threads instead
+        head_output, status_output = await asyncio.to_thread(_run_git_queries)
+
+    return await asyncio.to_thread(
+        _finish_cache_bust, head_output, status_output, static_stats, memo_key
+    )
+
+
+# Cache-busting value, computed during app startup rather than at import
+# time so importing this module does not wait on git subprocesses
+STARTUP_CACHE_BUST: str | None = None
+
+
+def render_index_html(cache_bust: str) -> bytes:
+    """Render the main HTML page; its inputs are fixed for the process lifetime."""
+    template = templates.get_template("index.html")
+    html = template.render(cache_bust=cache_bust, version=settings.app_version)
+    return html.encode("utf-8")
+
+
+def _etag_for(content: bytes) -> str:
+    return f'W/"{hashlib.blake2b(content, digest_size=8).hexdigest()}"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Check an If-None-Match header against an ETag."""
+    if not if_none_match:
+        return False
+    candidates = {tag.strip() for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan - startup and shutdown events."""
+    global STARTUP_CACHE_BUST
     # Startup
-    print(f"{settings.app_name} v{settings.app_version} starting...")
+    logger.info("%s v%s starting...", settings.app_name, settings.app_version)
+    STARTUP_CACHE_BUST = await get_cache_bust_value_async()
+    app.state.index_html = render_index_html(STARTUP_CACHE_BUST)
+    app.state.index_etag = _etag_for(app.state.index_html)
     yield
     # Shutdown
-    print("Shutting down...")
+    logger.info("Shutting down...")
+
+
+def _configure_logging() -> None:
+    """Give the app's loggers a handler unless the host already set one up."""
+    app_logger = logging.getLogger("app")
+    if app_logger.handlers or logging.getLogger().handlers:
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(levelname)s %(name)s: %(message)s"))
+    app_logger.addHandler(handler)
+    app_logger.setLevel(logging.DEBUG if settings.debug else logging.INFO)
 
 
 def create_app() -> FastAPI:
     """Application factory - creates and configures the FastAPI app."""
+    # Routers pull in the service layer and Google API client, so import
+    # them here rather than when this module is loaded
+    from app.api import status_router, actions_router, setup_router
+
+    _configure_logging()
 
     app = FastAPI(
         title=settings.app_name,
@@ -148,22 +444,38 @@ def create_app() -> FastAPI:
     )
 
     # Mount static files
-    app.mount("/static", StaticFiles(directory=resource_path("static")), name="static")
+    # The static directory ships with the app (and inside the PyInstaller
+    # bundle), so skip the existence check at mount time
+    app.mount(
+        "/static",
+        CachedStaticFiles(directory=resource_path("static"), check_dir=False),
+        name="static",
+    )
 
     # Include API routers
     app.include_router(status_router)
     app.include_router(actions_router)
     app.include_router(setup_router)
 
+    # Map application exceptions to HTTP responses in one place
+    app.add_exception_handler(GmailCleanerError, gmail_cleaner_error_handler)
+
     # HTML routes
     @app.get("/", include_in_schema=False)
-    async def root(request: Request):
+    async def root(request: Request) -> Response:
         """Serve the main HTML page."""
-        return templates.TemplateResponse(
-            request,
-            "index.html",
-            {"cache_bust": STARTUP_CACHE_BUST, "version": settings.app_version},
-        )
+        state = request.app.state
+        if getattr(state, "index_html", None) is None:
+            # Startup did not run (e.g. app used without its lifespan)
+            state.index_html = render_index_html(
+                STARTUP_CACHE_BUST or settings.app_version
+            )
+            state.index_etag = _etag_for(state.index_html)
+
+        headers = {"Cache-Control": "no-cache", "ETag": state.index_etag}
+        if _etag_matches(request.headers.get("if-none-match"), state.index_etag):
+            return Response(status_code=304, headers=headers)
+        return HTMLResponse(state.index_html, headers=headers)
 
     return app
 
@@ -1,6 +1,7 @@
 """Models module exports."""
 
 from .schemas import (
+    NonBlankStr,
     ScanRequest,
     MarkReadRequest,
     DeleteScanRequest,
@@ -13,6 +14,7 @@ from .schemas import (
     RemoveLabelRequest,
     ArchiveRequest,
     MarkImportantRequest,
+    OAuthClientConfig,
     StatusResponse,
     AuthStatusResponse,
     ScanStatusResponse,
@@ -4,11 +4,27 @@ Pydantic Models - Request/Response Schemas
 Data validation and serialization.
 """
 
-from typing import Optional
-from pydantic import BaseModel, Field, field_validator
+from typing import Annotated, Optional
+from pydantic import (
+    BaseModel,
+    Field,
+    StringConstraints,
+    field_validator,
+    model_validator,
+)
 import re
 
 
+# Identifier that must contain something other than whitespace
+NonBlankStr = Annotated[str, StringConstraints(strip_whitespace=True, min_length=1)]
+
+
+def _require_senders(v: list[str]) -> list[str]:
+    if not v:
+        raise ValueError("At least one sender is required")
+    return v
+
+
 # ----- Filter Model -----
 
 
@@ -35,6 +51,10 @@ class FiltersModel(BaseModel):
     )
     label: Optional[str] = Field(default=None, description="Gmail label filter")
 
+    def to_query_dict(self) -> dict:
+        """Return the set filters as a plain dict (unset fields omitted)."""
+        return {k: v for k, v in self.__dict__.items() if v is not None}
+
     @field_validator("older_than")
     @classmethod
     def validate_older_than(cls, v) -> Optional[str]:
@@ -143,6 +163,14 @@ class DeleteEmailsRequest(BaseModel):
 
     sender: str = Field(default="", description="Sender email address")
 
+    @field_validator("sender")
+    @classmethod
+    def validate_sender(cls, v: str) -> str:
+        sender = v.strip()
+        if not sender:
+            raise ValueError("Sender email is required")
+        return sender
+
 
 class DeleteBulkRequest(BaseModel):
     """Request to delete emails from multiple senders."""
@@ -165,31 +193,75 @@ class CreateLabelRequest(BaseModel):
 class ApplyLabelRequest(BaseModel):
     """Request to apply a label to emails from selected senders."""
 
-    label_id: str = Field(..., description="Gmail label ID to apply")
-    senders: list[str] = Field(default=[], description="List of sender addresses")
+    label_id: NonBlankStr = Field(..., description="Gmail label ID to apply")
+    senders: list[str] = Field(
+        default=[], validate_default=True, description="List of sender addresses"
+    )
+
+    @field_validator("senders")
+    @classmethod
+    def validate_senders(cls, v: list[str]) -> list[str]:
+        return _require_senders(v)
 
 
 class RemoveLabelRequest(BaseModel):
     """Request to remove a label from selected senders."""
 
-    label_id: str = Field(..., description="Gmail label ID to remove")
-    senders: list[str] = Field(default=[], description="List of sender addresses")
+    label_id: NonBlankStr = Field(..., description="Gmail label ID to remove")
+    senders: list[str] = Field(
+        default=[], validate_default=True, description="List of sender addresses"
+    )
+
+    @field_validator("senders")
+    @classmethod
+    def validate_senders(cls, v: list[str]) -> list[str]:
+        return _require_senders(v)
 
 
 class ArchiveRequest(BaseModel):
     """Request to archive emails from selected senders."""
 
-    senders: list[str] = Field(default=[], description="List of sender addresses")
+    senders: list[str] = Field(
+        default=[], validate_default=True, description="List of sender addresses"
+    )
+
+    @field_validator("senders")
+    @classmethod
+    def validate_senders(cls, v: list[str]) -> list[str]:
+        return _require_senders(v)
 
 
 class MarkImportantRequest(BaseModel):
     """Request to mark/unmark emails as important."""
 
-    senders: list[str] = Field(default=[], description="List of sender addresses")
+    senders: list[str] = Field(
+        default=[], validate_default=True, description="List of sender addresses"
+    )
     important: bool = Field(
         default=True, description="True to mark important, False to unmark"
     )
 
+    @field_validator("senders")
+    @classmethod
+    def validate_senders(cls, v: list[str]) -> list[str]:
+        return _require_senders(v)
+
+
+# ----- Credentials File -----
+
+
+class OAuthClientConfig(BaseModel):
+    """Google OAuth client secrets file (credentials.json)."""
+
+    installed: Optional[dict] = None
+    web: Optional[dict] = None
+
+    @model_validator(mode="after")
+    def validate_client_type(self) -> "OAuthClientConfig":
+        if self.installed is None and self.web is None:
+            raise ValueError("Must contain 'installed' or 'web' client configuration.")
+        return self
+
 
 # ----- Response Models -----
 
@@ -11,22 +11,66 @@ import platform
 import shutil
 import threading
 import time
-from http.server import HTTPServer
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from http.server import ThreadingHTTPServer
 
 from google.auth.exceptions import RefreshError
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import build
+from googleapiclient.http import build_http
+from pydantic_core import from_json
 
 from app.core import settings, state
-from app.services.auth_handlers import OAuthCallbackHandler
+from app.services.auth_handlers import OAuthCallbackHandler, OAuthCallbackState
 
 logger = logging.getLogger(__name__)
 
+# Host facts used to decide whether to open a browser; fixed for the process
+_PLATFORM = platform.system()
+_HAS_XDG_OPEN = _PLATFORM not in ("Windows", "Darwin") and bool(
+    shutil.which("xdg-open")
+)
+# Windows and macOS always have a browser; Linux needs xdg-open (or DISPLAY,
+# which is checked per sign-in)
+_CAN_OPEN_BROWSER = _PLATFORM in ("Windows", "Darwin") or _HAS_XDG_OPEN
 
-# Track auth in progress
-_auth_in_progress = {"active": False}
+
+# Held for the whole OAuth flow so only one sign-in runs at a time
+_auth_lock = threading.Lock()
+
+# Credentials parsed from the token file, stored as ((path, mtime_ns, size),
+# creds) so repeated auth checks skip re-reading and re-parsing the file
+_creds_cache: dict = {"entry": None}
+
+
+def _file_key(path: str) -> tuple | None:
+    """Identify the current version of a file by its path, mtime and size."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (path, st.st_mtime_ns, st.st_size)
+
+
+def _get_cached_credentials() -> Credentials | None:
+    """Return cached credentials if the token file has not changed since."""
+    entry = _creds_cache["entry"]
+    if entry is None:
+        return None
+    key, creds = entry
+    if key != _file_key(settings.token_file):
+        return None
+    return creds
+
+
+def _cache_credentials(creds: Credentials | None) -> None:
+    """Remember credentials for the token file as it is on disk now."""
+    key = _file_key(settings.token_file)
+    _creds_cache["entry"] = (key, creds) if key is not None and creds else None
 
 
 def _is_file_empty(file_path: str) -> bool:
@@ -56,20 +100,17 @@ def is_web_auth_mode() -> bool:
 
 def needs_auth_setup() -> bool:
     """Check if authentication is needed."""
-    if os.path.exists(settings.token_file):
-        # Check if token file is empty
-        if _is_file_empty(settings.token_file):
-            logger.error(f"Token file {settings.token_file} is empty")
-            try:
-                os.remove(settings.token_file)
-            except OSError:
-                pass
-            return True
+    cached_creds = _get_cached_credentials()
+    if cached_creds is not None:
+        return not (cached_creds.valid or cached_creds.refresh_token)
 
+    if os.path.exists(settings.token_file):
+        # An empty token file fails to parse, so it is handled below too
         try:
             creds = Credentials.from_authorized_user_file(
                 settings.token_file, settings.scopes
             )
+            _cache_credentials(creds)
             if creds and (creds.valid or creds.refresh_token):
                 return False
         except (ValueError, OSError) as e:
@@ -81,30 +122,125 @@ def needs_auth_setup() -> bool:
     return True
 
 
+# needs_setup/has_credentials from a recent web auth status poll, stored as
+# (file_keys, timestamp, (needs_setup, has_credentials))
+_WEB_AUTH_STATUS_TTL = 2.0
+_web_auth_status_cache: dict = {"entry": None}
+
+
 def get_web_auth_status() -> dict:
     """Get current web auth status."""
+    # The frontend polls this; reuse the result briefly while the token and
+    # credentials files are unchanged (signing in or out changes their keys)
+    file_keys = (
+        _file_key(settings.token_file),
+        _file_key(settings.credentials_file),
+    )
+    now = time.monotonic()
+    entry = _web_auth_status_cache["entry"]
+    if (
+        entry is not None
+        and entry[0] == file_keys
+        and now - entry[1] < _WEB_AUTH_STATUS_TTL
+    ):
+        needs_setup, has_credentials = entry[2]
+    else:
+        needs_setup = needs_auth_setup()
+        has_credentials = has_client_credentials()
+        # Without a token file the check is a single stat; nothing to save
+        if file_keys[0] is not None:
+            _web_auth_status_cache["entry"] = (
+                file_keys,
+                now,
+                (needs_setup, has_credentials),
+            )
+
     return {
-        "needs_setup": needs_auth_setup(),
+        "needs_setup": needs_setup,
         "web_auth_mode": is_web_auth_mode(),
-        "has_credentials": os.path.exists(settings.credentials_file),
+        "has_credentials": has_credentials,
         "pending_auth_url": state.pending_auth_url.get("url"),
     }
 
 
-def _try_refresh_creds(creds: Credentials) -> Credentials | None:
+def _write_token_file(data: str) -> None:
+    """Write the token file atomically.
+
+    The token is written to a sibling temp file and moved into place, so a
+    crash mid-write leaves the previous token rather than a truncated one.
+    """
+    tmp_path = f"{settings.token_file}.tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            f.write(data)
+        os.replace(tmp_path, settings.token_file)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+# Guards _refresh_inflight and _refresh_future
+_refresh_lock = threading.Lock()
+
+# Refreshes in progress, keyed by refresh token, so concurrent callers wait
+# for one token exchange instead of each starting their own
+_refresh_inflight: dict[str, Future] = {}
+
+
+def _try_refresh_creds(
+    creds: Credentials, *, keep_token_file: bool = False
+) -> Credentials | None:
     """Attempt to refresh expired credentials and save to token file.
 
+    Only one refresh runs per refresh token; other callers get its result.
+
     Args:
         creds: Credentials that are expired but have a refresh_token.
+        keep_token_file: Leave the token file in place if the refresh token
+            is rejected, for refreshes made while the token still works.
 
     Returns:
         Refreshed credentials if successful, None if refresh failed.
     """
+    key = creds.refresh_token
+    with _refresh_lock:
+        future = _refresh_inflight.get(key)
+        if future is None:
+            future = _refresh_inflight[key] = Future()
+            owner = True
+        else:
+            owner = False
+    if not owner:
+        return future.result()
+
+    try:
+        result = _refresh_creds(creds, keep_token_file=keep_token_file)
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        with _refresh_lock:
+            _refresh_inflight.pop(key, None)
+
+
+def _refresh_creds(
+    creds: Credentials, *, keep_token_file: bool = False
+) -> Credentials | None:
+    """Refresh credentials and save them; see _try_refresh_creds."""
+    old_refresh_token = creds.refresh_token
     try:
         creds.refresh(Request())
+        if creds.refresh_token != old_refresh_token:
+            logger.warning("Refresh token was rotated during token refresh")
         try:
-            with open(settings.token_file, "w") as token:
-                token.write(creds.to_json())
+            _write_token_file(creds.to_json())
+            _cache_credentials(creds)
         except OSError:
             # Token file write failed - creds are refreshed in memory but not saved
             logger.exception("Failed to save refreshed token")
@@ -112,6 +248,8 @@ def _try_refresh_creds(creds: Credentials) -> Credentials | None:
     except RefreshError as e:
         # Refresh token is invalid or expired
         logger.warning(f"Token refresh failed: {e}")
+        if keep_token_file:
+            return None
         # Clear invalid token file
         try:
             os.remove(settings.token_file)
@@ -120,99 +258,224 @@ def _try_refresh_creds(creds: Credentials) -> Credentials | None:
         return None
 
 
+# Tokens this close to expiry are refreshed in the background while the
+# current one keeps being served, so callers rarely wait on a refresh
+_STALE_WINDOW = timedelta(minutes=5)
+_refresh_executor = ThreadPoolExecutor(
+    max_workers=1, thread_name_prefix="token-refresh"
+)
+_refresh_future: dict = {"future": None}
+
+
+def _refresh_if_stale(creds: Credentials) -> None:
+    """Start a background refresh when valid creds are about to expire."""
+    expiry = getattr(creds, "expiry", None)
+    if not isinstance(expiry, datetime):
+        return  # Tokens without an expiry never go stale
+    # google-auth stores expiry as naive UTC
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    if expiry - now > _STALE_WINDOW or not creds.refresh_token:
+        return
+    with _refresh_lock:
+        future = _refresh_future["future"]
+        if future is not None and not future.done():
+            return  # A refresh is already running
+        _refresh_future["future"] = _refresh_executor.submit(
+            _refresh_in_background, creds
+        )
+
+
+def _refresh_in_background(creds: Credentials) -> None:
+    """Refresh still-valid creds ahead of expiry.
+
+    The current token keeps working, so a failure here is only logged; the
+    blocking refresh once the token has really expired decides whether the
+    token file is invalid.
+    """
+    try:
+        _try_refresh_creds(creds, keep_token_file=True)
+    except Exception:
+        logger.exception("Background token refresh failed")
+
+
+# (path, mtime_ns, size) of the last credentials file that validated
+_valid_credentials_file: dict = {"key": None}
+
+
 def _get_credentials_path() -> str | None:
-    """Get credentials - from file or create from env var.
+    """Get credentials file path, if the file exists and holds valid JSON.
 
     Returns:
         Path to valid credentials file, or None if not found or invalid.
     """
     if os.path.exists(settings.credentials_file):
-        # Check if credentials file is empty
-        if _is_file_empty(settings.credentials_file):
-            logger.error(
-                f"Credentials file {settings.credentials_file} is empty. "
-                "Please check your credentials.json file and ensure it contains valid OAuth credentials."
-            )
-            return None
+        # Skip re-validating a file that already passed and has not changed
+        file_key = _file_key(settings.credentials_file)
+        if file_key is not None and file_key == _valid_credentials_file["key"]:
+            return settings.credentials_file
 
-        # Validate that the file contains valid JSON
+        # Read once and validate the bytes we read
         try:
-            with open(settings.credentials_file, "r") as f:
-                content = f.read().strip()
-                # Try to parse as JSON to validate
-                json.loads(content)
-            return settings.credentials_file
+            with open(settings.credentials_file, "rb") as f:
+                content = f.read()
         except FileNotFoundError:
             # File was deleted between exists() check and open() - race condition
             # or test mocking issue - treat as if file doesn't exist
             return None
-        except json.JSONDecodeError as e:
+        except OSError as e:
             logger.error(
-                f"Credentials file {settings.credentials_file} contains invalid JSON: {e}",
+                f"Failed to read credentials file {settings.credentials_file}: {e}",
                 exc_info=True,
             )
             return None
-        except OSError as e:
+
+        if not content.strip():
             logger.error(
-                f"Failed to read credentials file {settings.credentials_file}: {e}",
-                exc_info=True,
+                f"Credentials file {settings.credentials_file} is empty. "
+                "Please check your credentials.json file and ensure it contains valid OAuth credentials."
             )
             return None
 
-    # Check for env var (for cloud deployment)
-    env_creds = os.environ.get("GOOGLE_CREDENTIALS")
-    if env_creds:  # Check if key exists and is not empty
+        # Validate that the file contains valid JSON
         try:
-            # Validate JSON before writing
-            json.loads(env_creds)
-            with open(settings.credentials_file, "w") as f:
-                f.write(env_creds)
-            return settings.credentials_file
-        except (json.JSONDecodeError, TypeError):
+            from_json(content)
+        except ValueError as e:
             logger.error(
-                "GOOGLE_CREDENTIALS environment variable contains invalid JSON/type",
+                f"Credentials file {settings.credentials_file} contains invalid JSON: {e}",
                 exc_info=True,
             )
             return None
-        except OSError as e:
-            logger.error(f"Failed to write credentials file: {e}", exc_info=True)
-            # Don't create invalid file - return None
-            return None
+        _valid_credentials_file["key"] = file_key
+        return settings.credentials_file
 
     return None
 
 
+# GOOGLE_CREDENTIALS parsed once, keyed by the raw environment value
+_env_client_config: dict = {"raw": None, "config": None}
+
+
+def _get_env_client_config() -> dict | None:
+    """Get OAuth client config from the GOOGLE_CREDENTIALS env var.
+
+    The config is used in memory, so cloud deployments never write the
+    client secret to disk.
+
+    Returns:
+        Parsed client config, or None if the env var is unset or invalid.
+    """
+    env_creds = os.environ.get("GOOGLE_CREDENTIALS")
+    if not env_creds:  # Check if key exists and is not empty
+        return None
+    if env_creds == _env_client_config["raw"]:
+        return _env_client_config["config"]
+
+    try:
+        config = from_json(env_creds)
+    except ValueError:
+        logger.error(
+            "GOOGLE_CREDENTIALS environment variable contains invalid JSON/type",
+            exc_info=True,
+        )
+        return None
+    if not isinstance(config, dict):
+        logger.error("GOOGLE_CREDENTIALS environment variable must be a JSON object")
+        return None
+
+    _env_client_config.update(raw=env_creds, config=config)
+    return config
+
+
+def _get_credentials_source() -> str | dict | None:
+    """Get OAuth client credentials - from file, else from env var.
+
+    Returns:
+        Path to a valid credentials file, the parsed client config from
+        GOOGLE_CREDENTIALS, or None if neither is available.
+    """
+    if os.path.exists(settings.credentials_file):
+        return _get_credentials_path()
+    return _get_env_client_config()
+
+
+def has_client_credentials() -> bool:
+    """Check if OAuth client credentials are configured (file or env var)."""
+    return (
+        os.path.exists(settings.credentials_file)
+        or _get_env_client_config() is not None
+    )
+
+
+# Gmail client built for each thread's current credentials. Clients are
+# kept per thread because the underlying httplib2 connection is not
+# thread-safe; Gmail operations run on several worker threads.
+_service_cache = threading.local()
+
+
+def _get_service_for(creds: Credentials):
+    """Get a Gmail API client for creds, reusing this thread's client."""
+    entry = getattr(_service_cache, "entry", None)
+    if entry is not None and entry[0] is creds:
+        return entry[1]
+    # Keep the thread's connection across clients, so new credentials
+    # (e.g. after the token file changes) don't cost a fresh TLS handshake
+    http = getattr(_service_cache, "http", None)
+    if http is None:
+        http = _service_cache.http = build_http()
+    # The discovery document is bundled with googleapiclient; skip its
+    # file cache probe
+    service = build(
+        "gmail",
+        "v1",
+        http=AuthorizedHttp(creds, http=http),
+        cache_discovery=False,
+    )
+    _service_cache.entry = (creds, service)
+    return service
+
+
+# Email address of the signed-in account, stored as (account key, email) so
+# status polls skip the getProfile round trip. Keyed on the refresh token,
+# which survives access token refreshes but changes with a new sign-in.
+_profile_email_cache: dict = {"entry": None}
+
+
+def _get_profile_email(creds: Credentials) -> str:
+    """Get the account email for creds, asking Gmail only on first use."""
+    key = creds.refresh_token or creds.token
+    entry = _profile_email_cache["entry"]
+    if entry is not None and entry[0] == key:
+        return entry[1]
+    service = _get_service_for(creds)
+    profile = service.users().getProfile(userId="me").execute()
+    email = profile.get("emailAddress", "Unknown")
+    _profile_email_cache["entry"] = (key, email)
+    return email
+
+
 def get_gmail_service():
     """Get authenticated Gmail API service.
 
     Returns:
         tuple: (service, error_message) - service is None if auth needed
     """
-    creds = None
+    creds = _get_cached_credentials()
 
-    if os.path.exists(settings.token_file):
-        # Check if token file is empty
-        if _is_file_empty(settings.token_file):
-            logger.error(f"Token file {settings.token_file} is empty")
+    if creds is None and os.path.exists(settings.token_file):
+        try:
+            creds = Credentials.from_authorized_user_file(
+                settings.token_file, settings.scopes
+            )
+            _cache_credentials(creds)
+        except (ValueError, OSError) as e:
+            # Token file is empty, corrupted or invalid
+            logger.warning(f"Failed to load credentials from token file: {e}")
+            # Delete corrupted token file
             try:
                 os.remove(settings.token_file)
             except OSError:
                 pass
             creds = None
-        else:
-            try:
-                creds = Credentials.from_authorized_user_file(
-                    settings.token_file, settings.scopes
-                )
-            except (ValueError, OSError) as e:
-                # Token file is corrupted or invalid
-                logger.warning(f"Failed to load credentials from token file: {e}")
-                # Delete corrupted token file
-                try:
-                    os.remove(settings.token_file)
-                except OSError:
-                    pass
-                creds = None
 
     if not creds or not creds.valid:
         if creds and creds.expired and creds.refresh_token:
@@ -220,16 +483,18 @@ def get_gmail_service():
 
         # If creds is still None or invalid after refresh attempt, trigger OAuth
         if not creds or not creds.valid:
-            # Prevent multiple OAuth attempts (thread-safe check)
-            # Note: Small race condition window, but acceptable for this use case
-            if _auth_in_progress.get("active", False):
+            # Prevent multiple OAuth attempts; the lock is released when the
+            # OAuth thread finishes, or below if sign-in cannot start
+            auth_lock = _auth_lock
+            if not auth_lock.acquire(blocking=False):
                 return (
                     None,
                     "Sign-in already in progress. Please complete the authorization in your browser.",
                 )
 
-            creds_path = _get_credentials_path()
-            if not creds_path:
+            creds_source = _get_credentials_source()
+            if not creds_source:
+                auth_lock.release()
                 # Check if credentials file exists and is empty for more specific error message
                 if os.path.exists(settings.credentials_file) and _is_file_empty(
                     settings.credentials_file
@@ -244,39 +509,37 @@ def get_gmail_service():
                 )
 
             # Start OAuth in background thread so server stays responsive
-            _auth_in_progress["active"] = True
+            creds_label = (
+                creds_source if isinstance(creds_source, str) else "GOOGLE_CREDENTIALS"
+            )
 
             def run_oauth() -> None:
                 try:
                     # Try to create the OAuth flow - this will fail if credentials.json is invalid
                     try:
-                        flow = InstalledAppFlow.from_client_secrets_file(
-                            creds_path, settings.scopes
-                        )
-                    except (
-                        ValueError,
-                        json.JSONDecodeError,
-                        OSError,
-                        FileNotFoundError,
-                    ) as e:
+                        if isinstance(creds_source, dict):
+                            flow = InstalledAppFlow.from_client_config(
+                                creds_source, settings.scopes
+                            )
+                        else:
+                            flow = InstalledAppFlow.from_client_secrets_file(
+                                creds_source, settings.scopes
+                            )
+                    except (ValueError, OSError) as e:
                         # This error happens when loading credentials file - definitely a credentials issue
-                        error_msg = str(e)
+                        # (json.JSONDecodeError is a ValueError, FileNotFoundError an OSError)
                         logger.error(
-                            f"Failed to load credentials file {creds_path}: {e}",
+                            f"Failed to load credentials from {creds_label}: {e}",
                             exc_info=True,
                         )
-                        if (
-                            "Expecting value" in error_msg
-                            or "char 0" in error_msg
-                            or isinstance(e, json.JSONDecodeError)
-                        ):
+                        if isinstance(e, json.JSONDecodeError):
                             print(
                                 "ERROR: credentials.json file is empty or contains invalid JSON. "
                                 "Please check your credentials.json file and ensure it contains valid OAuth credentials."
                             )
                         elif isinstance(e, FileNotFoundError):
                             print(
-                                f"ERROR: credentials.json file not found at {creds_path}. "
+                                f"ERROR: credentials.json file not found at {creds_label}. "
                                 "Please check your credentials.json file path."
                             )
                         else:
@@ -286,9 +549,11 @@ def get_gmail_service():
                             )
                         return  # Exit early - can't proceed without valid credentials
 
+                    web_auth_mode = is_web_auth_mode()
+
                     # For Docker: bind to 0.0.0.0 so callback can reach container
                     # For local: bind to localhost for security
-                    bind_address = "0.0.0.0" if is_web_auth_mode() else "localhost"  # nosec B104
+                    bind_address = "0.0.0.0" if web_auth_mode else "localhost"  # nosec B104
 
                     # Handle custom external port (e.g., Docker port mapping like 18767:8767)
                     # The server listens on the internal port, but the redirect URI uses the external port
@@ -298,35 +563,12 @@ def get_gmail_service():
                         else settings.oauth_port
                     )
 
-                    # Validate port ranges (1-65535)
-                    if not isinstance(settings.oauth_port, int) or not (
-                        1 <= settings.oauth_port <= 65535
-                    ):
-                        raise ValueError(
-                            f"Invalid oauth_port: {settings.oauth_port}. "
-                            "Port must be between 1 and 65535."
-                        )
-                    if not isinstance(redirect_port, int) or not (
-                        1 <= redirect_port <= 65535
-                    ):
-                        raise ValueError(
-                            f"Invalid redirect port: {redirect_port}. "
-                            "Port must be between 1 and 65535."
-                        )
-
                     # Check if we should auto-open browser
                     # In Docker/web mode: don't open browser, print URL to logs
                     # On Windows/Mac/Linux desktop: auto-open browser
-                    if is_web_auth_mode():
-                        open_browser = False
-                    elif platform.system() == "Windows":
-                        open_browser = True
-                    elif platform.system() == "Darwin":  # macOS
-                        open_browser = True
-                    else:  # Linux
-                        open_browser = bool(
-                            shutil.which("xdg-open") or os.environ.get("DISPLAY")
-                        )
+                    open_browser = not web_auth_mode and bool(
+                        _CAN_OPEN_BROWSER or os.environ.get("DISPLAY")
+                    )
 
                     # If external port is different, manually handle OAuth flow
                     # because run_local_server() constructs redirect URI from port parameter
@@ -370,34 +612,26 @@ def get_gmail_service():
                         )
 
                         # Set pending auth URL for web auth mode
-                        if is_web_auth_mode():
+                        if web_auth_mode:
                             state.pending_auth_url["url"] = authorization_url
 
                         # Create a simple HTTP server to handle the callback
-                        callback_event = threading.Event()
-                        callback_lock = threading.Lock()
-                        callback_data: dict = {"code": None, "error": None}
+                        callback_state = OAuthCallbackState()
                         auth_code = None
                         error_message = None
 
-                        # Create handler factory with thread-safe primitives
-                        def handler_factory(*args, **kwargs):
-                            return OAuthCallbackHandler(
-                                callback_event,
-                                callback_lock,
-                                callback_data,
-                                *args,
-                                **kwargs,
-                            )
-
                         # Start the callback server with error handling
                         server = None
+                        server_thread = None
                         try:
                             try:
-                                server = HTTPServer(
+                                # Threaded so a favicon probe cannot hold up
+                                # the callback request itself
+                                server = ThreadingHTTPServer(
                                     (bind_address, settings.oauth_port),
-                                    handler_factory,
+                                    OAuthCallbackHandler,
                                 )
+                                server.callback_state = callback_state
                             except OSError as e:
                                 # Check for port already in use error (platform-independent)
                                 error_str = str(e).lower()
@@ -427,46 +661,24 @@ def get_gmail_service():
                                 except Exception as e:
                                     logger.warning(f"Failed to open browser: {e}")
 
-                            # Wait for the callback (with timeout)
-                            timeout = 300  # 5 minutes
-                            start_time = time.time()
-
-                            # Set socket timeout to allow periodic timeout checks
-                            server.timeout = 1.0  # 1 second timeout for handle_request
-
-                            while not callback_event.is_set():
-                                elapsed = time.time() - start_time
-                                if elapsed > timeout:
-                                    raise TimeoutError(
-                                        f"OAuth authorization timed out after {timeout} seconds. "
-                                        "Please try signing in again."
-                                    )
+                            # Serve callbacks on a worker thread and block until the
+                            # handler signals completion, rather than polling
+                            server_thread = threading.Thread(
+                                target=server.serve_forever, daemon=True
+                            )
+                            server_thread.start()
 
-                                try:
-                                    server.handle_request()
-                                except Exception as e:
-                                    logger.error(
-                                        f"Error handling OAuth callback request: {e}",
-                                        exc_info=True,
-                                    )
-                                    # Continue waiting unless it's a critical error
-                                    error_str = str(e).lower()
-                                    if "address already in use" in error_str or (
-                                        isinstance(e, OSError)
-                                        and hasattr(e, "errno")
-                                        and e.errno in (98, 10048)
-                                    ):
-                                        raise
-
-                                # Wait for callback event with short timeout to allow periodic checks
-                                if not callback_event.wait(timeout=0.1):
-                                    # Timeout - continue loop to check elapsed time
-                                    continue
+                            timeout = 300  # 5 minutes
+                            if not callback_state.event.wait(timeout=timeout):
+                                raise TimeoutError(
+                                    f"OAuth authorization timed out after {timeout} seconds. "
+                                    "Please try signing in again."
+                                )
 
                             # Read callback data under lock
-                            with callback_lock:
-                                auth_code = callback_data["code"]
-                                error_message = callback_data["error"]
+                            with callback_state.lock:
+                                auth_code = callback_state.code
+                                error_message = callback_state.error
 
                             if error_message:
                                 raise ValueError(f"OAuth error: {error_message}")
@@ -493,6 +705,10 @@ def get_gmail_service():
                             # Always close the server, even if an exception occurred
                             if server is not None:
                                 try:
+                                    # shutdown() blocks until serve_forever()
+                                    # returns, so only call it once it runs
+                                    if server_thread is not None:
+                                        server.shutdown()
                                     server.server_close()
                                 except Exception as e:
                                     logger.warning(
@@ -516,16 +732,16 @@ def get_gmail_service():
 
                     # Save token with error handling
                     try:
-                        with open(settings.token_file, "w") as token:
-                            token.write(new_creds.to_json())
+                        _write_token_file(new_creds.to_json())
+                        # Seed the cache so the next auth check skips parsing
+                        _cache_credentials(new_creds)
                         print("OAuth complete! Token saved.")
                     except OSError as e:
                         logger.error(f"Failed to save token file: {e}", exc_info=True)
                         print(f"OAuth completed but failed to save token: {e}")
                         raise  # Re-raise so outer exception handler can log it
-                except (ValueError, json.JSONDecodeError) as e:
+                except (ValueError, json.JSONDecodeError):
                     # JSON parsing errors from OAuth callback (shouldn't happen if credentials were valid)
-                    error_msg = str(e)
                     logger.error(
                         "OAuth callback received empty or invalid response. "
                         "This usually means the authorization was cancelled or the callback URL is incorrect.",
@@ -582,22 +798,28 @@ def get_gmail_service():
                         print(f"OAuth error: {e}")
                 finally:
                     # Always reset auth state, even on error
-                    _auth_in_progress["active"] = False
                     state.pending_auth_url["url"] = None
                     with state.oauth_state_lock:
                         state.oauth_state["state"] = None
+                    auth_lock.release()
 
             oauth_thread = threading.Thread(target=run_oauth, daemon=True)
-            oauth_thread.start()
+            try:
+                oauth_thread.start()
+            except RuntimeError:
+                auth_lock.release()
+                raise
 
             return (
                 None,
                 "Sign-in started. Please complete authorization in your browser.",
             )
 
+    _refresh_if_stale(creds)
+
     # Build Gmail service - handle potential errors
     try:
-        service = build("gmail", "v1", credentials=creds)
+        service = _get_service_for(creds)
     except Exception as e:
         logger.error(f"Failed to build Gmail service: {e}", exc_info=True)
         # Return error instead of crashing
@@ -607,8 +829,7 @@ def get_gmail_service():
         )
 
     try:
-        profile = service.users().getProfile(userId="me").execute()
-        state.current_user["email"] = profile.get("emailAddress", "Unknown")
+        state.current_user["email"] = _get_profile_email(creds)
         state.current_user["logged_in"] = True
     except Exception:
         state.current_user["email"] = "Unknown"
@@ -621,6 +842,13 @@ def sign_out() -> dict:
     """Sign out by removing the token file."""
     if os.path.exists(settings.token_file):
         os.remove(settings.token_file)
+    _creds_cache["entry"] = None
+    _profile_email_cache["entry"] = None
+    # The delete scan cache holds this account's senders and subjects
+    try:
+        os.remove(settings.delete_scan_cache_file)
+    except OSError:
+        pass
 
     # Reset state
     state.current_user = {"email": None, "logged_in": False}
@@ -638,46 +866,38 @@ def sign_out() -> dict:
 
 def check_login_status() -> dict:
     """Check if user is logged in and get their email."""
-    if os.path.exists(settings.token_file):
-        # Check if token file is empty
-        if _is_file_empty(settings.token_file):
-            logger.error(f"Token file {settings.token_file} is empty")
-            try:
-                os.remove(settings.token_file)
-            except OSError:
-                pass
-        else:
-            try:
+    # Status is polled; reuse parsed credentials while the token file is unchanged
+    creds = _get_cached_credentials()
+    if creds is not None or os.path.exists(settings.token_file):
+        # An empty token file fails to parse and is cleared below
+        try:
+            if creds is None:
                 creds = Credentials.from_authorized_user_file(
                     settings.token_file, settings.scopes
                 )
-                if creds and creds.valid:
-                    service = build("gmail", "v1", credentials=creds)
-                    profile = service.users().getProfile(userId="me").execute()
-                    state.current_user["email"] = profile.get("emailAddress", "Unknown")
+                _cache_credentials(creds)
+            if creds and creds.valid:
+                _refresh_if_stale(creds)
+                state.current_user["email"] = _get_profile_email(creds)
+                state.current_user["logged_in"] = True
+                return state.current_user.copy()
+            elif creds and creds.expired and creds.refresh_token:
+                refreshed_creds = _try_refresh_creds(creds)
+                if refreshed_creds:
+                    state.current_user["email"] = _get_profile_email(refreshed_creds)
                     state.current_user["logged_in"] = True
                     return state.current_user.copy()
-                elif creds and creds.expired and creds.refresh_token:
-                    refreshed_creds = _try_refresh_creds(creds)
-                    if refreshed_creds:
-                        service = build("gmail", "v1", credentials=refreshed_creds)
-                        profile = service.users().getProfile(userId="me").execute()
-                        state.current_user["email"] = profile.get(
-                            "emailAddress", "Unknown"
-                        )
-                        state.current_user["logged_in"] = True
-                        return state.current_user.copy()
-            except (ValueError, OSError) as e:
-                # Token file is invalid/corrupted
-                logger.warning(f"Failed to load or refresh credentials: {e}")
-                # Clear corrupted token file
-                try:
-                    os.remove(settings.token_file)
-                except OSError:
-                    pass
-            except Exception as e:
-                # API errors, network issues, etc.
-                logger.error(f"Error checking login status: {e}", exc_info=True)
+        except (ValueError, OSError) as e:
+            # Token file is invalid/corrupted
+            logger.warning(f"Failed to load or refresh credentials: {e}")
+            # Clear corrupted token file
+            try:
+                os.remove(settings.token_file)
+            except OSError:
+                pass
+        except Exception as e:
+            # API errors, network issues, etc.
+            logger.error(f"Error checking login status: {e}", exc_info=True)
 
     state.current_user["email"] = None
     state.current_user["logged_in"] = False
@@ -4,206 +4,198 @@ OAuth Callback Handlers
 HTTP request handlers for OAuth2 callback processing.
 """
 
+import hmac
 import logging
 from http.server import BaseHTTPRequestHandler
 from threading import Event, Lock
-from urllib.parse import parse_qs, urlparse
+from urllib.parse import parse_qsl, urlparse
 
 from app.core import state
 
 logger = logging.getLogger(__name__)
 
+# Query parameters read from the OAuth redirect
+_CALLBACK_PARAMS = frozenset({"code", "state", "error", "error_description"})
+# Google's redirect carries fewer than ten parameters
+_MAX_QUERY_FIELDS = 32
+
+# Response pages, built once rather than on every callback
+_HTML_ALREADY_PROCESSED = b"<html><body><h1>Callback already processed</h1><p>You can close this window.</p></body></html>"
+_HTML_STATE_MISMATCH = b"<html><body><h1>Security Error</h1><p>Authentication state mismatch. Please try signing in again.</p></body></html>"
+_HTML_SUCCESS = b"<html><body><h1>Authentication successful!</h1><p>You can close this window.</p></body></html>"
+_HTML_EMPTY_CODE = b"<html><body><h1>Invalid request - empty authorization code</h1><p>You can close this window.</p></body></html>"
+_HTML_AUTH_FAILED = b"<html><body><h1>Authentication failed!</h1><p>You can close this window.</p></body></html>"
+_HTML_EMPTY_ERROR = b"<html><body><h1>Invalid request - empty error parameter</h1><p>You can close this window.</p></body></html>"
+_HTML_INVALID_REQUEST = b"<html><body><h1>Invalid request</h1><p>You can close this window.</p></body></html>"
+
+
+class OAuthCallbackState:
+    """Outcome of an OAuth callback, shared by the handler and the OAuth flow.
+
+    Attach an instance to the callback server as ``server.callback_state``
+    before serving requests.
+    """
+
+    __slots__ = ("event", "lock", "code", "error")
+
+    def __init__(self):
+        self.event = Event()
+        self.lock = Lock()
+        self.code: str | None = None
+        self.error: str | None = None
+
 
 class OAuthCallbackHandler(BaseHTTPRequestHandler):
     """HTTP request handler for OAuth2 callback processing.
 
     This handler processes OAuth2 callbacks, validates CSRF state tokens,
-    and communicates results back to the main OAuth flow via thread-safe
-    primitives.
-
-    Args:
-        callback_event: Threading event to signal callback completion
-        callback_lock: Threading lock to protect shared callback data
-        callback_data: Dictionary to store callback results (code/error)
+    and reports results back to the main OAuth flow through the
+    OAuthCallbackState attached to its server.
     """
 
-    def __init__(
-        self,
-        callback_event: Event,
-        callback_lock: Lock,
-        callback_data: dict,
-        *args,
-        **kwargs,
-    ):
-        """Initialize the handler with thread-safe callback primitives."""
-        self.callback_event = callback_event
-        self.callback_lock = callback_lock
-        self.callback_data = callback_data
-        super().__init__(*args, **kwargs)
+    # Buffer writes so headers and body go out together when the request ends
+    wbufsize = -1
+
+    def setup(self):
+        """Bind the server's shared callback state before handling."""
+        super().setup()
+        self.callback_state: OAuthCallbackState = self.server.callback_state
+
+    def _send_html(self, status: int, body: bytes) -> None:
+        """Send a complete HTML response with an explicit Content-Length."""
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
 
     def do_GET(self):
         """Handle GET request for OAuth callback."""
+        # The redirect URI is "/", so anything else (e.g. a browser's
+        # /favicon.ico probe) is answered without parsing or locking
+        if self.path != "/" and not self.path.startswith("/?"):
+            self.send_response(204)
+            self.end_headers()
+            return
+
         # Prevent processing multiple callbacks
-        with self.callback_lock:
-            if self.callback_event.is_set():
-                self.send_response(200)
-                self.send_header("Content-type", "text/html")
-                self.end_headers()
-                self.wfile.write(
-                    b"<html><body><h1>Callback already processed</h1><p>You can close this window.</p></body></html>"
-                )
+        with self.callback_state.lock:
+            if self.callback_state.event.is_set():
+                self._send_html(200, _HTML_ALREADY_PROCESSED)
                 return
 
-        parsed_url = urlparse(self.path)
-        query_params = parse_qs(parsed_url.query)
+        # Keep only the first value of the parameters we use; cap the
+        # number of fields so an oversized query is rejected cheaply
+        params: dict[str, str] = {}
+        try:
+            for key, value in parse_qsl(
+                urlparse(self.path).query, max_num_fields=_MAX_QUERY_FIELDS
+            ):
+                if key in _CALLBACK_PARAMS and key not in params:
+                    params[key] = value
+        except ValueError:
+            self._send_html(400, _HTML_INVALID_REQUEST)
+            return
 
         # Verify OAuth state for CSRF protection
         with state.oauth_state_lock:
             stored_state = state.oauth_state.get("state")
-        incoming_state = None
-        if "state" in query_params:
-            state_list = query_params["state"]
-            if state_list and len(state_list) > 0:
-                incoming_state = state_list[0]
+        incoming_state = params.get("state")
 
         # Verify state matches stored state
         if stored_state is None:
             logger.error(
                 "OAuth callback received but no stored state found - possible CSRF attack or state expired"
             )
-            with self.callback_lock:
-                self.callback_data["error"] = (
-                    "OAuth callback received but no stored state found - possible CSRF attack or state expired"
-                )
+            with self.callback_state.lock:
+                self.callback_state.error = "OAuth callback received but no stored state found - possible CSRF attack or state expired"
                 # Clear state on security error
                 with state.oauth_state_lock:
                     state.oauth_state["state"] = None
-                self.callback_event.set()
-            self.send_response(403)
-            self.send_header("Content-type", "text/html")
-            self.end_headers()
-            self.wfile.write(
-                b"<html><body><h1>Security Error</h1><p>Authentication state mismatch. Please try signing in again.</p></body></html>"
-            )
+                self.callback_state.event.set()
+            self._send_html(403, _HTML_STATE_MISMATCH)
             return
 
         if incoming_state is None:
             logger.error(
                 "OAuth callback missing state parameter - possible CSRF attack or malformed request"
             )
-            with self.callback_lock:
-                self.callback_data["error"] = (
-                    "OAuth callback missing state parameter - possible CSRF attack or malformed request"
-                )
+            with self.callback_state.lock:
+                self.callback_state.error = "OAuth callback missing state parameter - possible CSRF attack or malformed request"
                 # Clear state on security error
                 with state.oauth_state_lock:
                     state.oauth_state["state"] = None
-                self.callback_event.set()
-            self.send_response(403)
-            self.send_header("Content-type", "text/html")
-            self.end_headers()
-            self.wfile.write(
-                b"<html><body><h1>Security Error</h1><p>Authentication state mismatch. Please try signing in again.</p></body></html>"
-            )
+                self.callback_state.event.set()
+            self._send_html(403, _HTML_STATE_MISMATCH)
             return
 
-        if incoming_state != stored_state:
+        # Constant-time comparison so response timing leaks nothing about the state
+        if not hmac.compare_digest(
+            stored_state.encode("utf-8"), incoming_state.encode("utf-8")
+        ):
             logger.error(
                 "OAuth state mismatch - possible CSRF attack. "
                 "Expected: %s..., Received: %s...",
                 stored_state[:20] if len(stored_state) > 20 else stored_state,
                 incoming_state[:20] if len(incoming_state) > 20 else incoming_state,
             )
-            with self.callback_lock:
-                self.callback_data["error"] = (
+            with self.callback_state.lock:
+                self.callback_state.error = (
                     "OAuth state mismatch - possible CSRF attack"
                 )
                 # Clear state on security error to prevent reuse
                 with state.oauth_state_lock:
                     state.oauth_state["state"] = None
-                self.callback_event.set()
-            self.send_response(403)
-            self.send_header("Content-type", "text/html")
-            self.end_headers()
-            self.wfile.write(
-                b"<html><body><h1>Security Error</h1><p>Authentication state mismatch. Please try signing in again.</p></body></html>"
-            )
+                self.callback_state.event.set()
+            self._send_html(403, _HTML_STATE_MISMATCH)
             return
 
-        if "code" in query_params:
-            code_list = query_params["code"]
-            if code_list and len(code_list) > 0:
-                with self.callback_lock:
-                    self.callback_data["code"] = code_list[0]
+        if "code" in params:
+            if params["code"]:
+                with self.callback_state.lock:
+                    self.callback_state.code = params["code"]
                     # Clear OAuth state after successful verification
                     with state.oauth_state_lock:
                         state.oauth_state["state"] = None
-                    self.callback_event.set()
-                self.send_response(200)
-                self.send_header("Content-type", "text/html")
-                self.end_headers()
-                self.wfile.write(
-                    b"<html><body><h1>Authentication successful!</h1><p>You can close this window.</p></body></html>"
-                )
+                    self.callback_state.event.set()
+                self._send_html(200, _HTML_SUCCESS)
             else:
                 # Empty code parameter - invalid request
-                with self.callback_lock:
-                    self.callback_data["error"] = "Empty authorization code"
-                    self.callback_data["code"] = None
+                with self.callback_state.lock:
+                    self.callback_state.error = "Empty authorization code"
+                    self.callback_state.code = None
                     with state.oauth_state_lock:
                         state.oauth_state["state"] = None
-                    self.callback_event.set()
+                    self.callback_state.event.set()
                 logger.warning("OAuth callback received empty code parameter")
-                self.send_response(400)
-                self.send_header("Content-type", "text/html")
-                self.end_headers()
-                self.wfile.write(
-                    b"<html><body><h1>Invalid request - empty authorization code</h1><p>You can close this window.</p></body></html>"
-                )
-        elif "error" in query_params:
-            error_list = query_params["error"]
-            if error_list and len(error_list) > 0:
-                error_message = error_list[0]
-                error_description = query_params.get("error_description", [""])
-                error_description = error_description[0] if error_description else ""
-                with self.callback_lock:
-                    self.callback_data["error"] = error_message + (
+                self._send_html(400, _HTML_EMPTY_CODE)
+        elif "error" in params:
+            if params["error"]:
+                error_message = params["error"]
+                error_description = params.get("error_description", "")
+                with self.callback_state.lock:
+                    self.callback_state.error = error_message + (
                         f" - {error_description}" if error_description else ""
                     )
                     # Clear OAuth state on error
                     with state.oauth_state_lock:
                         state.oauth_state["state"] = None
-                    self.callback_event.set()
+                    self.callback_state.event.set()
                 logger.error(
                     f"OAuth callback error: {error_message}"
                     + (f" - {error_description}" if error_description else "")
                 )
-                self.send_response(400)
-                self.send_header("Content-type", "text/html")
-                self.end_headers()
-                self.wfile.write(
-                    b"<html><body><h1>Authentication failed!</h1><p>You can close this window.</p></body></html>"
-                )
+                self._send_html(400, _HTML_AUTH_FAILED)
             else:
                 # Empty error parameter - invalid request
-                with self.callback_lock:
-                    self.callback_data["error"] = "Empty error parameter received"
-                    self.callback_data["code"] = None
+                with self.callback_state.lock:
+                    self.callback_state.error = "Empty error parameter received"
+                    self.callback_state.code = None
                     with state.oauth_state_lock:
                         state.oauth_state["state"] = None
-                    self.callback_event.set()
+                    self.callback_state.event.set()
                 logger.warning("OAuth callback received empty error parameter")
-                self.send_response(400)
-                self.send_header("Content-type", "text/html")
-                self.end_headers()
-                self.wfile.write(
-                    b"<html><body><h1>Invalid request - empty error parameter</h1><p>You can close this window.</p></body></html>"
-                )
+                self._send_html(400, _HTML_EMPTY_ERROR)
         else:
             # Invalid request - don't mark as received to allow retry
-            self.send_response(400)
-            self.send_header("Content-type", "text/html")
-            self.end_headers()
-            self.wfile.write(
-                b"<html><body><h1>Invalid request</h1><p>You can close this window.</p></body></html>"
-            )
+            self._send_html(400, _HTML_INVALID_REQUEST)
@@ -4,11 +4,13 @@ Gmail Service Module
 Core Gmail operations: scanning, unsubscribing, marking read, deleting.
 
 This module is split into multiple files for better organization:
-- helpers.py: Security, filters, and email parsing utilities
+- helpers.py: Security, filters, searching, and email parsing utilities
 - scan.py: Email scanning operations
 - unsubscribe.py: Unsubscribe operations
 - mark_read.py: Mark as read operations
 - delete.py: Delete operations
+- delete_cache.py: On-disk cache for delete scans
+- rate_limit.py: Client-side quota rate limiting
 - download.py: Email download operations
 - labels.py: Label management operations
 - archive.py: Archive operations
@@ -19,6 +21,10 @@ This module is split into multiple files for better organization:
 from app.services.auth import get_gmail_service
 from app.services.gmail.helpers import (
     build_gmail_query,
+    build_sender_queries,
+    index_headers,
+    iter_message_ids,
+    list_message_ids,
     validate_unsafe_url,
     get_unsubscribe_from_headers,
     get_sender_info,
@@ -95,6 +101,10 @@ __all__ = [
     "get_download_status",
     # Helpers
     "build_gmail_query",
+    "build_sender_queries",
+    "index_headers",
+    "iter_message_ids",
+    "list_message_ids",
     "validate_unsafe_url",
     # Important
     "get_important_status",
@@ -7,12 +7,42 @@ Functions for archiving emails (removing from inbox).
 import time
 import logging
 
+from googleapiclient.errors import HttpError
+
 from app.core import state
 from app.services.auth import get_gmail_service
-from app.services.gmail.error_handler import handle_gmail_errors
+from app.services.gmail.error_handler import get_retry_after, handle_gmail_errors
+from app.services.gmail.helpers import list_message_ids
+from app.services.gmail.rate_limit import BATCH_MODIFY_COST, gmail_rate_limiter
 
 logger = logging.getLogger(__name__)
 
+# How often a rate-limited batchModify is retried after the server's
+# Retry-After delay, and the longest delay we are willing to wait
+_MAX_RATE_LIMIT_RETRIES = 3
+_MAX_RETRY_AFTER = 60.0
+
+
+def _archive_batch(messages_api, batch_ids: list[str]) -> None:
+    """Remove the INBOX label from one batch, waiting out rate limits."""
+    for attempt in range(_MAX_RATE_LIMIT_RETRIES + 1):
+        gmail_rate_limiter.acquire(BATCH_MODIFY_COST)
+        try:
+            messages_api.batchModify(
+                userId="me", body={"ids": batch_ids, "removeLabelIds": ["INBOX"]}
+            ).execute()
+            return
+        except HttpError as e:
+            retry_after = get_retry_after(e)
+            if (
+                retry_after is None
+                or retry_after > _MAX_RETRY_AFTER
+                or attempt == _MAX_RATE_LIMIT_RETRIES
+            ):
+                raise
+            logger.warning(f"Archive rate limited, retrying in {retry_after}s")
+            time.sleep(retry_after)
+
 
 @handle_gmail_errors
 def archive_emails_background(senders: list[str]):
@@ -36,6 +66,7 @@ def archive_emails_background(senders: list[str]):
             return
 
         total_archived = 0
+        messages_api = service.users().messages()
 
         for i, sender in enumerate(senders):
             state.archive_status["current_sender"] = i + 1
@@ -43,40 +74,21 @@ def archive_emails_background(senders: list[str]):
             state.archive_status["progress"] = int((i / len(senders)) * 100)
 
             # Find all emails from this sender in INBOX
-            query = f"from:{sender} in:inbox"
-            message_ids = []
-            page_token = None
-
-            while True:
-                result = (
-                    service.users()
-                    .messages()
-                    .list(userId="me", q=query, maxResults=500, pageToken=page_token)
-                    .execute()
-                )
-
-                messages = result.get("messages", [])
-                message_ids.extend([m["id"] for m in messages])
-
-                page_token = result.get("nextPageToken")
-                if not page_token:
-                    break
+            # Collected before archiving, since archiving removes messages
+            # from the results being paged through
+            message_ids = list_message_ids(service, f"from:{sender} in:inbox")
 
             if not message_ids:
                 continue
 
-            # Archive in batches (remove INBOX label)
-            for j in range(0, len(message_ids), 100):
-                batch_ids = message_ids[j : j + 100]
-                service.users().messages().batchModify(
-                    userId="me", body={"ids": batch_ids, "removeLabelIds": ["INBOX"]}
-                ).execute()
+            # Archive in batches (remove INBOX label); batchModify takes up
+            # to 1000 IDs per call
+            batch_size = 1000
+            for j in range(0, len(message_ids), batch_size):
+                batch_ids = message_ids[j : j + batch_size]
+                _archive_batch(messages_api, batch_ids)
                 total_archived += len(batch_ids)
 
-                # Throttle every 500 emails (check at 100, 600, 1100, etc.)
-                if (j + 100) % 500 == 0:
-                    time.sleep(0.5)
-
         state.archive_status["progress"] = 100
         state.archive_status["done"] = True
         state.archive_status["archived_count"] = total_archived
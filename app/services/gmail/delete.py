@@ -7,21 +7,100 @@ Functions for deleting emails and scanning senders.
 import logging
 import re
 import time
-from collections import defaultdict
+from concurrent.futures import as_completed
+from operator import attrgetter
 from typing import Optional
 
-from app.core import state
+from googleapiclient.errors import HttpError
+
+from app.core import settings, state
 from app.core.exceptions import GmailCleanerError
+from app.core.tasks import fanout_executor
 from app.services.auth import get_gmail_service
+from app.services.gmail.delete_cache import (
+    fetch_history_changes,
+    load_scan_cache,
+    save_scan_cache,
+)
 from app.services.gmail.error_handler import handle_gmail_errors
-from app.services.gmail.helpers import build_gmail_query, get_sender_info, get_subject
+from app.services.gmail.helpers import (
+    MESSAGE_ID_FIELDS,
+    build_gmail_query,
+    build_sender_queries,
+    get_sender_info,
+    get_subject,
+    index_headers,
+    list_message_ids,
+)
+from app.services.gmail.rate_limit import (
+    BATCH_MODIFY_COST,
+    GET_COST,
+    LIST_COST,
+    gmail_rate_limiter,
+)
 
 logger = logging.getLogger(__name__)
 
+# Valid sender formats for delete_emails_by_sender
+# Email format: user@domain.tld
+_EMAIL_RE = re.compile(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$")
+# Domain format: domain.tld (at least one dot, valid domain structure)
+_DOMAIN_RE = re.compile(
+    r"^[a-zA-Z0-9]([a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?(\.[a-zA-Z0-9]([a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?)*\.[a-zA-Z]{2,}$"
+)
+
+# Seconds before a whole-mailbox delete scan started that the bulk delete
+# still searches, when reusing the scan's message IDs
+_SCAN_REUSE_OVERLAP = 300
+# Oldest delete scan (seconds) whose message IDs a bulk delete still trusts;
+# mail deleted elsewhere since then would make its batches fail
+_SCAN_REUSE_MAX_AGE = 15 * 60
+
+
+class SenderData:
+    """Memory-efficient per-sender totals for the delete scan."""
+
+    __slots__ = (
+        "email",
+        "count",
+        "sender",
+        "subjects",
+        "first_date",
+        "last_date",
+        "message_ids",
+        "total_size",
+    )
+
+    def __init__(self, email: str):
+        self.email: str = email
+        self.count: int = 0
+        self.sender: str = ""
+        self.subjects: list[str] = []
+        self.first_date: Optional[str] = None
+        self.last_date: Optional[str] = None
+        self.message_ids: list[str] = []
+        self.total_size: int = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "email": self.email,
+            "count": self.count,
+            "sender": self.sender,
+            "subjects": self.subjects,
+            "first_date": self.first_date,
+            "last_date": self.last_date,
+            "message_ids": self.message_ids,
+            "total_size": self.total_size,
+        }
+
 
 @handle_gmail_errors
 def scan_senders_for_delete(limit: int = 1000, filters: Optional[dict] = None):
-    """Scan emails and group by sender for bulk delete."""
+    """Scan emails and group by sender for bulk delete.
+
+    Whole-mailbox scans are cached on disk; when a cached scan fits within
+    limit, only the changes since then are fetched.
+    """
     # Validate input
     if limit <= 0:
         state.reset_delete_scan()
@@ -39,33 +118,45 @@ def scan_senders_for_delete(limit: int = 1000, filters: Optional[dict] = None):
         return
 
     try:
-        state.delete_scan_status["message"] = "Fetching emails..."
-
+        scan_started = time.time()
         query = build_gmail_query(filters)
+        messages_api = service.users().messages()
 
-        results = (
-            service.users()
-            .messages()
-            .list(userId="me", maxResults=min(limit, 500), q=query or None)
-            .execute()
-        )
+        # Only unfiltered scans can cover the whole mailbox and be cached.
+        # The profile is read before listing, so its history ID predates
+        # anything the scan might miss.
+        profile = _get_profile(service) if not query else None
+        if profile and _scan_from_cache(service, profile, limit, scan_started):
+            return
+
+        state.delete_scan_status["message"] = "Fetching emails..."
+
+        gmail_rate_limiter.acquire(LIST_COST)
+        results = messages_api.list(
+            userId="me",
+            maxResults=min(limit, 500),
+            q=query or None,
+            fields=MESSAGE_ID_FIELDS,
+        ).execute()
 
         messages = results.get("messages", [])
 
         while "nextPageToken" in results and len(messages) < limit:
-            results = (
-                service.users()
-                .messages()
-                .list(
-                    userId="me",
-                    maxResults=min(limit - len(messages), 500),
-                    pageToken=results["nextPageToken"],
-                    q=query or None,
-                )
-                .execute()
-            )
+            gmail_rate_limiter.acquire(LIST_COST)
+            results = messages_api.list(
+                userId="me",
+                maxResults=min(limit - len(messages), 500),
+                pageToken=results["nextPageToken"],
+                q=query or None,
+                fields=MESSAGE_ID_FIELDS,
+            ).execute()
             messages.extend(results.get("messages", []))
 
+        # Without filters or truncation every message was listed, so each
+        # sender's IDs are complete as of scan_started
+        covers_mailbox = (
+            not query and "nextPageToken" not in results and len(messages) <= limit
+        )
         messages = messages[:limit]
         total = len(messages)
 
@@ -76,92 +167,16 @@ def scan_senders_for_delete(limit: int = 1000, filters: Optional[dict] = None):
 
         state.delete_scan_status["message"] = f"Scanning {total} emails..."
 
-        # Group by sender using Gmail Batch API
-        sender_counts: dict[str, dict] = defaultdict(
-            lambda: {
-                "count": 0,
-                "sender": "",
-                "email": "",
-                "subjects": [],
-                "first_date": None,
-                "last_date": None,
-                "message_ids": [],
-                "total_size": 0,
-            }
-        )
-        processed = 0
-        batch_size = 100
-
-        def process_message(request_id, response, exception) -> None:
-            nonlocal processed
-            processed += 1
-
-            if exception:
-                return
-
-            headers = response.get("payload", {}).get("headers", [])
-            sender_name, sender_email = get_sender_info(headers)
-            subject = get_subject(headers)
-            msg_id = response.get("id", "")
-            size_estimate = response.get("sizeEstimate", 0)
-
-            # Extract date from headers
-            email_date = None
-            for header in headers:
-                if header["name"].lower() == "date":
-                    email_date = header["value"]
-                    break
-
-            if sender_email:
-                sender_counts[sender_email]["count"] += 1
-                sender_counts[sender_email]["sender"] = sender_name
-                sender_counts[sender_email]["email"] = sender_email
-                sender_counts[sender_email]["message_ids"].append(msg_id)
-                sender_counts[sender_email]["total_size"] += size_estimate
-                if len(sender_counts[sender_email]["subjects"]) < 3:
-                    sender_counts[sender_email]["subjects"].append(subject)
-
-                # Track first and last dates
-                if email_date:
-                    if sender_counts[sender_email]["first_date"] is None:
-                        sender_counts[sender_email]["first_date"] = email_date
-                    sender_counts[sender_email]["last_date"] = email_date
-
-        # Execute batch requests
-        for i in range(0, len(messages), batch_size):
-            batch_ids = messages[i : i + batch_size]
-            batch = service.new_batch_http_request(callback=process_message)
-
-            for msg_data in batch_ids:
-                batch.add(
-                    service.users()
-                    .messages()
-                    .get(
-                        userId="me",
-                        id=msg_data["id"],
-                        format="metadata",
-                        metadataHeaders=["From", "Subject", "Date"],
-                    )
-                )
-
-            batch.execute()
-
-            progress = int((i + len(batch_ids)) / total * 100)
-            state.delete_scan_status["progress"] = progress
-            state.delete_scan_status["message"] = f"Scanned {processed}/{total} emails"
-
-            # Rate limiting
-            if (i // batch_size + 1) % 5 == 0:
-                time.sleep(0.3)
-
-        # Sort by count
-        sorted_senders = sorted(
-            [{"email": k, **v} for k, v in sender_counts.items()],
-            key=lambda x: x["count"],
-            reverse=True,
+        records, fetched_all = _fetch_message_records(
+            service, [msg["id"] for msg in messages]
         )
+        covers_mailbox = covers_mailbox and fetched_all
 
+        sorted_senders = _aggregate_senders(records)
         state.delete_scan_results = sorted_senders
+        state.delete_scan_complete_at = scan_started if covers_mailbox else None
+        if covers_mailbox and profile:
+            save_scan_cache(profile["emailAddress"], profile["historyId"], records)
         state.delete_scan_status["message"] = f"Found {len(sorted_senders)} senders"
         state.delete_scan_status["done"] = True
 
@@ -170,6 +185,155 @@ def scan_senders_for_delete(limit: int = 1000, filters: Optional[dict] = None):
         state.delete_scan_status["done"] = True
 
 
+def _get_profile(service) -> dict | None:
+    """Get the account's email and current history ID, or None."""
+    try:
+        profile = service.users().getProfile(userId="me").execute()
+    except Exception:
+        logger.warning("Could not read Gmail profile; scan will not be cached")
+        return None
+    if not profile.get("emailAddress") or not profile.get("historyId"):
+        return None
+    return profile
+
+
+def _scan_from_cache(service, profile: dict, limit: int, scan_started: float) -> bool:
+    """Bring a cached whole-mailbox scan up to date and publish it.
+
+    Returns:
+        True if results were published, False if a full scan is needed.
+    """
+    cache = load_scan_cache(profile["emailAddress"])
+    if cache is None or len(cache["records"]) > limit:
+        return False
+
+    state.delete_scan_status["message"] = "Checking for changes since last scan..."
+    try:
+        added, removed, history_id = fetch_history_changes(service, cache["history_id"])
+    except HttpError as e:
+        if e.resp.status == 404:
+            return False  # History no longer available; rescan
+        raise
+
+    records = cache["records"]
+    if removed:
+        records = [r for r in records if r[0] not in removed]
+    known = {r[0] for r in records}
+    new_ids = [msg_id for msg_id in added if msg_id not in known]
+    if len(records) + len(new_ids) > limit:
+        return False  # A fresh scan would stop at limit
+
+    new_records, fetched_all = _fetch_message_records(service, new_ids)
+    # History lists the oldest change first; scans are newest first
+    new_records.reverse()
+    records = new_records + records
+
+    sorted_senders = _aggregate_senders(records)
+    state.delete_scan_results = sorted_senders
+    state.delete_scan_complete_at = scan_started if fetched_all else None
+    if fetched_all:
+        save_scan_cache(profile["emailAddress"], history_id, records)
+    state.delete_scan_status["progress"] = 100
+    state.delete_scan_status["message"] = (
+        f"Found {len(sorted_senders)} senders ({len(new_ids)} new emails since last scan)"
+    )
+    state.delete_scan_status["done"] = True
+    return True
+
+
+def _fetch_message_records(service, message_ids: list[str]) -> tuple[list, bool]:
+    """Fetch sender, subject, date and size for messages via the Batch API.
+
+    Returns:
+        tuple: (records as [id, sender_name, sender_email, subject, date,
+        size] lists in request order, True if every message was fetched)
+    """
+    records = []
+    fetched_all = True
+    processed = 0
+    total = len(message_ids)
+    batch_size = 100
+
+    def process_message(request_id, response, exception) -> None:
+        nonlocal processed, fetched_all
+        processed += 1
+
+        if exception:
+            fetched_all = False
+            return
+
+        headers = index_headers(response.get("payload", {}).get("headers", []))
+        sender_name, sender_email = get_sender_info(headers)
+        records.append(
+            [
+                response.get("id", ""),
+                sender_name,
+                sender_email,
+                get_subject(headers),
+                headers.get("date"),
+                response.get("sizeEstimate", 0),
+            ]
+        )
+
+    # Execute batch requests
+    messages_api = service.users().messages()
+    for i in range(0, total, batch_size):
+        batch_ids = message_ids[i : i + batch_size]
+        batch = service.new_batch_http_request(callback=process_message)
+
+        for msg_id in batch_ids:
+            gmail_rate_limiter.acquire(GET_COST)
+            batch.add(
+                messages_api.get(
+                    userId="me",
+                    id=msg_id,
+                    format="metadata",
+                    metadataHeaders=["From", "Subject", "Date"],
+                    # Only what process_message reads
+                    fields="id,sizeEstimate,payload/headers",
+                )
+            )
+
+        batch.execute()
+
+        progress = int((i + len(batch_ids)) / total * 100)
+        state.delete_scan_status["progress"] = progress
+        state.delete_scan_status["message"] = f"Scanned {processed}/{total} emails"
+
+    return records, fetched_all
+
+
+def _aggregate_senders(records: list) -> list[dict]:
+    """Total message records per sender, most emails first."""
+    sender_counts: dict[str, SenderData] = {}
+    get_sender_data = sender_counts.get
+
+    for msg_id, sender_name, sender_email, subject, email_date, size in records:
+        if not sender_email:
+            continue
+        data = get_sender_data(sender_email)
+        if data is None:
+            data = sender_counts[sender_email] = SenderData(sender_email)
+        data.count += 1
+        data.sender = sender_name
+        data.message_ids.append(msg_id)
+        data.total_size += size
+        subjects = data.subjects
+        if len(subjects) < 3:
+            subjects.append(subject)
+
+        # Track first and last dates
+        if email_date:
+            if data.first_date is None:
+                data.first_date = email_date
+            data.last_date = email_date
+
+    # Sort by count
+    ranked = list(sender_counts.values())
+    ranked.sort(key=attrgetter("count"), reverse=True)
+    return [data.to_dict() for data in ranked]
+
+
 def get_delete_scan_status() -> dict:
     """Get delete scan status."""
     return state.delete_scan_status.copy()
@@ -180,8 +344,25 @@ def get_delete_scan_results() -> list:
     return state.delete_scan_results.copy()
 
 
+def _remove_cached_senders(senders) -> None:
+    """Drop senders from the cached delete scan results in one pass."""
+    removed = set(senders)
+    if removed:
+        state.delete_scan_results = [
+            r for r in state.delete_scan_results if r.get("email") not in removed
+        ]
+
+
 def delete_emails_by_sender(sender: str) -> dict:
     """Delete all emails from a specific sender."""
+    result = _delete_sender_emails(sender)
+    if result["deleted"]:
+        _remove_cached_senders([sender.strip()])
+    return result
+
+
+def _delete_sender_emails(sender: str) -> dict:
+    """Move a sender's emails to trash without touching the scan cache."""
     if not sender or not sender.strip():
         return {
             "success": False,
@@ -192,12 +373,7 @@ def delete_emails_by_sender(sender: str) -> dict:
 
     # Validate sender format - must be a valid email address or domain
     sender = sender.strip()
-    # Email format: user@domain.tld
-    email_pattern = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
-    # Domain format: domain.tld (at least one dot, valid domain structure)
-    domain_pattern = r"^[a-zA-Z0-9]([a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?(\.[a-zA-Z0-9]([a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?)*\.[a-zA-Z]{2,}$"
-
-    if not (re.match(email_pattern, sender) or re.match(domain_pattern, sender)):
+    if not (_EMAIL_RE.match(sender) or _DOMAIN_RE.match(sender)):
         return {
             "success": False,
             "deleted": 0,
@@ -219,26 +395,22 @@ def delete_emails_by_sender(sender: str) -> dict:
     try:
         # Find all emails from sender
         query = f"from:{sender}"
-        results = (
-            service.users()
-            .messages()
-            .list(userId="me", q=query, maxResults=500)
-            .execute()
-        )
+        messages_api = service.users().messages()
+        gmail_rate_limiter.acquire(LIST_COST)
+        results = messages_api.list(
+            userId="me", q=query, maxResults=500, fields=MESSAGE_ID_FIELDS
+        ).execute()
         messages = results.get("messages", [])
 
         while "nextPageToken" in results:
-            results = (
-                service.users()
-                .messages()
-                .list(
-                    userId="me",
-                    q=query,
-                    maxResults=500,
-                    pageToken=results["nextPageToken"],
-                )
-                .execute()
-            )
+            gmail_rate_limiter.acquire(LIST_COST)
+            results = messages_api.list(
+                userId="me",
+                q=query,
+                maxResults=500,
+                pageToken=results["nextPageToken"],
+                fields=MESSAGE_ID_FIELDS,
+            ).execute()
             messages.extend(results.get("messages", []))
 
         if not messages:
@@ -249,23 +421,19 @@ def delete_emails_by_sender(sender: str) -> dict:
                 "message": "No emails found",
             }
 
-        # Batch delete (move to trash)
+        # Batch delete (move to trash); batchModify takes up to 1000 IDs per call
         ids = [msg["id"] for msg in messages]
-        batch_size = 100
+        batch_size = 1000
         deleted = 0
 
         for i in range(0, len(ids), batch_size):
             batch = ids[i : i + batch_size]
-            service.users().messages().batchModify(
+            gmail_rate_limiter.acquire(BATCH_MODIFY_COST)
+            messages_api.batchModify(
                 userId="me", body={"ids": batch, "addLabelIds": ["TRASH"]}
             ).execute()
             deleted += len(batch)
 
-        # Remove sender from cached results
-        state.delete_scan_results = [
-            r for r in state.delete_scan_results if r.get("email") != sender
-        ]
-
         return {
             "success": True,
             "deleted": deleted,
@@ -290,16 +458,19 @@ def delete_emails_bulk(senders: list[str]) -> dict:
     total_deleted = 0
     total_size_freed = 0
     errors = []
+    deleted_senders = []
 
     for sender in senders:
-        result = delete_emails_by_sender(sender)
+        result = _delete_sender_emails(sender)
         if result["success"]:
             total_deleted += result["deleted"]
             total_size_freed += result.get("size_freed", 0)
+            if result["deleted"]:
+                deleted_senders.append(sender.strip())
         else:
             errors.append(f"{sender}: {result['message']}")
 
-    # Note: delete_emails_by_sender already removes each sender from cached results
+    _remove_cached_senders(deleted_senders)
 
     if errors:
         return {
@@ -324,6 +495,42 @@ def delete_emails_bulk(senders: list[str]) -> dict:
     }
 
 
+def _collect_sender_group_ids(
+    group: list[str], query: str, extra: str = ""
+) -> tuple[list[str], list[str]]:
+    """Find message IDs for one sender group.
+
+    Runs on a fan-out worker, so it fetches that thread's own Gmail client.
+    extra holds the search terms query was built with, reused if the group
+    has to be searched one sender at a time.
+
+    Returns:
+        tuple: (message_ids, errors)
+    """
+    service, error = get_gmail_service()
+    if error:
+        return [], [f"{', '.join(group)}: {error}"]
+
+    try:
+        return list_message_ids(service, query), []
+    except HttpError as e:
+        if e.resp.status != 400 or len(group) == 1:
+            return [], [f"{', '.join(group)}: {str(e)}"]
+    except Exception as e:
+        return [], [f"{', '.join(group)}: {str(e)}"]
+
+    # Gmail rejected the combined query (e.g. too long); search each sender
+    # on its own instead
+    message_ids = []
+    errors = []
+    for [sender], sender_query in build_sender_queries(group, 1, extra):
+        try:
+            message_ids.extend(list_message_ids(service, sender_query))
+        except Exception as e:
+            errors.append(f"{sender}: {str(e)}")
+    return message_ids, errors
+
+
 def delete_emails_bulk_background(senders: list[str]) -> None:
     """Delete emails from multiple senders with progress updates (background task).
 
@@ -347,44 +554,64 @@ def delete_emails_bulk_background(senders: list[str]) -> None:
         state.delete_bulk_status["error"] = error
         return
 
-    # Phase 1: Collect all message IDs from all senders
+    # Phase 1: Collect all message IDs from all senders, searching for
+    # several senders per query and running the searches concurrently
     all_message_ids = []
     errors = []
+    group_size = settings.sender_query_group_size
+
+    # Senders from a recent scan that covered the whole mailbox already have
+    # their IDs; only mail that arrived since the scan needs searching for
+    cached_ids = {}
+    scanned_at = state.delete_scan_complete_at
+    if scanned_at is not None and time.time() - scanned_at <= _SCAN_REUSE_MAX_AGE:
+        selected = set(senders)
+        cached_ids = {
+            r["email"]: r["message_ids"]
+            for r in state.delete_scan_results
+            if r.get("email") in selected and "message_ids" in r
+        }
+    for ids in cached_ids.values():
+        all_message_ids.extend(ids)
+
+    searches = [
+        (group, query, "")
+        for group, query in build_sender_queries(
+            [s for s in senders if s not in cached_ids], group_size
+        )
+    ]
+    if cached_ids:
+        # Overlap the scan start so mail indexed late is not missed;
+        # duplicate IDs are dropped below
+        since = f"after:{int(scanned_at) - _SCAN_REUSE_OVERLAP}"
+        searches += [
+            (group, query, since)
+            for group, query in build_sender_queries(
+                list(cached_ids), group_size, since
+            )
+        ]
+
+    futures = {
+        fanout_executor.submit(_collect_sender_group_ids, group, query, extra): group
+        for group, query, extra in searches
+    }
+    searched = 0
+
+    for groups_done, future in enumerate(as_completed(futures), start=1):
+        message_ids, group_errors = future.result()
+        all_message_ids.extend(message_ids)
+        errors.extend(group_errors)
 
-    for i, sender in enumerate(senders):
-        state.delete_bulk_status["current_sender"] = i + 1
+        searched += len(futures[future])
+        state.delete_bulk_status["current_sender"] = searched
         state.delete_bulk_status["progress"] = int(
-            (i / total_senders) * 40
+            (searched / total_senders) * 40
         )  # 0-40% for collecting
-        state.delete_bulk_status["message"] = f"Finding emails from {sender}..."
-
-        try:
-            query = f"from:{sender}"
-            results = (
-                service.users()
-                .messages()
-                .list(userId="me", q=query, maxResults=500)
-                .execute()
-            )
-            messages = results.get("messages", [])
-
-            while "nextPageToken" in results:
-                results = (
-                    service.users()
-                    .messages()
-                    .list(
-                        userId="me",
-                        q=query,
-                        maxResults=500,
-                        pageToken=results["nextPageToken"],
-                    )
-                    .execute()
-                )
-                messages.extend(results.get("messages", []))
+        state.delete_bulk_status["message"] = (
+            f"Searched {groups_done}/{len(futures)} sender groups..."
+        )
 
-            all_message_ids.extend([msg["id"] for msg in messages])
-        except Exception as e:
-            errors.append(f"{sender}: {str(e)}")
+    all_message_ids = list(dict.fromkeys(all_message_ids))
 
     if not all_message_ids:
         state.delete_bulk_status["progress"] = 100
@@ -398,29 +625,29 @@ def delete_emails_bulk_background(senders: list[str]) -> None:
 
     batch_size = 1000  # Gmail allows up to 1000 per batchModify
     deleted = 0
+    messages_api = service.users().messages()
 
-    try:
-        for i in range(0, total_emails, batch_size):
-            batch = all_message_ids[i : i + batch_size]
-            service.users().messages().batchModify(
+    for i in range(0, total_emails, batch_size):
+        batch = all_message_ids[i : i + batch_size]
+        # A failed batch only loses its own IDs, not the rest of the run
+        try:
+            gmail_rate_limiter.acquire(BATCH_MODIFY_COST)
+            messages_api.batchModify(
                 userId="me", body={"ids": batch, "addLabelIds": ["TRASH"]}
             ).execute()
-            deleted += len(batch)
-            state.delete_bulk_status["deleted_count"] = deleted
-            # Progress: 40-100% for deleting
-            state.delete_bulk_status["progress"] = 40 + int(
-                (deleted / total_emails) * 60
-            )
-            state.delete_bulk_status["message"] = (
-                f"Deleted {deleted}/{total_emails} emails..."
-            )
-    except Exception as e:
-        errors.append(f"Batch delete error: {str(e)}")
+        except Exception as e:
+            errors.append(f"Batch delete error: {str(e)}")
+            continue
+        deleted += len(batch)
+        state.delete_bulk_status["deleted_count"] = deleted
+        # Progress: 40-100% for deleting
+        state.delete_bulk_status["progress"] = 40 + int((deleted / total_emails) * 60)
+        state.delete_bulk_status["message"] = (
+            f"Deleted {deleted}/{total_emails} emails..."
+        )
 
     # Remove deleted senders from cached scan results
-    state.delete_scan_results = [
-        r for r in state.delete_scan_results if r.get("email") not in senders
-    ]
+    _remove_cached_senders(senders)
 
     # Done
     state.delete_bulk_status["progress"] = 100
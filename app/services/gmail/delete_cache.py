@@ -0,0 +1,129 @@
+"""
+Gmail Delete Scan Cache
+-----------------------
+Persists whole-mailbox delete scans so later scans only fetch what changed.
+"""
+
+import json
+import logging
+import os
+
+from pydantic_core import from_json
+
+from app.core import settings
+
+logger = logging.getLogger(__name__)
+
+_CACHE_VERSION = 1
+
+# messages.list leaves these out, so a message gaining one counts as removed
+_HIDDEN_LABELS = frozenset({"TRASH", "SPAM"})
+
+
+def load_scan_cache(email: str) -> dict | None:
+    """Load the cached scan for an account.
+
+    Returns:
+        dict with history_id and records, or None if missing or unusable.
+    """
+    try:
+        with open(settings.delete_scan_cache_file, "rb") as f:
+            cache = from_json(f.read())
+    except (OSError, ValueError):
+        return None
+
+    if (
+        not isinstance(cache, dict)
+        or cache.get("version") != _CACHE_VERSION
+        or cache.get("email") != email
+        or not cache.get("history_id")
+        or not isinstance(cache.get("records"), list)
+    ):
+        return None
+    return cache
+
+
+def save_scan_cache(email: str, history_id: str, records: list) -> None:
+    """Save a whole-mailbox scan, replacing the cache file atomically."""
+    path = settings.delete_scan_cache_file
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {
+                    "version": _CACHE_VERSION,
+                    "email": email,
+                    "history_id": history_id,
+                    "records": records,
+                },
+                f,
+            )
+        os.replace(tmp_path, path)
+    except (OSError, TypeError, ValueError):
+        # The cache is only an optimization; the scan results still stand
+        logger.warning("Failed to save delete scan cache", exc_info=True)
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def fetch_history_changes(service, start_history_id: str) -> tuple[list, set, str]:
+    """Collect messages added to or removed from the listable mailbox.
+
+    Raises:
+        HttpError: 404 if start_history_id is too old for Gmail to replay.
+
+    Returns:
+        tuple: (added IDs oldest first, removed IDs, latest history ID)
+    """
+    added: dict[str, None] = {}
+    removed: set[str] = set()
+    history_id = start_history_id
+    page_token = None
+
+    while True:
+        result = (
+            service.users()
+            .history()
+            .list(
+                userId="me",
+                startHistoryId=start_history_id,
+                historyTypes=[
+                    "messageAdded",
+                    "messageDeleted",
+                    "labelAdded",
+                    "labelRemoved",
+                ],
+                pageToken=page_token,
+            )
+            .execute()
+        )
+
+        # Records are in chronological order, so later changes win
+        for record in result.get("history", []):
+            for item in record.get("messagesAdded", []):
+                message = item["message"]
+                if _HIDDEN_LABELS.isdisjoint(message.get("labelIds", [])):
+                    added[message["id"]] = None
+                    removed.discard(message["id"])
+            for item in record.get("messagesDeleted", []):
+                added.pop(item["message"]["id"], None)
+                removed.add(item["message"]["id"])
+            for item in record.get("labelsAdded", []):
+                if not _HIDDEN_LABELS.isdisjoint(item.get("labelIds", [])):
+                    added.pop(item["message"]["id"], None)
+                    removed.add(item["message"]["id"])
+            for item in record.get("labelsRemoved", []):
+                message = item["message"]
+                if not _HIDDEN_LABELS.isdisjoint(
+                    item.get("labelIds", [])
+                ) and _HIDDEN_LABELS.isdisjoint(message.get("labelIds", [])):
+                    # Restored from trash or spam
+                    added[message["id"]] = None
+                    removed.discard(message["id"])
+
+        history_id = result.get("historyId", history_id)
+        page_token = result.get("nextPageToken")
+        if not page_token:
+            return list(added), removed, history_id
@@ -2,12 +2,19 @@
 Centralized Error Handling and Retry Logic
 ------------------------------------------
 Provides decorators and utilities for handling Gmail API errors,
-including automatic retries with exponential backoff.
+including automatic retries with exponential backoff. The decorators
+work on both regular and async functions.
 """
 
+import re
+import json
 import time
+import asyncio
+import inspect
+import random
 import logging
 import functools
+from email.utils import parsedate_to_datetime
 from typing import Type, Tuple, Optional, Callable, Any
 from googleapiclient.errors import HttpError
 from app.core.exceptions import (
@@ -21,60 +28,86 @@ from app.core.exceptions import (
 
 logger = logging.getLogger(__name__)
 
+_QUOTA_RE = re.compile("quota", re.IGNORECASE)
+
+# Statuses that always map to the same exception, built from the HttpError
+# and its parsed details
+_STATUS_ERRORS: dict[int, Callable[[HttpError, dict], GmailCleanerError]] = {
+    401: lambda e, details: AuthError(
+        "Authentication expired or invalid", details=details
+    ),
+    404: lambda e, details: ResourceNotFoundError(
+        "Resource not found", details=details
+    ),
+    429: lambda e, details: QuotaExceededError(
+        "Too many requests", details=details, retry_after=get_retry_after(e)
+    ),
+}
+
+
+def _to_app_error(error: HttpError) -> GmailCleanerError:
+    """Translate an HttpError into the matching application exception."""
+    details = _parse_http_error(error)
+    status_code = error.resp.status
+
+    factory = _STATUS_ERRORS.get(status_code)
+    if factory is not None:
+        return factory(error, details)
+    if status_code == 403:
+        # Quota errors also come back as 403
+        if _QUOTA_RE.search(str(details)):
+            return QuotaExceededError(
+                "Gmail API quota exceeded",
+                details=details,
+                retry_after=get_retry_after(error),
+            )
+        return GmailApiError("Permission denied", status_code=403, details=details)
+    if status_code >= 500:
+        return GmailApiError(
+            "Gmail service error", status_code=status_code, details=details
+        )
+    return GmailApiError(
+        f"Gmail API error: {status_code}", status_code=status_code, details=details
+    )
+
+
+def _unexpected_error(func: Callable[..., Any], error: Exception) -> GmailCleanerError:
+    logger.exception(f"Unexpected error in {func.__name__}")
+    return GmailCleanerError(f"Unexpected error: {str(error)}", code="INTERNAL_ERROR")
+
 
 def handle_gmail_errors(func: Callable[..., Any]) -> Callable[..., Any]:
     """
     Decorator to catch and transform Gmail API errors into custom exceptions.
+
+    Works on both regular and async functions.
     """
 
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            try:
+                return await func(*args, **kwargs)
+            except HttpError as e:
+                raise _to_app_error(e) from e
+            except GmailCleanerError:
+                raise
+            except Exception as e:
+                raise _unexpected_error(func, e) from e
+
+        return async_wrapper
+
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
         try:
             return func(*args, **kwargs)
         except HttpError as e:
-            error_details = _parse_http_error(e)
-            status_code = e.resp.status
-
-            if status_code == 401:
-                raise AuthError(
-                    "Authentication expired or invalid", details=error_details
-                ) from e
-            elif status_code == 403:
-                # Check for quota errors
-                if "quota" in str(error_details).lower():
-                    raise QuotaExceededError(
-                        "Gmail API quota exceeded", details=error_details
-                    ) from e
-                raise GmailApiError(
-                    "Permission denied", status_code=403, details=error_details
-                ) from e
-            elif status_code == 404:
-                raise ResourceNotFoundError(
-                    "Resource not found", details=error_details
-                ) from e
-            elif status_code == 429:
-                raise QuotaExceededError(
-                    "Too many requests", details=error_details
-                ) from e
-            elif status_code >= 500:
-                raise GmailApiError(
-                    "Gmail service error",
-                    status_code=status_code,
-                    details=error_details,
-                ) from e
-            else:
-                raise GmailApiError(
-                    f"Gmail API error: {status_code}",
-                    status_code=status_code,
-                    details=error_details,
-                ) from e
+            raise _to_app_error(e) from e
+        except GmailCleanerError:
+            raise
         except Exception as e:
-            if isinstance(e, GmailCleanerError):
-                raise
-            logger.exception(f"Unexpected error in {func.__name__}")
-            raise GmailCleanerError(
-                f"Unexpected error: {str(e)}", code="INTERNAL_ERROR"
-            ) from e
+            raise _unexpected_error(func, e) from e
 
     return wrapper
 
@@ -83,73 +116,125 @@ def with_retry(
     max_retries: int = 3,
     initial_delay: float = 1.0,
     backoff_factor: float = 2.0,
+    max_delay: float = 30.0,
+    jitter: float = 0.5,
     exceptions: Tuple[Type[Exception], ...] = (NetworkError, GmailApiError),
     exclude_exceptions: Tuple[Type[Exception], ...] = (
         AuthError,
         ResourceNotFoundError,
-        QuotaExceededError,
     ),
 ) -> Callable[..., Any]:
     """
     Decorator for retrying functions with exponential backoff.
 
+    Rate-limit errors are retried too, waiting for the server's Retry-After
+    delay when it sends one. Async functions wait with asyncio.sleep, so
+    they do not block the event loop between attempts.
+
     Args:
         max_retries: Maximum number of retry attempts
         initial_delay: Initial delay in seconds
         backoff_factor: Multiplier for delay after each failure
+        max_delay: Cap on the computed delay in seconds; a longer
+            Retry-After from the server fails instead of waiting
+        jitter: Fraction of the delay to randomize by, in either direction
         exceptions: Tuple of exceptions to retry on
         exclude_exceptions: Tuple of exceptions to NOT retry on (fail immediately)
     """
 
     def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        def retry_wait(e: Exception, attempt: int, delay: float) -> Optional[float]:
+            """Seconds to wait before retrying after e, or None to give up."""
+            # Check if we should stop retrying
+            if isinstance(e, exclude_exceptions):
+                return None
+
+            # Check if we should retry
+            should_retry = False
+            if isinstance(e, exceptions):
+                should_retry = True
+            elif isinstance(e, HttpError):
+                # Retry on 5xx errors and some 4xx (rate limits)
+                status = e.resp.status
+                if status >= 500 or status == 429:
+                    should_retry = True
+
+            if not should_retry or attempt == max_retries:
+                return None
+
+            # Prefer the server's own delay; otherwise jitter the backoff so
+            # concurrent workers do not retry in lockstep
+            if isinstance(e, HttpError):
+                wait = get_retry_after(e)
+            else:
+                wait = getattr(e, "retry_after", None)
+            if wait is not None and wait > max_delay:
+                # Not worth holding a worker for; let the caller fail now
+                return None
+            if wait is None:
+                wait = min(max_delay, delay) * (1 + random.uniform(-jitter, jitter))
+
+            logger.warning(
+                f"Retry {attempt + 1}/{max_retries} for {func.__name__} "
+                f"after error: {str(e)}. Waiting {wait:.1f}s..."
+            )
+            return wait
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                delay = initial_delay
+                for attempt in range(max_retries + 1):
+                    try:
+                        return await func(*args, **kwargs)
+                    except Exception as e:
+                        wait = retry_wait(e, attempt, delay)
+                        if wait is None:
+                            raise
+                        await asyncio.sleep(wait)
+                        delay *= backoff_factor
+
+            return async_wrapper
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             delay = initial_delay
-            last_exception = None
-
             for attempt in range(max_retries + 1):
                 try:
                     return func(*args, **kwargs)
                 except Exception as e:
-                    last_exception = e
-
-                    # Check if we should stop retrying
-                    if isinstance(e, exclude_exceptions):
+                    wait = retry_wait(e, attempt, delay)
+                    if wait is None:
                         raise
-
-                    # Check if we should retry
-                    should_retry = False
-                    if isinstance(e, exceptions):
-                        should_retry = True
-                    elif isinstance(e, HttpError):
-                        # Retry on 5xx errors and some 4xx (rate limits)
-                        status = e.resp.status
-                        if status >= 500 or status == 429:
-                            should_retry = True
-
-                    if not should_retry or attempt == max_retries:
-                        raise
-
-                    logger.warning(
-                        f"Retry {attempt + 1}/{max_retries} for {func.__name__} "
-                        f"after error: {str(e)}. Waiting {delay}s..."
-                    )
-                    time.sleep(delay)
+                    time.sleep(wait)
                     delay *= backoff_factor
 
-            if last_exception:
-                raise last_exception
-
         return wrapper
 
     return decorator
 
 
+def get_retry_after(error: HttpError) -> Optional[float]:
+    """Return the server's Retry-After delay in seconds, if it sent one."""
+    value = error.resp.get("retry-after") if error.resp is not None else None
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    # Retry-After may also be an HTTP date
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
 def _parse_http_error(error: HttpError) -> dict:
     """Extract useful details from HttpError."""
     try:
-        import json
-
         if error.content:
             content = json.loads(error.content.decode("utf-8"))
             return content.get("error", {})
@@ -1,14 +1,16 @@
 """
 Gmail Service Helpers
 ---------------------
-Shared utility functions: security, filters, and email parsing.
+Shared utility functions: security, filters, searching, and email parsing.
 """
 
 import re
 import socket
 import ipaddress
 from urllib.parse import urlparse
-from typing import Optional, Union, Any
+from typing import Iterator, Optional, Union, Any
+
+from app.services.gmail.rate_limit import LIST_COST, gmail_rate_limiter
 
 
 def validate_unsafe_url(url: str) -> str:
@@ -108,7 +110,9 @@ def build_gmail_query(filters: Optional[Union[dict, Any]] = None) -> str:
         return ""
 
     # Handle both dict and Pydantic model
-    if hasattr(filters, "model_dump"):
+    if hasattr(filters, "to_query_dict"):
+        filters = filters.to_query_dict()
+    elif hasattr(filters, "model_dump"):
         filters = filters.model_dump(exclude_none=True)
 
     query_parts = []
@@ -140,49 +144,170 @@ def build_gmail_query(filters: Optional[Union[dict, Any]] = None) -> str:
     return " ".join(query_parts)
 
 
-def get_unsubscribe_from_headers(headers: list) -> tuple[Optional[str], Optional[str]]:
-    """Extract unsubscribe link from email headers."""
+def build_sender_queries(
+    senders: list[str], group_size: int = 20, extra: str = ""
+) -> list[tuple[list[str], str]]:
+    """Group senders into OR'ed ``from:`` queries.
+
+    One list call per group replaces one per sender. Groups are kept small
+    so the query stays well under Gmail's length limit.
+
+    Args:
+        senders: Sender emails or domains
+        group_size: Maximum senders per query
+        extra: Search terms appended to every query (e.g. 'in:inbox')
+
+    Returns:
+        List of (senders in the group, Gmail query string) tuples
+    """
+    queries = []
+    for i in range(0, len(senders), group_size):
+        group = senders[i : i + group_size]
+        if len(group) == 1:
+            query = f"from:{group[0]}"
+        else:
+            query = f"from:({' OR '.join(group)})"
+        if extra:
+            query = f"{query} {extra}"
+        queries.append((group, query))
+    return queries
+
+
+# Response fields needed when listing messages only for their IDs; the
+# rest (threadId, resultSizeEstimate) is trimmed server-side
+MESSAGE_ID_FIELDS = "messages/id,nextPageToken"
+
+
+def iter_message_ids(
+    service, query: str, page_token: Optional[str] = None
+) -> Iterator[list[str]]:
+    """Yield the IDs of messages matching query, one result page at a time.
+
+    Callers can act on each page as it arrives instead of waiting for the
+    whole search.
+
+    Args:
+        service: Gmail API service
+        query: Gmail search query
+        page_token: Page to start from, if earlier pages were already fetched
+    """
+    messages_api = service.users().messages()
+
+    while True:
+        gmail_rate_limiter.acquire(LIST_COST)
+        results = messages_api.list(
+            userId="me",
+            q=query,
+            maxResults=500,
+            pageToken=page_token,
+            fields=MESSAGE_ID_FIELDS,
+        ).execute()
+        yield [msg["id"] for msg in results.get("messages", [])]
+        page_token = results.get("nextPageToken")
+        if not page_token:
+            return
+
+
+def list_message_ids(
+    service, query: str, page_token: Optional[str] = None
+) -> list[str]:
+    """Collect the IDs of every message matching query."""
+    return [
+        msg_id
+        for page in iter_message_ids(service, query, page_token)
+        for msg_id in page
+    ]
+
+
+# Headers that may repeat with a later copy still mattering; index_headers
+# keeps every value of these, in order
+_MULTI_VALUE_HEADERS = frozenset({"list-unsubscribe"})
+
+
+def index_headers(headers: list) -> dict[str, Any]:
+    """Map lowercased header names to values, keeping the first occurrence.
+
+    Headers in _MULTI_VALUE_HEADERS map to a list of all their values.
+    """
+    indexed: dict[str, Any] = {}
     for header in headers:
-        if header["name"].lower() == "list-unsubscribe":
-            value = header["value"]
-
-            # Look for one-click POST header
-            for h in headers:
-                if h["name"].lower() == "list-unsubscribe-post":
-                    # Has one-click support
-                    urls = re.findall(r"<(https?://[^>]+)>", value)
-                    if urls:
-                        return urls[0], "one-click"
-
-            # Standard unsubscribe link
-            urls = re.findall(r"<(https?://[^>]+)>", value)
-            if urls:
-                return urls[0], "manual"
-
-            # mailto: link as fallback
-            mailto = re.findall(r"<(mailto:[^>]+)>", value)
-            if mailto:
-                return mailto[0], "manual"
+        name = header["name"].lower()
+        if name in _MULTI_VALUE_HEADERS:
+            indexed.setdefault(name, []).append(header["value"])
+        else:
+            indexed.setdefault(name, header["value"])
+    return indexed
+
+
+def _parse_unsubscribe(
+    value: str, one_click: bool
+) -> tuple[Optional[str], Optional[str]]:
+    """Pick the link out of a List-Unsubscribe value."""
+    # One-click support is advertised by a List-Unsubscribe-Post header
+    urls = re.findall(r"<(https?://[^>]+)>", value)
+    if urls:
+        return urls[0], "one-click" if one_click else "manual"
+
+    # mailto: link as fallback
+    mailto = re.findall(r"<(mailto:[^>]+)>", value)
+    if mailto:
+        return mailto[0], "manual"
+    return None, None
+
+
+def get_unsubscribe_from_headers(
+    headers: list | dict[str, Any],
+) -> tuple[Optional[str], Optional[str]]:
+    """Extract unsubscribe link from email headers.
+
+    Accepts the raw header list or a dict from index_headers.
+    """
+    if isinstance(headers, dict):
+        values = headers.get("list-unsubscribe", [])
+        one_click = "list-unsubscribe-post" in headers
+    else:
+        values = [
+            h["value"] for h in headers if h["name"].lower() == "list-unsubscribe"
+        ]
+        one_click = any(h["name"].lower() == "list-unsubscribe-post" for h in headers)
+
+    # Use the first List-Unsubscribe header with a usable link
+    for value in values:
+        link, link_type = _parse_unsubscribe(value, one_click)
+        if link:
+            return link, link_type
 
     return None, None
 
 
-def get_sender_info(headers: list) -> tuple[str, str]:
-    """Extract sender name and email from headers."""
-    for header in headers:
-        if header["name"].lower() == "from":
-            from_value = header["value"]
-            match = re.search(r"([^<]*)<([^>]+)>", from_value)
-            if match:
-                name = match.group(1).strip().strip('"')
-                email = match.group(2).strip()
-                return name or email, email
-            return from_value, from_value
-    return "Unknown", "unknown"
-
-
-def get_subject(headers: list) -> str:
-    """Extract subject from email headers."""
+def get_sender_info(headers: list | dict[str, Any]) -> tuple[str, str]:
+    """Extract sender name and email from headers.
+
+    Accepts the raw header list or a dict from index_headers.
+    """
+    if isinstance(headers, dict):
+        from_value = headers.get("from")
+    else:
+        from_value = next(
+            (h["value"] for h in headers if h["name"].lower() == "from"), None
+        )
+    if from_value is None:
+        return "Unknown", "unknown"
+    match = re.search(r"([^<]*)<([^>]+)>", from_value)
+    if match:
+        name = match.group(1).strip().strip('"')
+        email = match.group(2).strip()
+        return name or email, email
+    return from_value, from_value
+
+
+def get_subject(headers: list | dict[str, Any]) -> str:
+    """Extract subject from email headers.
+
+    Accepts the raw header list or a dict from index_headers.
+    """
+    if isinstance(headers, dict):
+        return headers.get("subject", "(No Subject)")
     for header in headers:
         if header["name"].lower() == "subject":
             return header["value"]
@@ -8,6 +8,8 @@ import time
 
 from app.core import state
 from app.services.auth import get_gmail_service
+from app.services.gmail.helpers import list_message_ids
+from app.services.gmail.rate_limit import BATCH_MODIFY_COST, gmail_rate_limiter
 
 
 def mark_important_background(senders: list[str], *, important: bool = True) -> None:
@@ -39,37 +41,22 @@ def mark_important_background(senders: list[str], *, important: bool = True) ->
             state.important_status["progress"] = int((i / len(senders)) * 100)
 
             # Find all emails from this sender
-            query = f"from:{sender}"
-            message_ids = []
-            page_token = None
-
-            while True:
-                result = (
-                    service.users()
-                    .messages()
-                    .list(userId="me", q=query, maxResults=500, pageToken=page_token)
-                    .execute()
-                )
-
-                messages = result.get("messages", [])
-                message_ids.extend([m["id"] for m in messages])
-
-                page_token = result.get("nextPageToken")
-                if not page_token:
-                    break
+            message_ids = list_message_ids(service, f"from:{sender}")
 
             if not message_ids:
                 continue
 
-            # Mark in batches
-            for j in range(0, len(message_ids), 100):
-                batch_ids = message_ids[j : j + 100]
+            # Mark in batches; batchModify takes up to 1000 IDs per call
+            batch_size = 1000
+            for j in range(0, len(message_ids), batch_size):
+                batch_ids = message_ids[j : j + batch_size]
                 # Gmail API requires explicit parameter names (addLabelIds or removeLabelIds)
                 body = (
                     {"ids": batch_ids, "addLabelIds": ["IMPORTANT"]}
                     if important
                     else {"ids": batch_ids, "removeLabelIds": ["IMPORTANT"]}
                 )
+                gmail_rate_limiter.acquire(BATCH_MODIFY_COST)
                 service.users().messages().batchModify(userId="me", body=body).execute()
                 total_affected += len(batch_ids)
 
@@ -4,9 +4,69 @@ Gmail Label Management Operations
 Functions for managing Gmail labels.
 """
 
-from app.core import state
+import time
+from concurrent.futures import as_completed
+
+from googleapiclient.errors import HttpError
+
+from app.core import settings, state
+from app.core.exceptions import (
+    GmailApiError,
+    GmailCleanerError,
+    ResourceNotFoundError,
+)
+from app.core.tasks import fanout_executor
 from app.services.auth import get_gmail_service
 from app.services.gmail.error_handler import handle_gmail_errors
+from app.services.gmail.helpers import (
+    MESSAGE_ID_FIELDS,
+    build_sender_queries,
+    list_message_ids,
+)
+from app.services.gmail.rate_limit import (
+    BATCH_MODIFY_COST,
+    LIST_COST,
+    QUOTA_COSTS,
+    gmail_rate_limiter,
+)
+
+# Gmail rejects HTTP batches with too many inner requests
+_LIST_BATCH_SIZE = 50
+
+# Label names rarely change, so they are reused for a while instead of
+# fetching the label on every remove operation. Keyed by (account, label ID).
+_LABEL_NAME_TTL = 300.0
+_label_names: dict[tuple[str | None, str], tuple[str, float]] = {}
+
+
+def _remember_label_name(label_id: str, name: str) -> None:
+    key = (state.current_user.get("email"), label_id)
+    _label_names[key] = (name, time.monotonic())
+
+
+def _get_label_name(service, label_id: str) -> str:
+    """Get a label's name, from the cache when it is fresh."""
+    cached = _label_names.get((state.current_user.get("email"), label_id))
+    if cached and time.monotonic() - cached[1] < _LABEL_NAME_TTL:
+        return cached[0]
+
+    gmail_rate_limiter.acquire(QUOTA_COSTS["labels.get"])
+    label_info = service.users().labels().get(userId="me", id=label_id).execute()
+    name = label_info.get("name", "")
+    if name:
+        _remember_label_name(label_id, name)
+    return name
+
+
+@handle_gmail_errors
+def _execute_label_request(request) -> dict:
+    """Execute a labels API request, raising typed errors on failure."""
+    return request.execute()
+
+
+def _error_message(error: GmailCleanerError) -> str:
+    """Gmail's own description of an error, falling back to ours."""
+    return error.details.get("message") or error.message
 
 
 def get_labels() -> dict:
@@ -16,6 +76,7 @@ def get_labels() -> dict:
         return {"success": False, "labels": [], "error": error}
 
     try:
+        gmail_rate_limiter.acquire(QUOTA_COSTS["labels.list"])
         results = service.users().labels().list(userId="me").execute()
         labels = results.get("labels", [])
 
@@ -24,6 +85,9 @@ def get_labels() -> dict:
         user_labels = []
 
         for label in labels:
+            if label.get("id") and label.get("name"):
+                _remember_label_name(label["id"], label["name"])
+
             label_info = {
                 "id": label.get("id"),
                 "name": label.get("name"),
@@ -64,7 +128,12 @@ def create_label(name: str) -> dict:
             "messageListVisibility": "show",
         }
 
-        result = service.users().labels().create(userId="me", body=label_body).execute()
+        gmail_rate_limiter.acquire(QUOTA_COSTS["labels.create"])
+        result = _execute_label_request(
+            service.users().labels().create(userId="me", body=label_body)
+        )
+        if result.get("id") and result.get("name"):
+            _remember_label_name(result["id"], result["name"])
 
         return {
             "success": True,
@@ -75,15 +144,17 @@ def create_label(name: str) -> dict:
             },
             "error": None,
         }
-    except Exception as e:
-        error_msg = str(e)
-        if "Label name exists" in error_msg or "already exists" in error_msg.lower():
+    except GmailApiError as e:
+        reasons = {item.get("reason") for item in e.details.get("errors", [])}
+        if e.status_code == 409 or "duplicate" in reasons:
             return {
                 "success": False,
                 "label": None,
                 "error": "A label with this name already exists",
             }
-        return {"success": False, "label": None, "error": error_msg}
+        return {"success": False, "label": None, "error": _error_message(e)}
+    except GmailCleanerError as e:
+        return {"success": False, "label": None, "error": _error_message(e)}
 
 
 def delete_label(label_id: str) -> dict:
@@ -96,15 +167,93 @@ def delete_label(label_id: str) -> dict:
         return {"success": False, "error": error}
 
     try:
-        service.users().labels().delete(userId="me", id=label_id).execute()
+        gmail_rate_limiter.acquire(QUOTA_COSTS["labels.delete"])
+        _execute_label_request(
+            service.users().labels().delete(userId="me", id=label_id)
+        )
+        _label_names.pop((state.current_user.get("email"), label_id), None)
         return {"success": True, "error": None}
-    except Exception as e:
-        error_msg = str(e)
-        if "Not Found" in error_msg:
-            return {"success": False, "error": "Label not found"}
-        if "Cannot delete" in error_msg or "system label" in error_msg.lower():
+    except ResourceNotFoundError:
+        return {"success": False, "error": "Label not found"}
+    except GmailApiError as e:
+        # Gmail answers 400 Invalid delete request for system labels; other
+        # 400s keep Gmail's own message
+        if e.status_code == 400 and _error_message(e) == "Invalid delete request":
             return {"success": False, "error": "Cannot delete system labels"}
-        return {"success": False, "error": error_msg}
+        return {"success": False, "error": _error_message(e)}
+    except GmailCleanerError as e:
+        return {"success": False, "error": _error_message(e)}
+
+
+def _list_first_pages(service, queries: list[str]) -> tuple[dict, dict]:
+    """Fetch the first result page of every query via HTTP batch requests.
+
+    Returns:
+        tuple: (query index -> list response, query index -> exception)
+    """
+    pages = {}
+    errors = {}
+
+    def process_page(request_id, response, exception) -> None:
+        if exception:
+            errors[int(request_id)] = exception
+        else:
+            pages[int(request_id)] = response
+
+    messages_api = service.users().messages()
+    for start in range(0, len(queries), _LIST_BATCH_SIZE):
+        batch = service.new_batch_http_request(callback=process_page)
+        for i in range(start, min(start + _LIST_BATCH_SIZE, len(queries))):
+            gmail_rate_limiter.acquire(LIST_COST)
+            batch.add(
+                messages_api.list(
+                    userId="me", q=queries[i], maxResults=500, fields=MESSAGE_ID_FIELDS
+                ),
+                request_id=str(i),
+            )
+        try:
+            batch.execute()
+        except Exception as e:
+            for i in range(start, min(start + _LIST_BATCH_SIZE, len(queries))):
+                errors.setdefault(i, e)
+
+    return pages, errors
+
+
+def _collect_sender_ids(
+    senders: list[str], query: str, page_token: str | None = None
+) -> tuple[list[str], str | None]:
+    """Find the message IDs for one sender group, from page_token on.
+
+    Runs on a fan-out worker, so it fetches that thread's own Gmail client.
+
+    Returns:
+        tuple: (message_ids, error or None)
+    """
+    service, error = get_gmail_service()
+    if error:
+        return [], f"{', '.join(senders)}: {error}"
+    try:
+        return list_message_ids(service, query, page_token), None
+    except Exception as e:
+        return [], f"{', '.join(senders)}: {str(e)}"
+
+
+def _modify_batch(body: dict) -> str | None:
+    """Run one batchModify chunk on a fan-out worker.
+
+    Returns:
+        Error message, or None on success.
+    """
+    service, error = get_gmail_service()
+    if error:
+        return error
+    gmail_rate_limiter.acquire(BATCH_MODIFY_COST)
+    try:
+        service.users().messages().batchModify(userId="me", body=body).execute()
+    except Exception as e:
+        return str(e)
+    return None
 
 
 @handle_gmail_errors
@@ -136,137 +285,179 @@ def _apply_label_operation_background(
     state.reset_label_operation()
 
     if not label_id or not label_id.strip():
-        state.label_operation_status["done"] = True
-        state.label_operation_status["error"] = "Label ID is required"
+        state.label_operation_status.update(done=True, error="Label ID is required")
         return
 
     # Validate input
     if not senders or not isinstance(senders, list):
-        state.label_operation_status["done"] = True
-        state.label_operation_status["error"] = "No senders specified"
+        state.label_operation_status.update(done=True, error="No senders specified")
         return
 
     service, error = get_gmail_service()
     if error:
-        state.label_operation_status["done"] = True
-        state.label_operation_status["error"] = error
+        state.label_operation_status.update(done=True, error=error)
         return
 
     total_senders = len(senders)
-    state.label_operation_status["total_senders"] = total_senders
-    state.label_operation_status["message"] = finding_message
+    state.label_operation_status.update(
+        total_senders=total_senders, message=finding_message
+    )
 
-    # Phase 1: Collect all message IDs
-    all_message_ids = []
+    # Phase 1: Collect message IDs. When adding a label, full chunks are
+    # handed to Phase 2 as soon as they fill up, so labelling starts while
+    # the search goes on. Removing a label takes messages out of the
+    # label:... results being paged through, so that waits for the search.
     errors = []
     label_name = None
+    batch_size = 1000
+    pending_ids: list[str] = []
+    # Overlapping senders (e.g. an address and its domain) match the same
+    # messages; each message is only modified once
+    seen_ids: set[str] = set()
+    modify_futures = {}
+    total_emails = 0
+
+    # Build batch modify body
+    if add_label:
+        body_template = {"ids": None, "addLabelIds": [label_id]}
+    else:
+        body_template = {"ids": None, "removeLabelIds": [label_id]}
+
+    def submit_chunk(chunk: list[str]) -> None:
+        # Chunks touch disjoint messages, so they run concurrently; the rate
+        # limiter keeps the burst within Gmail's per-user quota
+        future = fanout_executor.submit(_modify_batch, {**body_template, "ids": chunk})
+        modify_futures[future] = len(chunk)
+
+    def add_ids(message_ids: list[str]) -> None:
+        nonlocal total_emails
+        new_ids = [i for i in message_ids if i not in seen_ids]
+        seen_ids.update(new_ids)
+        total_emails += len(new_ids)
+        pending_ids.extend(new_ids)
+
+    def add_and_submit_ids(message_ids: list[str]) -> None:
+        add_ids(message_ids)
+        while len(pending_ids) >= batch_size:
+            submit_chunk(pending_ids[:batch_size])
+            del pending_ids[:batch_size]
+
+    # Chosen once so the per-page path does not re-check the operation
+    on_page = add_and_submit_ids if add_label else add_ids
 
     # For remove operations, we need the label name for the query
-    # Fetch it once before processing senders
+    # Look it up once before processing senders
     if not add_label:
         try:
-            label_info = (
-                service.users().labels().get(userId="me", id=label_id).execute()
-            )
-            label_name = label_info.get("name", "")
+            label_name = _get_label_name(service, label_id)
             if not label_name:
-                state.label_operation_status["done"] = True
-                state.label_operation_status["error"] = "Could not get label name"
+                state.label_operation_status.update(
+                    done=True, error="Could not get label name"
+                )
                 return
         except Exception as e:
-            state.label_operation_status["done"] = True
-            state.label_operation_status["error"] = f"Failed to fetch label: {str(e)}"
+            state.label_operation_status.update(
+                done=True, error=f"Failed to fetch label: {str(e)}"
+            )
             return
 
-    for i, sender in enumerate(senders):
-        state.label_operation_status["current_sender"] = i + 1
-        state.label_operation_status["progress"] = int((i / total_senders) * 40)
-        state.label_operation_status["message"] = f"Finding emails from {sender}..."
+    # Search for several senders per query; for remove, only messages that
+    # still carry the label
+    extra = "" if add_label else f"label:{label_name}"
+    groups = build_sender_queries(senders, settings.sender_query_group_size, extra)
 
-        try:
-            # Build query: for remove, include label filter; for add, just sender
-            if add_label:
-                query = f"from:{sender}"
-            else:
-                query = f"from:{sender} label:{label_name}"
-
-            results = (
-                service.users()
-                .messages()
-                .list(userId="me", q=query, maxResults=500)
-                .execute()
-            )
-            messages = results.get("messages", [])
-
-            while "nextPageToken" in results:
-                results = (
-                    service.users()
-                    .messages()
-                    .list(
-                        userId="me",
-                        q=query,
-                        maxResults=500,
-                        pageToken=results["nextPageToken"],
-                    )
-                    .execute()
+    # First pages for every group go out in a few HTTP batches; only groups
+    # with more results need their own paginated searches, which run
+    # concurrently. Each future maps to the number of senders it covers.
+    first_pages, page_errors = _list_first_pages(
+        service, [query for _, query in groups]
+    )
+    futures = {}
+    for i in sorted(page_errors):
+        group, page_error = groups[i][0], page_errors[i]
+        if (
+            isinstance(page_error, HttpError)
+            and page_error.resp.status == 400
+            and len(group) > 1
+        ):
+            # Gmail rejected the combined query (e.g. too long); search each
+            # sender on its own instead
+            for sender_group, sender_query in build_sender_queries(group, 1, extra):
+                future = fanout_executor.submit(
+                    _collect_sender_ids, sender_group, sender_query
                 )
-                messages.extend(results.get("messages", []))
+                futures[future] = 1
+        else:
+            errors.append(f"{', '.join(group)}: {str(page_error)}")
+    for i, page in first_pages.items():
+        group, query = groups[i]
+        on_page([msg["id"] for msg in page.get("messages", [])])
+        if page.get("nextPageToken"):
+            future = fanout_executor.submit(
+                _collect_sender_ids, group, query, page["nextPageToken"]
+            )
+            futures[future] = len(group)
 
-            all_message_ids.extend([msg["id"] for msg in messages])
-        except Exception as e:
-            errors.append(f"{sender}: {str(e)}")
+    searched = total_senders - sum(futures.values())
+    state.label_operation_status.update(
+        current_sender=searched,
+        progress=int((searched / total_senders) * 40),
+        message=f"Searched {searched}/{total_senders} senders...",
+    )
+
+    for future in as_completed(futures):
+        message_ids, sender_error = future.result()
+        on_page(message_ids)
+        if sender_error:
+            errors.append(sender_error)
+
+        searched += futures[future]
+        state.label_operation_status.update(
+            current_sender=searched,
+            progress=int((searched / total_senders) * 40),
+            message=f"Searched {searched}/{total_senders} senders...",
+        )
 
-    if not all_message_ids:
-        state.label_operation_status["progress"] = 100
-        state.label_operation_status["done"] = True
-        state.label_operation_status["message"] = no_emails_message
+    if not total_emails:
+        state.label_operation_status.update(
+            progress=100, done=True, message=no_emails_message
+        )
         return
 
-    # Phase 2: Apply/remove label in batches
-    total_emails = len(all_message_ids)
+    # Phase 2: Apply/remove label to the remaining IDs and wait for all chunks
+    for i in range(0, len(pending_ids), batch_size):
+        submit_chunk(pending_ids[i : i + batch_size])
     state.label_operation_status["message"] = applying_message.format(
         count=total_emails
     )
-
-    batch_size = 1000
     affected = 0
 
-    # Build batch modify body
-    if add_label:
-        body_template = {"ids": None, "addLabelIds": [label_id]}
-    else:
-        body_template = {"ids": None, "removeLabelIds": [label_id]}
-
-    try:
-        for i in range(0, total_emails, batch_size):
-            batch = all_message_ids[i : i + batch_size]
-            body = {**body_template, "ids": batch}
-            service.users().messages().batchModify(userId="me", body=body).execute()
-            affected += len(batch)
-            state.label_operation_status["affected_count"] = affected
-            state.label_operation_status["progress"] = 40 + int(
-                (affected / total_emails) * 60
-            )
-            state.label_operation_status["message"] = progress_message_template.format(
+    for future in as_completed(modify_futures):
+        batch_error = future.result()
+        if batch_error:
+            errors.append(f"Batch operation error: {batch_error}")
+            continue
+        affected += modify_futures[future]
+        state.label_operation_status.update(
+            affected_count=affected,
+            progress=40 + int((affected / total_emails) * 60),
+            message=progress_message_template.format(
                 count=affected, total=total_emails
-            )
-    except Exception as e:
-        errors.append(f"Batch operation error: {str(e)}")
-
-    # Done
-    state.label_operation_status["progress"] = 100
-    state.label_operation_status["done"] = True
-    state.label_operation_status["affected_count"] = affected
+            ),
+        )
 
+    # Done; publish the final status as one change so pollers never see
+    # done=True before the final counts and message
     if errors:
-        state.label_operation_status["error"] = f"Some errors: {'; '.join(errors[:3])}"
-        state.label_operation_status["message"] = error_message_template.format(
-            count=affected
-        )
+        final = {
+            "error": f"Some errors: {'; '.join(errors[:3])}",
+            "message": error_message_template.format(count=affected),
+        }
     else:
-        state.label_operation_status["message"] = success_message_template.format(
-            count=affected
-        )
+        final = {"message": success_message_template.format(count=affected)}
+    state.label_operation_status.update(
+        progress=100, done=True, affected_count=affected, **final
+    )
 
 
 def apply_label_to_senders_background(label_id: str, senders: list[str]) -> None:
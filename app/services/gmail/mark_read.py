@@ -10,7 +10,12 @@ import logging
 from app.core import state
 from app.services.auth import get_gmail_service
 from app.services.gmail.error_handler import handle_gmail_errors
-from app.services.gmail.helpers import build_gmail_query
+from app.services.gmail.helpers import MESSAGE_ID_FIELDS, build_gmail_query
+from app.services.gmail.rate_limit import (
+    BATCH_MODIFY_COST,
+    LIST_COST,
+    gmail_rate_limiter,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +31,12 @@ def get_unread_count() -> dict:
         results = (
             service.users()
             .messages()
-            .list(userId="me", q="is:unread in:inbox", maxResults=1)
+            .list(
+                userId="me",
+                q="is:unread in:inbox",
+                maxResults=1,
+                fields="resultSizeEstimate",
+            )
             .execute()
         )
 
@@ -70,26 +80,28 @@ def mark_emails_as_read(count: int = 100, filters: Optional[dict] = None):
 
         # count=0 means "all" - no limit
         mark_all = count == 0
-        page_size = 500
-        batch_size = 100
+        page_size = 500  # messages.list maximum
+        batch_size = 1000  # Gmail allows up to 1000 per batchModify
         marked = 0
         remaining = count  # Only used when not mark_all
         page_token = None
+        messages_api = service.users().messages()
+        # The client serializes the body when each request is built, so one
+        # dict is reused for every batch instead of building a new one
+        modify_body = {"ids": None, "removeLabelIds": ["UNREAD"]}
 
         # Process messages in chunks as we paginate (memory efficient)
         while True:
             # Fetch a page of messages
-            results = (
-                service.users()
-                .messages()
-                .list(
-                    userId="me",
-                    q=query,
-                    maxResults=page_size,
-                    pageToken=page_token,
-                )
-                .execute()
-            )
+            gmail_rate_limiter.acquire(LIST_COST)
+            # Never ask for more messages than are left to mark
+            results = messages_api.list(
+                userId="me",
+                q=query,
+                maxResults=page_size if mark_all else min(page_size, remaining),
+                pageToken=page_token,
+                fields=MESSAGE_ID_FIELDS,
+            ).execute()
 
             messages = results.get("messages", [])
             if not messages:
@@ -100,14 +112,14 @@ def mark_emails_as_read(count: int = 100, filters: Optional[dict] = None):
                 messages = messages[:remaining]
                 remaining -= len(messages)
 
-            # Mark this page in batches of 100
+            # Mark this page in batches of up to 1000, so a full page of
+            # 500 takes a single batchModify call
             for i in range(0, len(messages), batch_size):
-                batch = messages[i : i + batch_size]
-                ids = [msg["id"] for msg in batch]
+                ids = [msg["id"] for msg in messages[i : i + batch_size]]
+                modify_body["ids"] = ids
 
-                service.users().messages().batchModify(
-                    userId="me", body={"ids": ids, "removeLabelIds": ["UNREAD"]}
-                ).execute()
+                gmail_rate_limiter.acquire(BATCH_MODIFY_COST)
+                messages_api.batchModify(userId="me", body=modify_body).execute()
 
                 marked += len(ids)
                 state.mark_read_status["message"] = f"Marked {marked} as read..."
@@ -0,0 +1,116 @@
+"""
+Gmail API Rate Limiting
+-----------------------
+Client-side token bucket that keeps bulk operations under Gmail's
+per-user quota (250 quota units per second, 15,000 per minute).
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Window that usage is reported over, matching Gmail's per-minute quota
+_USAGE_WINDOW = 60.0
+
+
+class RateLimiter:
+    """Token bucket measured in Gmail quota units.
+
+    The bucket starts full, so short operations never wait; callers only
+    block once they have used up the burst and are close to the quota.
+    Units spent over the last minute are tracked too, and a warning is
+    logged when they pass usage_warning.
+    """
+
+    def __init__(
+        self,
+        quota_per_sec: float = 200,
+        capacity: float | None = None,
+        usage_warning: float | None = None,
+    ):
+        self.quota_per_sec = quota_per_sec
+        self.capacity = quota_per_sec if capacity is None else capacity
+        self.usage_warning = usage_warning
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        # (time, units) for every acquire within the usage window
+        self._spent: deque[tuple[float, float]] = deque()
+        self._spent_total = 0.0
+        self._warned = False
+
+    def acquire(self, cost: float) -> None:
+        """Block until `cost` quota units are available, then consume them."""
+        units = cost
+        # A call costing more than the bucket holds waits for a full bucket
+        # instead of blocking forever
+        cost = min(cost, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity,
+                    self._tokens + (now - self._updated) * self.quota_per_sec,
+                )
+                self._updated = now
+                if self._tokens >= cost:
+                    self._tokens -= cost
+                    warn = self._record(now, units)
+                    usage = self._spent_total
+                    break
+                wait = (cost - self._tokens) / self.quota_per_sec
+            time.sleep(wait)
+
+        if warn:
+            logger.warning(
+                f"Gmail quota usage is high: {usage:.0f} units in the last minute"
+            )
+
+    def usage(self) -> float:
+        """Quota units spent over the last minute."""
+        with self._lock:
+            self._prune(time.monotonic())
+            return self._spent_total
+
+    def _record(self, now: float, units: float) -> bool:
+        """Add spent units; returns True when usage first passes the warning."""
+        self._spent.append((now, units))
+        self._spent_total += units
+        self._prune(now)
+        if self.usage_warning is None:
+            return False
+        over = self._spent_total > self.usage_warning
+        # Warn once per spell of high usage rather than on every call
+        warn = over and not self._warned
+        self._warned = over
+        return warn
+
+    def _prune(self, now: float) -> None:
+        while self._spent and now - self._spent[0][0] >= _USAGE_WINDOW:
+            self._spent_total -= self._spent.popleft()[1]
+
+
+# Gmail quota units per call
+QUOTA_COSTS = {
+    "messages.list": 5,
+    "messages.get": 5,
+    "messages.batchModify": 50,
+    "labels.list": 1,
+    "labels.get": 1,
+    "labels.create": 5,
+    "labels.delete": 5,
+}
+LIST_COST = QUOTA_COSTS["messages.list"]
+GET_COST = QUOTA_COSTS["messages.get"]
+BATCH_MODIFY_COST = QUOTA_COSTS["messages.batchModify"]
+
+# Shared because Gmail's quota is per user rather than per operation.
+# Message-ID searches and the archive, delete, label, mark-read and
+# mark-important operations draw from it, so those jobs together stay
+# under the limit. The unsubscribe scan and email download do not; they
+# pace their batch fetches with their own sleeps. Warns at 80% of the
+# 15,000 units per minute.
+gmail_rate_limiter = RateLimiter(quota_per_sec=200, capacity=200, usage_warning=12000)
@@ -6,6 +6,7 @@ Optimized for large inboxes (100k+ emails) with streaming mode.
 """
 
 import logging
+import math
 import time
 from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -18,10 +19,12 @@ from app.core.exceptions import GmailCleanerError
 from app.services.auth import get_gmail_service
 from app.services.gmail.error_handler import handle_gmail_errors, with_retry
 from app.services.gmail.helpers import (
+    MESSAGE_ID_FIELDS,
     build_gmail_query,
     get_unsubscribe_from_headers,
     get_sender_info,
     get_subject,
+    index_headers,
 )
 
 logger = logging.getLogger(__name__)
@@ -101,6 +104,7 @@ def _scan_standard(service, query: str, limit: int) -> None:
         list_params = {
             "userId": "me",
             "maxResults": min(500, limit - len(message_ids)),
+            "fields": MESSAGE_ID_FIELDS,
         }
         if page_token:
             list_params["pageToken"] = page_token
@@ -133,6 +137,8 @@ def _scan_standard(service, query: str, limit: int) -> None:
             "email": "",
             "first_date": None,
             "last_date": None,
+            "first_ts": math.inf,
+            "last_ts": -math.inf,
         }
     )
     processed = 0
@@ -143,19 +149,15 @@ def _scan_standard(service, query: str, limit: int) -> None:
         if exception:
             return
         processed += 1
-        headers = response.get("payload", {}).get("headers", [])
+        # One pass over the headers; every lookup below is a dict hit
+        headers = index_headers(response.get("payload", {}).get("headers", []))
         unsub_link, unsub_type = get_unsubscribe_from_headers(headers)
 
         if unsub_link:
             sender_name, sender_email = get_sender_info(headers)
             subject = get_subject(headers)
             domain = sender_email.split("@")[-1] if "@" in sender_email else sender_email
-
-            email_date = None
-            for header in headers:
-                if header["name"].lower() == "date":
-                    email_date = header["value"]
-                    break
+            email_date = headers.get("date")
 
             unsubscribe_data[domain]["link"] = unsub_link
             unsubscribe_data[domain]["count"] += 1
@@ -207,6 +209,8 @@ def _scan_streaming(service, query: str, limit: int) -> None:
             "email": "",
             "first_date": None,
             "last_date": None,
+            "first_ts": math.inf,
+            "last_ts": -math.inf,
         }
     )
     processed = 0
@@ -225,6 +229,7 @@ def _scan_streaming(service, query: str, limit: int) -> None:
         list_params = {
             "userId": "me",
             "maxResults": min(500, limit - processed),
+            "fields": MESSAGE_ID_FIELDS,
         }
         if page_token:
             list_params["pageToken"] = page_token
@@ -269,19 +274,15 @@ def _process_batch(service, message_ids: List[str], unsubscribe_data: Dict) -> N
     def process_message(request_id, response, exception) -> None:
         if exception:
             return
-        headers = response.get("payload", {}).get("headers", [])
+        # One pass over the headers; every lookup below is a dict hit
+        headers = index_headers(response.get("payload", {}).get("headers", []))
         unsub_link, unsub_type = get_unsubscribe_from_headers(headers)
 
         if unsub_link:
             sender_name, sender_email = get_sender_info(headers)
             subject = get_subject(headers)
             domain = sender_email.split("@")[-1] if "@" in sender_email else sender_email
-
-            email_date = None
-            for header in headers:
-                if header["name"].lower() == "date":
-                    email_date = header["value"]
-                    break
+            email_date = headers.get("date")
 
             unsubscribe_data[domain]["link"] = unsub_link
             unsubscribe_data[domain]["count"] += 1
@@ -318,30 +319,19 @@ def _process_batch(service, message_ids: List[str], unsubscribe_data: Dict) -> N
 
 def _update_dates(data: dict, email_date: str) -> None:
     """Update first and last dates for a sender."""
+    # Compare against the timestamps cached alongside the date strings so the
+    # stored dates never have to be parsed again.
     try:
-        msg_datetime = parsedate_to_datetime(email_date)
-        
-        if data["first_date"] is None:
-            data["first_date"] = email_date
-        else:
-            try:
-                if msg_datetime < parsedate_to_datetime(data["first_date"]):
-                    data["first_date"] = email_date
-            except (ValueError, TypeError):
-                if email_date < data["first_date"]:
-                    data["first_date"] = email_date
-        
-        if data["last_date"] is None:
-            data["last_date"] = email_date
-        else:
-            try:
-                if msg_datetime > parsedate_to_datetime(data["last_date"]):
-                    data["last_date"] = email_date
-            except (ValueError, TypeError):
-                if email_date > data["last_date"]:
-                    data["last_date"] = email_date
+        timestamp = parsedate_to_datetime(email_date).timestamp()
     except (ValueError, TypeError):
-        pass
+        return
+
+    if timestamp < data["first_ts"]:
+        data["first_ts"] = timestamp
+        data["first_date"] = email_date
+    if timestamp > data["last_ts"]:
+        data["last_ts"] = timestamp
+        data["last_date"] = email_date
 
 
 def _finalize_results(unsubscribe_data: Dict, total_processed: int) -> None:
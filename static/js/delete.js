@@ -92,10 +92,10 @@ GmailCleaner.Delete = {
         }
     },
 
-    async pollProgress() {
+    async pollProgress(version = null) {
         try {
-            const response = await fetch('/api/delete-scan-status');
-            const status = await response.json();
+            const { status, version: nextVersion } =
+                await GmailCleaner.fetchStatus('/api/delete-scan-status', version);
 
             const progressBar = document.getElementById('deleteProgressBar');
             const progressText = document.getElementById('deleteProgressText');
@@ -113,7 +113,7 @@ GmailCleaner.Delete = {
                 }
                 this.resetScan();
             } else {
-                setTimeout(() => this.pollProgress(), 300);
+                setTimeout(() => this.pollProgress(nextVersion), 300);
             }
         } catch (error) {
             setTimeout(() => this.pollProgress(), 500);
@@ -307,10 +307,10 @@ GmailCleaner.Delete = {
         }
     },
 
-    async pollDeleteProgress(checkboxes) {
+    async pollDeleteProgress(checkboxes, version = null) {
         try {
-            const response = await fetch('/api/delete-bulk-status');
-            const status = await response.json();
+            const { status, version: nextVersion } =
+                await GmailCleaner.fetchStatus('/api/delete-bulk-status', version);
 
             // Update progress bar in overlay
             this.updateDeleteOverlay(status);
@@ -349,7 +349,7 @@ GmailCleaner.Delete = {
                     });
                 }
             } else {
-                setTimeout(() => this.pollDeleteProgress(checkboxes), 300);
+                setTimeout(() => this.pollDeleteProgress(checkboxes, nextVersion), 300);
             }
         } catch (error) {
             setTimeout(() => this.pollDeleteProgress(checkboxes), 500);
@@ -447,10 +447,10 @@ GmailCleaner.Delete = {
         }
     },
 
-    async pollDownloadProgress() {
+    async pollDownloadProgress(version = null) {
         try {
-            const response = await fetch('/api/download-status');
-            const status = await response.json();
+            const { status, version: nextVersion } =
+                await GmailCleaner.fetchStatus('/api/download-status', version);
 
             this.updateDownloadOverlay(status);
 
@@ -470,7 +470,7 @@ GmailCleaner.Delete = {
                     GmailCleaner.UI.showErrorToast('Error: ' + status.error);
                 }
             } else {
-                setTimeout(() => this.pollDownloadProgress(), 300);
+                setTimeout(() => this.pollDownloadProgress(nextVersion), 300);
             }
         } catch (error) {
             setTimeout(() => this.pollDownloadProgress(), 500);
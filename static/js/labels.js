@@ -94,15 +94,15 @@ GmailCleaner.Labels = {
         }
     },
 
-    async pollLabelOperation(onComplete) {
+    async pollLabelOperation(onComplete, version = null) {
         try {
-            const response = await fetch('/api/label-operation-status');
-            const status = await response.json();
+            const { status, version: nextVersion } =
+                await GmailCleaner.fetchStatus('/api/label-operation-status', version);
 
             if (status.done) {
                 onComplete(status);
             } else {
-                setTimeout(() => this.pollLabelOperation(onComplete), 300);
+                setTimeout(() => this.pollLabelOperation(onComplete, nextVersion), 300);
             }
 
             return status;
@@ -421,10 +421,10 @@ GmailCleaner.Labels = {
         }
     },
 
-    async pollArchiveStatus() {
+    async pollArchiveStatus(version = null) {
         try {
-            const response = await fetch('/api/archive-status');
-            const status = await response.json();
+            const { status, version: nextVersion } =
+                await GmailCleaner.fetchStatus('/api/archive-status', version);
 
             this.updateArchiveOverlay(status);
 
@@ -436,7 +436,7 @@ GmailCleaner.Labels = {
                     alert(`Archived ${status.archived_count} emails from ${status.total_senders} sender(s)`);
                 }
             } else {
-                setTimeout(() => this.pollArchiveStatus(), 300);
+                setTimeout(() => this.pollArchiveStatus(nextVersion), 300);
             }
         } catch (error) {
             setTimeout(() => this.pollArchiveStatus(), 500);
@@ -528,10 +528,10 @@ GmailCleaner.Labels = {
         }
     },
 
-    async pollImportantStatus() {
+    async pollImportantStatus(version = null) {
         try {
-            const response = await fetch('/api/important-status');
-            const status = await response.json();
+            const { status, version: nextVersion } =
+                await GmailCleaner.fetchStatus('/api/important-status', version);
 
             this.updateImportantOverlay(status);
 
@@ -543,7 +543,7 @@ GmailCleaner.Labels = {
                     alert(`Marked ${status.affected_count} emails as important`);
                 }
             } else {
-                setTimeout(() => this.pollImportantStatus(), 300);
+                setTimeout(() => this.pollImportantStatus(nextVersion), 300);
             }
         } catch (error) {
             setTimeout(() => this.pollImportantStatus(), 500);
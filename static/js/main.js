@@ -12,6 +12,16 @@ window.GmailCleaner = {
     currentView: 'login'
 };
 
+// Fetch an operation's status. Given the version from the previous poll, the
+// server holds the request until that status changes (or 20s pass).
+GmailCleaner.fetchStatus = async function (url, version = null) {
+    const response = await fetch(version === null ? url : `${url}?since=${version}&wait=20`);
+    return {
+        status: await response.json(),
+        version: response.headers.get('X-Status-Version')
+    };
+};
+
 // Initialize on page load
 document.addEventListener('DOMContentLoaded', () => {
     GmailCleaner.Auth.checkStatus();
@@ -62,10 +62,10 @@ GmailCleaner.MarkRead = {
         }
     },
 
-    async pollProgress() {
+    async pollProgress(version = null) {
         try {
-            const response = await fetch('/api/mark-read-status');
-            const status = await response.json();
+            const { status, version: nextVersion } =
+                await GmailCleaner.fetchStatus('/api/mark-read-status', version);
 
             const progressBar = document.getElementById('markReadProgressBar');
             const progressText = document.getElementById('markReadProgressText');
@@ -89,7 +89,7 @@ GmailCleaner.MarkRead = {
                     GmailCleaner.UI.showErrorToast('Error: ' + status.error);
                 }
             } else {
-                setTimeout(() => this.pollProgress(), 300);
+                setTimeout(() => this.pollProgress(nextVersion), 300);
             }
         } catch (error) {
             setTimeout(() => this.pollProgress(), 500);
@@ -86,10 +86,10 @@ GmailCleaner.Scanner = {
         }
     },
 
-    async pollProgress() {
+    async pollProgress(version = null) {
         try {
-            const response = await fetch('/api/status');
-            const status = await response.json();
+            const { status, version: nextVersion } =
+                await GmailCleaner.fetchStatus('/api/status', version);
 
             const progressBar = document.getElementById('progressBar');
             const progressText = document.getElementById('progressText');
@@ -116,7 +116,7 @@ GmailCleaner.Scanner = {
                 }
                 this.resetScan();
             } else {
-                setTimeout(() => this.pollProgress(), 300);
+                setTimeout(() => this.pollProgress(nextVersion), 300);
             }
         } catch (error) {
             setTimeout(() => this.pollProgress(), 500);
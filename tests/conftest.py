@@ -54,3 +54,21 @@ def mock_gmail_auth(monkeypatch):
         return original_exists(path)
 
     monkeypatch.setattr("os.path.exists", mock_exists)
+
+
+@pytest.fixture(autouse=True)
+def isolated_scan_cache(monkeypatch, tmp_path):
+    """Keep delete scan caches written by tests out of the real data dir."""
+    from app.core import settings
+
+    monkeypatch.setattr(
+        settings, "delete_scan_cache_file", str(tmp_path / "delete_scan_cache.json")
+    )
+
+
+@pytest.fixture(autouse=True)
+def unthrottled_gmail_calls(monkeypatch):
+    """Stop the shared quota bucket from slowing down mocked Gmail calls."""
+    from app.services.gmail.rate_limit import gmail_rate_limiter
+
+    monkeypatch.setattr(gmail_rate_limiter, "acquire", lambda cost: None)
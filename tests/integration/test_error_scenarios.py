@@ -2,7 +2,10 @@ import pytest
 from unittest.mock import MagicMock, patch
 from googleapiclient.errors import HttpError
 from app.services.gmail.scan import scan_emails
-from app.services.gmail.delete import delete_emails_by_sender
+from app.services.gmail.delete import (
+    delete_emails_bulk_background,
+    delete_emails_by_sender,
+)
 from app.core import state
 
 
@@ -67,6 +70,33 @@ class TestErrorScenarios:
             assert result["success"] is False
             assert "Rate Limit Exceeded" in result["message"]
 
+    def test_bulk_delete_falls_back_to_per_sender_queries(self):
+        """A rejected grouped query should be retried one sender at a time."""
+        mock_service = MagicMock()
+        mock_messages = mock_service.users().messages()
+
+        error_resp = MagicMock(status=400, reason="Bad Request")
+        bad_request = HttpError(resp=error_resp, content=b'{"error": {"code": 400}}')
+
+        def list_side_effect(**kwargs):
+            if " OR " in kwargs["q"]:
+                raise bad_request
+            sender = kwargs["q"].removeprefix("from:")
+            return MagicMock(execute=lambda: {"messages": [{"id": sender}]})
+
+        mock_messages.list.side_effect = list_side_effect
+
+        with patch(
+            "app.services.gmail.delete.get_gmail_service",
+            return_value=(mock_service, None),
+        ):
+            delete_emails_bulk_background(["a@example.com", "b@example.com"])
+
+        assert mock_messages.list.call_count == 3
+        _, kwargs = mock_messages.batchModify.call_args
+        assert kwargs["body"]["ids"] == ["a@example.com", "b@example.com"]
+        assert state.delete_bulk_status["error"] is None
+
     def test_auth_failure_handling(self):
         """Test handling of authentication failures."""
         # Mock get_gmail_service returning error
@@ -84,3 +114,38 @@ class TestErrorScenarios:
         scan_emails(limit=-1)
         assert state.scan_status["done"] is True
         assert "Limit must be greater than 0" in state.scan_status["error"]
+
+    def test_archive_waits_for_retry_after(self):
+        """A rate-limited archive batch should be retried after Retry-After."""
+        from httplib2 import Response
+
+        from app.services.gmail.archive import archive_emails_background
+
+        mock_service = MagicMock()
+        mock_messages = mock_service.users().messages()
+        mock_messages.list.return_value.execute.return_value = {
+            "messages": [{"id": "msg1"}]
+        }
+
+        rate_limited = HttpError(
+            resp=Response({"status": 429, "retry-after": "2"}),
+            content=b'{"error": {"code": 429, "message": "Rate Limit Exceeded"}}',
+        )
+        mock_messages.batchModify.return_value.execute.side_effect = [
+            rate_limited,
+            {},
+        ]
+
+        with (
+            patch(
+                "app.services.gmail.archive.get_gmail_service",
+                return_value=(mock_service, None),
+            ),
+            patch("app.services.gmail.archive.time.sleep") as mock_sleep,
+        ):
+            archive_emails_background(["sender@example.com"])
+
+        mock_sleep.assert_called_once_with(2.0)
+        assert mock_messages.batchModify.call_count == 2
+        assert state.archive_status["error"] is None
+        assert state.archive_status["archived_count"] == 1
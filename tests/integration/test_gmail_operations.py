@@ -1,6 +1,15 @@
+import json
+import time
+
 import pytest
 from unittest.mock import MagicMock, patch, call
-from app.services.gmail.delete import delete_emails_bulk_background
+
+from googleapiclient.errors import HttpError
+from app.services.gmail.delete import (
+    delete_emails_bulk,
+    delete_emails_bulk_background,
+    scan_senders_for_delete,
+)
 from app.services.gmail.archive import archive_emails_background
 from app.services.gmail.mark_read import mark_emails_as_read
 from app.core import state
@@ -22,13 +31,10 @@ class TestGmailOperations:
         mock_service = MagicMock()
         mock_messages = mock_service.users().messages()
 
-        # Mock finding messages for a sender
-        # First call: list messages for sender1
-        # Second call: list messages for sender2
-        mock_messages.list.side_effect = [
-            MagicMock(execute=lambda: {"messages": [{"id": "msg1"}, {"id": "msg2"}]}),
-            MagicMock(execute=lambda: {"messages": [{"id": "msg3"}]}),
-        ]
+        # Both senders are searched with a single OR'ed query
+        mock_messages.list.return_value.execute.return_value = {
+            "messages": [{"id": "msg1"}, {"id": "msg2"}, {"id": "msg3"}]
+        }
 
         # Mock batch modify
         mock_batch_modify = mock_messages.batchModify.return_value
@@ -41,8 +47,12 @@ class TestGmailOperations:
             senders = ["sender1@example.com", "sender2@example.com"]
             delete_emails_bulk_background(senders)
 
-            # Verify list was called for each sender
-            assert mock_messages.list.call_count == 2
+            # Verify one list call covered both senders
+            assert mock_messages.list.call_count == 1
+            assert (
+                mock_messages.list.call_args.kwargs["q"]
+                == "from:(sender1@example.com OR sender2@example.com)"
+            )
 
             # Verify batch modify was called
             # delete_emails_bulk_background collects all IDs and then calls batchModify in chunks of 1000
@@ -58,6 +68,276 @@ class TestGmailOperations:
                 "Successfully deleted 3 emails" in state.delete_bulk_status["message"]
             )
 
+    def test_delete_emails_bulk_searches_groups_concurrently(self):
+        """Each sender group should be searched and all IDs collected."""
+        mock_service = MagicMock()
+        mock_messages = mock_service.users().messages()
+
+        def list_side_effect(**kwargs):
+            sender = kwargs["q"].removeprefix("from:")
+            return MagicMock(execute=lambda: {"messages": [{"id": sender}]})
+
+        mock_messages.list.side_effect = list_side_effect
+        mock_messages.batchModify.return_value.execute.return_value = {}
+
+        senders = ["a@example.com", "b@example.com", "c@example.com"]
+        with (
+            patch(
+                "app.services.gmail.delete.get_gmail_service",
+                return_value=(mock_service, None),
+            ),
+            patch("app.services.gmail.delete.settings") as mock_settings,
+        ):
+            mock_settings.sender_query_group_size = 1
+            delete_emails_bulk_background(senders)
+
+        assert mock_messages.list.call_count == 3
+        _, kwargs = mock_messages.batchModify.call_args
+        assert sorted(kwargs["body"]["ids"]) == senders
+        assert state.delete_bulk_status["current_sender"] == 3
+        assert "Successfully deleted 3 emails" in state.delete_bulk_status["message"]
+
+    @staticmethod
+    def _delete_scan_service(senders):
+        """Mock service whose batch fetches return headers for senders."""
+        mock_service = MagicMock()
+        mock_messages = mock_service.users().messages()
+        mock_messages.list.return_value.execute.return_value = {
+            "messages": [{"id": msg_id} for msg_id in senders]
+        }
+        mock_messages.get.side_effect = lambda **kwargs: kwargs["id"]
+        mock_service.users().getProfile.return_value.execute.return_value = {
+            "emailAddress": "me@example.com",
+            "historyId": "100",
+        }
+
+        def new_batch(callback):
+            batch = MagicMock()
+            added = []
+            batch.add.side_effect = added.append
+
+            def execute():
+                for msg_id in added:
+                    response = {
+                        "id": msg_id,
+                        "sizeEstimate": 10,
+                        "payload": {
+                            "headers": [
+                                {"name": "From", "value": senders[msg_id]},
+                                {"name": "Subject", "value": f"Subject {msg_id}"},
+                                {"name": "Date", "value": f"Date {msg_id}"},
+                            ]
+                        },
+                    }
+                    callback(msg_id, response, None)
+
+            batch.execute.side_effect = execute
+            return batch
+
+        mock_service.new_batch_http_request.side_effect = new_batch
+        return mock_service
+
+    def test_scan_senders_for_delete_groups_by_sender(self):
+        """Scanned messages should be totalled per sender, largest first."""
+        mock_service = self._delete_scan_service(
+            {
+                "m1": "Shop <shop@example.com>",
+                "m2": "news@example.com",
+                "m3": "Shop <shop@example.com>",
+            }
+        )
+
+        with patch(
+            "app.services.gmail.delete.get_gmail_service",
+            return_value=(mock_service, None),
+        ):
+            scan_senders_for_delete(limit=10)
+
+        assert state.delete_scan_status["done"] is True
+        # No filters and no truncation: the scan saw the whole mailbox
+        assert state.delete_scan_complete_at is not None
+        assert state.delete_scan_results == [
+            {
+                "email": "shop@example.com",
+                "count": 2,
+                "sender": "Shop",
+                "subjects": ["Subject m1", "Subject m3"],
+                "first_date": "Date m1",
+                "last_date": "Date m3",
+                "message_ids": ["m1", "m3"],
+                "total_size": 20,
+            },
+            {
+                "email": "news@example.com",
+                "count": 1,
+                "sender": "news@example.com",
+                "subjects": ["Subject m2"],
+                "first_date": "Date m2",
+                "last_date": "Date m2",
+                "message_ids": ["m2"],
+                "total_size": 10,
+            },
+        ]
+
+    def test_scan_senders_for_delete_applies_changes_to_cached_scan(self):
+        """A repeat whole-mailbox scan should only fetch changed messages."""
+        senders = {
+            "m1": "Shop <shop@example.com>",
+            "m2": "news@example.com",
+        }
+        mock_service = self._delete_scan_service(senders)
+        with patch(
+            "app.services.gmail.delete.get_gmail_service",
+            return_value=(mock_service, None),
+        ):
+            scan_senders_for_delete(limit=10)
+            assert mock_service.users().messages().list.call_count == 1
+
+            # m3 arrives, m1 is trashed and m2 is deleted since the scan
+            senders["m3"] = "news@example.com"
+            mock_service.users().history().list.return_value.execute.return_value = {
+                "historyId": "120",
+                "history": [
+                    {"messagesAdded": [{"message": {"id": "m3", "labelIds": []}}]},
+                    {"labelsAdded": [{"message": {"id": "m1"}, "labelIds": ["TRASH"]}]},
+                    {"messagesDeleted": [{"message": {"id": "m2"}}]},
+                ],
+            }
+            scan_senders_for_delete(limit=10)
+
+        # No new listing; only the added message was fetched
+        assert mock_service.users().messages().list.call_count == 1
+        assert (
+            mock_service.users().history().list.call_args.kwargs["startHistoryId"]
+            == "100"
+        )
+        assert [r["message_ids"] for r in state.delete_scan_results] == [["m3"]]
+        assert state.delete_scan_complete_at is not None
+
+    def test_scan_senders_for_delete_rescans_when_history_expired(self):
+        """Gmail no longer having the cached history ID should force a rescan."""
+        mock_service = self._delete_scan_service({"m1": "news@example.com"})
+        mock_service.users().history().list.return_value.execute.side_effect = (
+            HttpError(resp=MagicMock(status=404), content=b"{}")
+        )
+        with patch(
+            "app.services.gmail.delete.get_gmail_service",
+            return_value=(mock_service, None),
+        ):
+            scan_senders_for_delete(limit=10)
+            scan_senders_for_delete(limit=10)
+
+        assert mock_service.users().messages().list.call_count == 2
+        assert state.delete_scan_results[0]["message_ids"] == ["m1"]
+
+    def test_delete_emails_bulk_reuses_complete_scan_ids(self):
+        """IDs from a whole-mailbox scan should only need a catch-up search."""
+        mock_service = MagicMock()
+        mock_messages = mock_service.users().messages()
+
+        def list_side_effect(**kwargs):
+            if "after:" in kwargs["q"]:
+                found = [{"id": "new"}, {"id": "old1"}]
+            else:
+                found = [{"id": "other"}]
+            return MagicMock(execute=lambda: {"messages": found})
+
+        mock_messages.list.side_effect = list_side_effect
+        state.delete_scan_results = [
+            {"email": "a@example.com", "message_ids": ["old1", "old2"]},
+        ]
+        scanned_at = time.time() - 60
+        state.delete_scan_complete_at = scanned_at
+
+        with patch(
+            "app.services.gmail.delete.get_gmail_service",
+            return_value=(mock_service, None),
+        ):
+            delete_emails_bulk_background(["a@example.com", "b@example.com"])
+
+        queries = sorted(c.kwargs["q"] for c in mock_messages.list.call_args_list)
+        assert queries == [
+            f"from:a@example.com after:{int(scanned_at) - 300}",
+            "from:b@example.com",
+        ]
+        _, kwargs = mock_messages.batchModify.call_args
+        assert sorted(kwargs["body"]["ids"]) == ["new", "old1", "old2", "other"]
+
+    def test_delete_emails_bulk_searches_again_after_old_scan(self):
+        """IDs from an old scan should not be trusted; senders are searched."""
+        mock_service = MagicMock()
+        mock_messages = mock_service.users().messages()
+        mock_messages.list.return_value.execute.return_value = {
+            "messages": [{"id": "fresh"}]
+        }
+        state.delete_scan_results = [
+            {"email": "a@example.com", "message_ids": ["gone"]},
+        ]
+        state.delete_scan_complete_at = time.time() - 24 * 3600
+
+        with patch(
+            "app.services.gmail.delete.get_gmail_service",
+            return_value=(mock_service, None),
+        ):
+            delete_emails_bulk_background(["a@example.com"])
+
+        _, kwargs = mock_messages.list.call_args
+        assert kwargs["q"] == "from:a@example.com"
+        _, kwargs = mock_messages.batchModify.call_args
+        assert kwargs["body"]["ids"] == ["fresh"]
+
+    def test_delete_emails_bulk_continues_after_failed_batch(self):
+        """One failed batchModify should not stop the remaining batches."""
+        mock_service = MagicMock()
+        mock_messages = mock_service.users().messages()
+        mock_messages.list.return_value.execute.return_value = {
+            "messages": [{"id": f"m{i}"} for i in range(2500)]
+        }
+        mock_messages.batchModify.return_value.execute.side_effect = [
+            Exception("Invalid id"),
+            {},
+            {},
+        ]
+
+        with patch(
+            "app.services.gmail.delete.get_gmail_service",
+            return_value=(mock_service, None),
+        ):
+            delete_emails_bulk_background(["a@example.com"])
+
+        assert mock_messages.batchModify.call_count == 3
+        assert state.delete_bulk_status["deleted_count"] == 1500
+        assert "Invalid id" in state.delete_bulk_status["error"]
+
+    def test_delete_emails_bulk_prunes_cached_senders(self):
+        """Senders with deleted mail should leave the cached scan results."""
+        mock_service = MagicMock()
+        mock_messages = mock_service.users().messages()
+
+        def list_side_effect(**kwargs):
+            found = [] if kwargs["q"] == "from:empty@example.com" else [{"id": "m"}]
+            return MagicMock(execute=lambda: {"messages": found})
+
+        mock_messages.list.side_effect = list_side_effect
+        state.delete_scan_results = [
+            {"email": "a@example.com", "total_size": 5},
+            {"email": "empty@example.com", "total_size": 0},
+            {"email": "kept@example.com", "total_size": 7},
+        ]
+
+        with patch(
+            "app.services.gmail.delete.get_gmail_service",
+            return_value=(mock_service, None),
+        ):
+            result = delete_emails_bulk([" a@example.com ", "empty@example.com"])
+
+        assert result["deleted"] == 1
+        assert result["size_freed"] == 5
+        assert [r["email"] for r in state.delete_scan_results] == [
+            "empty@example.com",
+            "kept@example.com",
+        ]
+
     def test_archive_emails(self):
         """Test archiving emails from multiple senders."""
         mock_service = MagicMock()
@@ -90,6 +370,466 @@ class TestGmailOperations:
             assert state.archive_status["done"] is True
             assert "Archived 1 emails" in state.archive_status["message"]
 
+    @staticmethod
+    def _label_service(list_side_effect):
+        """Mock service whose HTTP batches run the queued list requests."""
+        mock_service = MagicMock()
+        mock_service.users().messages().list.side_effect = list_side_effect
+        mock_service.batch_sizes = []
+
+        def new_batch(callback):
+            batch = MagicMock()
+            added = []
+            batch.add.side_effect = lambda request, request_id: added.append(
+                (request_id, request)
+            )
+
+            def execute():
+                mock_service.batch_sizes.append(len(added))
+                for request_id, request in added:
+                    try:
+                        response = request.execute()
+                    except Exception as e:
+                        callback(request_id, None, e)
+                    else:
+                        callback(request_id, response, None)
+
+            batch.execute.side_effect = execute
+            return batch
+
+        mock_service.new_batch_http_request.side_effect = new_batch
+        return mock_service
+
+    def test_apply_label_batches_first_pages(self):
+        """First pages should be batched; later pages searched separately."""
+        from app.services.gmail.labels import apply_label_to_senders_background
+
+        def list_side_effect(**kwargs):
+            sender = kwargs["q"].removeprefix("from:")
+            if kwargs.get("pageToken"):
+                page = {"messages": [{"id": f"{sender}-2"}]}
+            elif sender == "b@example.com":
+                page = {"messages": [{"id": sender}], "nextPageToken": "t"}
+            else:
+                page = {"messages": [{"id": sender}]}
+            return MagicMock(execute=lambda: page)
+
+        mock_service = self._label_service(list_side_effect)
+        mock_messages = mock_service.users().messages()
+
+        with (
+            patch(
+                "app.services.gmail.labels.get_gmail_service",
+                return_value=(mock_service, None),
+            ),
+            patch("app.services.gmail.labels.settings") as mock_settings,
+        ):
+            mock_settings.sender_query_group_size = 1
+            apply_label_to_senders_background(
+                "Label_1", ["a@example.com", "b@example.com"]
+            )
+
+        assert mock_service.new_batch_http_request.call_count == 1
+        assert mock_messages.list.call_count == 3
+        _, kwargs = mock_messages.batchModify.call_args
+        assert sorted(kwargs["body"]["ids"]) == [
+            "a@example.com",
+            "b@example.com",
+            "b@example.com-2",
+        ]
+        assert kwargs["body"]["addLabelIds"] == ["Label_1"]
+        assert state.label_operation_status["error"] is None
+        assert state.label_operation_status["affected_count"] == 3
+
+    def test_apply_label_skips_duplicate_messages(self):
+        """Messages matched by several senders should be modified once."""
+        from app.services.gmail.labels import apply_label_to_senders_background
+
+        mock_service = self._label_service(
+            lambda **kwargs: MagicMock(
+                execute=lambda: {"messages": [{"id": "shared"}, {"id": kwargs["q"]}]}
+            )
+        )
+        mock_messages = mock_service.users().messages()
+
+        with (
+            patch(
+                "app.services.gmail.labels.get_gmail_service",
+                return_value=(mock_service, None),
+            ),
+            patch("app.services.gmail.labels.settings") as mock_settings,
+        ):
+            mock_settings.sender_query_group_size = 1
+            apply_label_to_senders_background(
+                "Label_1", ["a@example.com", "example.com"]
+            )
+
+        _, kwargs = mock_messages.batchModify.call_args
+        assert sorted(kwargs["body"]["ids"]) == [
+            "from:a@example.com",
+            "from:example.com",
+            "shared",
+        ]
+        assert state.label_operation_status["affected_count"] == 3
+
+    def test_apply_label_splits_large_sender_lists_into_batches(self):
+        """No HTTP batch should carry more than 50 list requests."""
+        from app.services.gmail.labels import apply_label_to_senders_background
+
+        mock_service = self._label_service(
+            lambda **kwargs: MagicMock(execute=lambda: {})
+        )
+        senders = [f"s{i}@example.com" for i in range(120)]
+
+        with (
+            patch(
+                "app.services.gmail.labels.get_gmail_service",
+                return_value=(mock_service, None),
+            ),
+            patch("app.services.gmail.labels.settings") as mock_settings,
+        ):
+            mock_settings.sender_query_group_size = 1
+            apply_label_to_senders_background("Label_1", senders)
+
+        assert mock_service.batch_sizes == [50, 50, 20]
+        assert mock_service.users().messages().list.call_count == 120
+        assert state.label_operation_status["message"] == "No emails found to label"
+
+    def test_remove_label_reports_failed_senders(self):
+        """A failed sender search should not stop the other senders."""
+        from app.services.gmail.labels import remove_label_from_senders_background
+
+        def list_side_effect(**kwargs):
+            if kwargs["q"].startswith("from:bad@example.com"):
+                return MagicMock(
+                    execute=MagicMock(side_effect=RuntimeError("search failed"))
+                )
+            assert kwargs["q"] == "from:good@example.com label:Receipts"
+            return MagicMock(execute=lambda: {"messages": [{"id": "m1"}]})
+
+        mock_service = self._label_service(list_side_effect)
+        mock_service.users().labels().get.return_value.execute.return_value = {
+            "name": "Receipts"
+        }
+        mock_messages = mock_service.users().messages()
+
+        with (
+            patch(
+                "app.services.gmail.labels.get_gmail_service",
+                return_value=(mock_service, None),
+            ),
+            patch.dict("app.services.gmail.labels._label_names", clear=True),
+            patch("app.services.gmail.labels.settings") as mock_settings,
+        ):
+            mock_settings.sender_query_group_size = 1
+            remove_label_from_senders_background(
+                "Label_1", ["bad@example.com", "good@example.com"]
+            )
+
+        _, kwargs = mock_messages.batchModify.call_args
+        assert kwargs["body"] == {"ids": ["m1"], "removeLabelIds": ["Label_1"]}
+        assert "bad@example.com: search failed" in state.label_operation_status["error"]
+        assert state.label_operation_status["affected_count"] == 1
+
+    def test_apply_label_groups_senders_into_queries(self):
+        """Senders should be searched several per OR'ed query."""
+        from app.services.gmail.labels import apply_label_to_senders_background
+
+        mock_service = self._label_service(
+            lambda **kwargs: MagicMock(
+                execute=lambda: {"messages": [{"id": kwargs["q"]}]}
+            )
+        )
+        mock_messages = mock_service.users().messages()
+        senders = ["a@example.com", "b@example.com", "c@example.com"]
+
+        with (
+            patch(
+                "app.services.gmail.labels.get_gmail_service",
+                return_value=(mock_service, None),
+            ),
+            patch("app.services.gmail.labels.settings") as mock_settings,
+        ):
+            mock_settings.sender_query_group_size = 2
+            apply_label_to_senders_background("Label_1", senders)
+
+        queries = [c.kwargs["q"] for c in mock_messages.list.call_args_list]
+        assert queries == [
+            "from:(a@example.com OR b@example.com)",
+            "from:c@example.com",
+        ]
+        assert state.label_operation_status["current_sender"] == 3
+        assert state.label_operation_status["affected_count"] == 2
+
+    def test_remove_label_splits_rejected_group_queries(self):
+        """A group query Gmail rejects should be retried one sender at a time."""
+        from googleapiclient.errors import HttpError
+        from httplib2 import Response
+
+        from app.services.gmail.labels import remove_label_from_senders_background
+
+        def list_side_effect(**kwargs):
+            if " OR " in kwargs["q"]:
+                error = HttpError(resp=Response({"status": 400}), content=b"{}")
+                return MagicMock(execute=MagicMock(side_effect=error))
+            return MagicMock(execute=lambda: {"messages": [{"id": kwargs["q"]}]})
+
+        mock_service = self._label_service(list_side_effect)
+        mock_service.users().labels().get.return_value.execute.return_value = {
+            "name": "Receipts"
+        }
+
+        with (
+            patch(
+                "app.services.gmail.labels.get_gmail_service",
+                return_value=(mock_service, None),
+            ),
+            patch.dict("app.services.gmail.labels._label_names", clear=True),
+        ):
+            remove_label_from_senders_background(
+                "Label_1", ["a@example.com", "b@example.com"]
+            )
+
+        _, kwargs = mock_service.users().messages().batchModify.call_args
+        assert sorted(kwargs["body"]["ids"]) == [
+            "from:a@example.com label:Receipts",
+            "from:b@example.com label:Receipts",
+        ]
+        assert state.label_operation_status["error"] is None
+        assert state.label_operation_status["current_sender"] == 2
+
+    def test_apply_label_starts_modifying_during_search(self):
+        """Full chunks should be labelled before the search finishes."""
+        import threading
+
+        from app.services.gmail.labels import apply_label_to_senders_background
+
+        first_chunk_sent = threading.Event()
+        overlapped = []
+
+        def next_page():
+            # Labelling of the first page's full chunk runs meanwhile
+            overlapped.append(first_chunk_sent.wait(timeout=5))
+            return {"messages": [{"id": "last"}]}
+
+        def list_side_effect(**kwargs):
+            if kwargs.get("pageToken"):
+                return MagicMock(execute=next_page)
+            page = {
+                "messages": [{"id": f"m{i}"} for i in range(1000)],
+                "nextPageToken": "t",
+            }
+            return MagicMock(execute=lambda: page)
+
+        def batch_modify(**kwargs):
+            first_chunk_sent.set()
+            return MagicMock(execute=lambda: {})
+
+        mock_service = self._label_service(list_side_effect)
+        mock_messages = mock_service.users().messages()
+        mock_messages.batchModify.side_effect = batch_modify
+
+        with patch(
+            "app.services.gmail.labels.get_gmail_service",
+            return_value=(mock_service, None),
+        ):
+            apply_label_to_senders_background("Label_1", ["a@example.com"])
+
+        assert overlapped == [True]
+        sent = [
+            c.kwargs["body"]["ids"] for c in mock_messages.batchModify.call_args_list
+        ]
+        assert sorted(map(len, sent)) == [1, 1000]
+        assert state.label_operation_status["affected_count"] == 1001
+
+    def test_remove_label_waits_for_search_before_modifying(self):
+        """Removing a label must not change results that are being paged."""
+        from app.services.gmail.labels import remove_label_from_senders_background
+
+        modified_during_search = []
+
+        def list_side_effect(**kwargs):
+            if kwargs.get("pageToken"):
+
+                def next_page():
+                    modified_during_search.append(
+                        mock_service.users().messages().batchModify.called
+                    )
+                    return {"messages": [{"id": f"n{i}"} for i in range(500)]}
+
+                return MagicMock(execute=next_page)
+            page = {
+                "messages": [{"id": f"m{i}"} for i in range(1500)],
+                "nextPageToken": "t",
+            }
+            return MagicMock(execute=lambda: page)
+
+        mock_service = self._label_service(list_side_effect)
+        mock_service.users().labels().get.return_value.execute.return_value = {
+            "name": "Receipts"
+        }
+
+        with (
+            patch(
+                "app.services.gmail.labels.get_gmail_service",
+                return_value=(mock_service, None),
+            ),
+            patch.dict("app.services.gmail.labels._label_names", clear=True),
+        ):
+            remove_label_from_senders_background("Label_1", ["a@example.com"])
+
+        assert modified_during_search == [False]
+        sent = mock_service.users().messages().batchModify.call_args_list
+        assert sorted(len(c.kwargs["body"]["ids"]) for c in sent) == [1000, 1000]
+        assert state.label_operation_status["affected_count"] == 2000
+
+    def test_remove_label_reuses_label_name(self):
+        """The label name should only be fetched once across operations."""
+        from app.services.gmail.labels import remove_label_from_senders_background
+
+        mock_service = self._label_service(
+            lambda **kwargs: MagicMock(execute=lambda: {"messages": [{"id": "m1"}]})
+        )
+        mock_get = mock_service.users().labels().get
+        mock_get.return_value.execute.return_value = {"name": "Receipts"}
+
+        with (
+            patch(
+                "app.services.gmail.labels.get_gmail_service",
+                return_value=(mock_service, None),
+            ),
+            patch.dict("app.services.gmail.labels._label_names", clear=True),
+        ):
+            remove_label_from_senders_background("Label_1", ["a@example.com"])
+            remove_label_from_senders_background("Label_1", ["b@example.com"])
+
+        assert mock_get.call_count == 1
+        queries = [
+            c.kwargs["q"] for c in mock_service.users().messages().list.call_args_list
+        ]
+        assert queries == [
+            "from:a@example.com label:Receipts",
+            "from:b@example.com label:Receipts",
+        ]
+
+    def test_listed_labels_are_cached(self):
+        """Label names from get_labels should serve later remove operations."""
+        from app.services.gmail.labels import (
+            get_labels,
+            remove_label_from_senders_background,
+        )
+
+        mock_service = self._label_service(
+            lambda **kwargs: MagicMock(execute=lambda: {})
+        )
+        mock_labels = mock_service.users().labels()
+        mock_labels.list.return_value.execute.return_value = {
+            "labels": [{"id": "Label_7", "name": "Travel", "type": "user"}]
+        }
+
+        with (
+            patch(
+                "app.services.gmail.labels.get_gmail_service",
+                return_value=(mock_service, None),
+            ),
+            patch.dict("app.services.gmail.labels._label_names", clear=True),
+        ):
+            get_labels()
+            remove_label_from_senders_background("Label_7", ["a@example.com"])
+
+        mock_labels.get.assert_not_called()
+        _, kwargs = mock_service.users().messages().list.call_args
+        assert kwargs["q"] == "from:a@example.com label:Travel"
+
+    @staticmethod
+    def _label_api_error(status: int, reason: str, message: str):
+        from httplib2 import Response
+
+        content = json.dumps(
+            {"error": {"message": message, "errors": [{"reason": reason}]}}
+        ).encode()
+        return HttpError(resp=Response({"status": status}), content=content)
+
+    def test_create_label_reports_duplicate_names(self):
+        """A duplicate label should be recognised from Gmail's error status."""
+        from app.services.gmail.labels import create_label
+
+        mock_service = MagicMock()
+        mock_service.users().labels().create.return_value.execute.side_effect = (
+            self._label_api_error(409, "duplicate", "Label name exists or conflicts")
+        )
+
+        with patch(
+            "app.services.gmail.labels.get_gmail_service",
+            return_value=(mock_service, None),
+        ):
+            result = create_label("Work")
+
+        assert result == {
+            "success": False,
+            "label": None,
+            "error": "A label with this name already exists",
+        }
+
+    def test_delete_label_maps_error_statuses(self):
+        """Missing and system labels should get their own messages, others Gmail's."""
+        from app.services.gmail.labels import delete_label
+
+        mock_service = MagicMock()
+        mock_delete = mock_service.users().labels().delete.return_value
+        mock_delete.execute.side_effect = [
+            self._label_api_error(404, "notFound", "Requested entity was not found."),
+            self._label_api_error(400, "invalidArgument", "Invalid delete request"),
+            self._label_api_error(403, "forbidden", "Insufficient Permission"),
+            self._label_api_error(400, "invalidArgument", "Invalid label id"),
+        ]
+
+        with patch(
+            "app.services.gmail.labels.get_gmail_service",
+            return_value=(mock_service, None),
+        ):
+            results = [delete_label("Label_1") for _ in range(4)]
+
+        assert [r["error"] for r in results] == [
+            "Label not found",
+            "Cannot delete system labels",
+            "Insufficient Permission",
+            "Invalid label id",
+        ]
+
+    def test_apply_label_modifies_chunks_concurrently(self):
+        """Large label runs should send every chunk and report failed ones."""
+        from app.services.gmail.labels import apply_label_to_senders_background
+
+        ids = [f"m{i}" for i in range(2500)]
+        mock_service = self._label_service(
+            lambda **kwargs: MagicMock(
+                execute=lambda: {"messages": [{"id": i} for i in ids]}
+            )
+        )
+        mock_messages = mock_service.users().messages()
+
+        def batch_modify(**kwargs):
+            if kwargs["body"]["ids"][0] == "m1000":
+                raise RuntimeError("chunk failed")
+            return MagicMock(execute=lambda: {})
+
+        mock_messages.batchModify.side_effect = batch_modify
+
+        with patch(
+            "app.services.gmail.labels.get_gmail_service",
+            return_value=(mock_service, None),
+        ):
+            apply_label_to_senders_background("Label_1", ["a@example.com"])
+
+        sent = sorted(
+            len(c.kwargs["body"]["ids"])
+            for c in mock_messages.batchModify.call_args_list
+        )
+        assert sent == [500, 1000, 1000]
+        assert state.label_operation_status["affected_count"] == 1500
+        assert "chunk failed" in state.label_operation_status["error"]
+
     def test_mark_emails_as_read(self):
         """Test marking emails as read."""
         mock_service = MagicMock()
@@ -167,3 +907,79 @@ class TestGmailOperations:
             # Verify second batch size
             args2, kwargs2 = mock_messages.batchModify.call_args_list[1]
             assert len(kwargs2["body"]["ids"]) == 500
+
+    def test_mark_read_draws_from_shared_quota(self):
+        """Mark-as-read calls should be charged to the shared rate limiter."""
+        mock_service = MagicMock()
+        mock_messages = mock_service.users().messages()
+        mock_messages.list.return_value.execute.return_value = {
+            "messages": [{"id": "msg1"}, {"id": "msg2"}]
+        }
+
+        with (
+            patch(
+                "app.services.gmail.mark_read.get_gmail_service",
+                return_value=(mock_service, None),
+            ),
+            patch("app.services.gmail.mark_read.gmail_rate_limiter") as mock_limiter,
+        ):
+            mark_emails_as_read(count=10)
+
+        assert [c.args[0] for c in mock_limiter.acquire.call_args_list] == [5, 50]
+
+    def test_mark_read_marks_full_page_in_one_call(self):
+        """A full page of 500 messages should be marked with one batchModify."""
+        mock_service = MagicMock()
+        mock_messages = mock_service.users().messages()
+        mock_messages.list.return_value.execute.return_value = {
+            "messages": [{"id": f"msg{i}"} for i in range(500)]
+        }
+
+        with patch(
+            "app.services.gmail.mark_read.get_gmail_service",
+            return_value=(mock_service, None),
+        ):
+            mark_emails_as_read(count=500)
+
+        assert mock_messages.batchModify.call_count == 1
+        assert state.mark_read_status["marked_count"] == 500
+
+    def test_delete_bulk_draws_from_shared_quota(self):
+        """Bulk delete searches and trash calls should be charged to the limiter."""
+        mock_service = MagicMock()
+        mock_messages = mock_service.users().messages()
+        mock_messages.list.return_value.execute.return_value = {
+            "messages": [{"id": "msg1"}]
+        }
+
+        with (
+            patch(
+                "app.services.gmail.delete.get_gmail_service",
+                return_value=(mock_service, None),
+            ),
+            patch("app.services.gmail.delete.gmail_rate_limiter") as delete_limiter,
+            patch("app.services.gmail.helpers.gmail_rate_limiter") as search_limiter,
+        ):
+            delete_emails_bulk_background(["a@example.com"])
+
+        assert [c.args[0] for c in search_limiter.acquire.call_args_list] == [5]
+        assert [c.args[0] for c in delete_limiter.acquire.call_args_list] == [50]
+
+    def test_mark_read_lists_only_requested_count(self):
+        """A limited run should not fetch more IDs than it will mark."""
+        mock_service = MagicMock()
+        mock_messages = mock_service.users().messages()
+        mock_messages.list.return_value.execute.return_value = {
+            "messages": [{"id": f"msg{i}"} for i in range(10)],
+            "nextPageToken": "token1",
+        }
+
+        with patch(
+            "app.services.gmail.mark_read.get_gmail_service",
+            return_value=(mock_service, None),
+        ):
+            mark_emails_as_read(count=10)
+
+        mock_messages.list.assert_called_once()
+        assert mock_messages.list.call_args.kwargs["maxResults"] == 10
+        assert state.mark_read_status["marked_count"] == 10
@@ -219,3 +219,76 @@ class TestRequestValidation:
         """Invalid older_than format should fail validation."""
         response = client.post("/api/scan", json={"filters": {"older_than": "30days"}})
         assert response.status_code == 422
+
+
+class TestAcknowledgementResponses:
+    """Tests for the pre-serialized acknowledgement responses."""
+
+    @patch("app.api.actions.scan_emails")
+    def test_each_request_runs_its_own_task(self, mock_scan, client):
+        """Responses must not be shared, or tasks would leak across requests."""
+        first = client.post("/api/scan", json={"limit": 100})
+        second = client.post("/api/scan", json={"limit": 200})
+
+        assert first.content == second.content == b'{"status":"started"}'
+        assert first.headers["content-type"] == "application/json"
+        assert [c.args[0] for c in mock_scan.call_args_list] == [100, 200]
+
+
+class TestMarkImportantEndpoint:
+    """Tests for POST /api/mark-important endpoint."""
+
+    @patch("app.api.actions.mark_important_background")
+    def test_mark_important_passes_flag(self, mock_mark, client):
+        """The important flag should reach the background task as a keyword."""
+        response = client.post(
+            "/api/mark-important",
+            json={"senders": ["news@example.com"], "important": False},
+        )
+        assert response.status_code == 200
+        assert response.json() == {"status": "started"}
+        mock_mark.assert_called_once_with(["news@example.com"], important=False)
+
+    def test_mark_important_requires_senders(self, client):
+        """An empty sender list should be rejected."""
+        response = client.post("/api/mark-important", json={"senders": []})
+        assert response.status_code == 422
+
+
+class TestErrorHandling:
+    """Tests for mapping service errors to HTTP responses."""
+
+    @patch("app.api.actions.delete_label")
+    def test_not_found_maps_to_404(self, mock_delete_label, client):
+        """ResourceNotFoundError should surface as a 404 with its message."""
+        from app.core.exceptions import ResourceNotFoundError
+
+        mock_delete_label.side_effect = ResourceNotFoundError("Label not found")
+        response = client.delete("/api/labels/Label_1")
+        assert response.status_code == 404
+        assert response.json() == {"detail": "Label not found"}
+
+    @patch("app.api.actions.create_label")
+    def test_quota_error_maps_to_429(self, mock_create_label, client):
+        """QuotaExceededError should map to 429, not its GmailApiError base."""
+        from app.core.exceptions import QuotaExceededError
+
+        mock_create_label.side_effect = QuotaExceededError("Quota exceeded")
+        response = client.post("/api/labels", json={"name": "Work"})
+        assert response.status_code == 429
+
+    @patch("app.api.actions.unsubscribe_single")
+    def test_unexpected_error_uses_endpoint_detail(self, mock_unsubscribe, client):
+        """Unexpected errors should return a 500 with a generic message."""
+        mock_unsubscribe.side_effect = RuntimeError("boom")
+        response = client.post(
+            "/api/unsubscribe", json={"domain": "example.com", "link": ""}
+        )
+        assert response.status_code == 500
+        assert response.json() == {"detail": "Failed to unsubscribe"}
+
+    def test_every_route_has_failure_detail(self):
+        """Each actions route should have its own 500 detail, keyed by name."""
+        from app.api.actions import _FAILURE_DETAILS, router
+
+        assert set(_FAILURE_DETAILS) == {route.name for route in router.routes}
@@ -0,0 +1,63 @@
+"""
+Tests for Setup API Endpoints
+-----------------------------
+Tests for the credentials upload endpoint.
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+
+@pytest.fixture
+def credentials_path(tmp_path):
+    """Point settings.credentials_file at a temporary location."""
+    path = tmp_path / "data" / "client_secret.json"
+    with patch("app.api.setup.settings") as mock_settings:
+        mock_settings.credentials_file = str(path)
+        yield path
+
+
+class TestSetupEndpoint:
+    """Tests for POST /api/setup endpoint."""
+
+    def test_upload_valid_credentials(self, client, credentials_path):
+        """Valid client config should be saved to the credentials file."""
+        content = json.dumps({"installed": {"client_id": "abc"}}).encode()
+        response = client.post(
+            "/api/setup", files={"file": ("credentials.json", content)}
+        )
+        assert response.status_code == 200
+        assert credentials_path.read_bytes() == content
+        # No temporary files should be left behind
+        assert [p.name for p in credentials_path.parent.iterdir()] == [
+            credentials_path.name
+        ]
+
+    def test_upload_invalid_json(self, client, credentials_path):
+        """Non-JSON uploads should be rejected without writing anything."""
+        response = client.post(
+            "/api/setup", files={"file": ("credentials.json", b"not json")}
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid JSON file"
+        assert list(credentials_path.parent.iterdir()) == []
+
+    def test_upload_missing_client_config(self, client, credentials_path):
+        """JSON without an installed/web section should be rejected."""
+        response = client.post(
+            "/api/setup", files={"file": ("credentials.json", b'{"other": {}}')}
+        )
+        assert response.status_code == 400
+        assert not credentials_path.exists()
+
+    def test_upload_when_credentials_exist(self, client, credentials_path):
+        """Existing credentials should not be overwritten."""
+        credentials_path.parent.mkdir(parents=True)
+        credentials_path.write_text("{}")
+        response = client.post(
+            "/api/setup", files={"file": ("credentials.json", b'{"web": {}}')}
+        )
+        assert response.status_code == 409
+        assert credentials_path.read_text() == "{}"
@@ -18,6 +18,60 @@ class TestStatusEndpoints:
         assert response.status_code == 200
         assert "text/html" in response.headers["content-type"]
 
+    def test_root_returns_not_modified_for_matching_etag(self, client):
+        """Root should answer 304 when the client's ETag is current."""
+        etag = client.get("/").headers["etag"]
+        response = client.get("/", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_root_uses_cache_bust_from_startup(self):
+        """Cache-bust value should be computed during app startup."""
+        from fastapi.testclient import TestClient
+        from app.main import create_app
+
+        with (
+            patch("app.main.get_cache_bust_value_async", return_value="abc1234"),
+            patch("app.main.STARTUP_CACHE_BUST", None),
+        ):
+            with TestClient(create_app()) as client:
+                response = client.get("/")
+        assert response.status_code == 200
+        assert "v=abc1234" in response.text
+
+    def test_async_cache_bust_falls_back_to_threads(self):
+        """Without subprocess support, git should run from worker threads."""
+        import asyncio
+
+        from app import main
+
+        async def no_subprocesses(*args):
+            raise NotImplementedError
+
+        git_outputs = {main._GIT_HEAD_ARGS: "abc1234", main._GIT_STATUS_ARGS: ""}
+        with (
+            patch("app.main._cache_bust_without_git", return_value=None),
+            patch("app.main._cache_bust_memo_key", return_value=None),
+            patch("app.main._run_git_async", side_effect=no_subprocesses),
+            patch("app.main._run_git", side_effect=lambda *a: git_outputs[a]),
+        ):
+            value = asyncio.run(main.get_cache_bust_value_async())
+            assert value == main.get_cache_bust_value()
+        assert value.startswith("abc1234")
+
+    def test_versioned_static_assets_are_immutable(self, client):
+        """Static assets requested with ?v= should be cached long-term."""
+        response = client.get("/static/css/base.css?v=abc1234")
+        assert response.status_code == 200
+        assert "immutable" in response.headers["cache-control"]
+
+    def test_unversioned_static_assets_revalidate(self, client):
+        """Static assets without a version should be revalidated."""
+        response = client.get("/static/css/base.css")
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == "no-cache"
+
     def test_get_scan_status(self, client):
         """GET /api/status should return scan status."""
         response = client.get("/api/status")
@@ -84,6 +138,127 @@ class TestStatusEndpoints:
         # Results is a list of sender objects
         assert isinstance(data, list)
 
+    def test_get_archive_status_reports_version(self, client):
+        """GET /api/archive-status should report the current status version."""
+        from app.core import state
+
+        response = client.get("/api/archive-status")
+        assert response.status_code == 200
+        assert response.headers["x-status-version"] == str(
+            state.status_version("archive_status")
+        )
+        assert "done" in response.json()
+
+    def test_status_long_poll_returns_on_change(self, client):
+        """A long-poll should return as soon as the status changes."""
+        import threading
+
+        from app.core import state
+
+        version = int(client.get("/api/delete-bulk-status").headers["x-status-version"])
+        timer = threading.Timer(
+            0.05, state.delete_bulk_status.__setitem__, ("message", "Deleting...")
+        )
+        timer.start()
+        try:
+            response = client.get(f"/api/delete-bulk-status?since={version}&wait=5")
+        finally:
+            timer.cancel()
+        assert response.status_code == 200
+        assert int(response.headers["x-status-version"]) > version
+        assert response.json()["message"] == "Deleting..."
+
+    def test_status_update_is_one_change(self, client):
+        """Updating several status fields should bump the version once."""
+        from app.core import state
+
+        version = state.status_version("label_operation_status")
+        state.label_operation_status.update(progress=50, message="Halfway")
+        try:
+            assert state.status_version("label_operation_status") == version + 1
+            response = client.get("/api/label-operation-status")
+            assert response.json()["progress"] == 50
+        finally:
+            state.reset_label_operation()
+
+    def test_long_polls_wait_without_threads(self):
+        """Many open polls should wait on the event loop and all wake up."""
+        import asyncio
+        import threading
+
+        from app.core import state
+
+        version = state.status_version("mark_read_status")
+
+        async def poll_many():
+            timer = threading.Timer(
+                0.05, state.mark_read_status.__setitem__, ("message", "Marking...")
+            )
+            timer.start()
+            try:
+                return await asyncio.gather(
+                    *(
+                        state.wait_for_status_change("mark_read_status", version, 5)
+                        for _ in range(100)
+                    )
+                )
+            finally:
+                timer.cancel()
+
+        try:
+            versions = asyncio.run(poll_many())
+        finally:
+            state.reset_mark_read()
+        assert set(versions) == {version + 1}
+        assert not state._status_waiters
+
+    def test_status_long_poll_ignores_other_statuses(self, client):
+        """A long-poll should not wake for changes to other statuses."""
+        from app.core import state
+
+        version = state.status_version("important_status")
+        state.archive_status["message"] = "Archiving..."
+        try:
+            response = client.get(f"/api/important-status?since={version}&wait=0.05")
+        finally:
+            state.reset_archive()
+        assert response.headers["x-status-version"] == str(version)
+
+    def test_status_reset_wakes_poll_with_new_status(self):
+        """A reset should wake pollers only once the new status is in place."""
+        import asyncio
+        import threading
+
+        from app.core import state
+
+        state.scan_status["message"] = "Scanning..."
+        version = state.status_version("scan_status")
+
+        async def poll():
+            timer = threading.Timer(0.05, state.reset_scan)
+            timer.start()
+            try:
+                await state.wait_for_status_change("scan_status", version, 5)
+            finally:
+                timer.cancel()
+            return state.scan_status["message"]
+
+        assert asyncio.run(poll()) == "Ready"
+
+    def test_status_long_poll_times_out_unchanged(self, client):
+        """Without changes a long-poll should return after the wait."""
+        from app.core import state
+
+        version = state.status_version("archive_status")
+        response = client.get(f"/api/archive-status?since={version}&wait=0.05")
+        assert response.status_code == 200
+        assert response.headers["x-status-version"] == str(version)
+
+    def test_status_long_poll_rejects_long_waits(self, client):
+        """Waits beyond the server's limit should be rejected."""
+        response = client.get("/api/archive-status?since=0&wait=600")
+        assert response.status_code == 422
+
 
 class TestDocsEndpoints:
     """Tests for API documentation endpoints."""
@@ -14,6 +14,9 @@ from app.models.schemas import (
     DeleteBulkRequest,
     UnsubscribeRequest,
     DeleteEmailsRequest,
+    ApplyLabelRequest,
+    ArchiveRequest,
+    OAuthClientConfig,
 )
 
 
@@ -123,6 +126,24 @@ class TestFiltersModel:
         assert filters.category == "promotions"
 
 
+class TestFiltersToQueryDict:
+    """Tests for FiltersModel.to_query_dict."""
+
+    def test_matches_model_dump(self):
+        """Should match model_dump(exclude_none=True)."""
+        filters = FiltersModel(older_than="30d", category="Promotions", label="")
+        assert filters.to_query_dict() == filters.model_dump(exclude_none=True)
+        assert filters.to_query_dict() == {
+            "older_than": "30d",
+            "category": "promotions",
+            "label": "",
+        }
+
+    def test_empty_filters(self):
+        """No set filters should produce an empty dict."""
+        assert FiltersModel().to_query_dict() == {}
+
+
 class TestScanRequest:
     """Tests for ScanRequest model."""
 
@@ -242,3 +263,48 @@ class TestDeleteEmailsRequest:
         """Should accept sender email."""
         request = DeleteEmailsRequest(sender="newsletter@example.com")
         assert request.sender == "newsletter@example.com"
+
+    def test_blank_sender_rejected(self):
+        """Whitespace-only sender should be rejected."""
+        with pytest.raises(ValidationError):
+            DeleteEmailsRequest(sender="   ")
+
+
+class TestSenderSelectionRequests:
+    """Tests for requests that operate on selected senders."""
+
+    def test_label_request_strips_label_id(self):
+        """Label ID should be stripped of surrounding whitespace."""
+        request = ApplyLabelRequest(label_id=" Label_1 ", senders=["a@example.com"])
+        assert request.label_id == "Label_1"
+
+    def test_blank_label_id_rejected(self):
+        """Blank label ID should be rejected."""
+        with pytest.raises(ValidationError):
+            ApplyLabelRequest(label_id="  ", senders=["a@example.com"])
+
+    def test_missing_senders_rejected(self):
+        """Omitted senders should fail validation, not default to empty."""
+        with pytest.raises(ValidationError, match="At least one sender"):
+            ArchiveRequest()
+
+
+class TestOAuthClientConfig:
+    """Tests for OAuthClientConfig (credentials.json) validation."""
+
+    def test_installed_client_accepted(self):
+        """Desktop client config should validate from raw JSON bytes."""
+        config = OAuthClientConfig.model_validate_json(b'{"installed": {"a": 1}}')
+        assert config.installed == {"a": 1}
+        assert config.web is None
+
+    def test_missing_client_type_rejected(self):
+        """JSON without installed/web should be rejected."""
+        with pytest.raises(ValidationError):
+            OAuthClientConfig.model_validate_json(b'{"other": {}}')
+
+    def test_invalid_json_rejected(self):
+        """Malformed JSON should surface as a json_invalid error."""
+        with pytest.raises(ValidationError) as exc_info:
+            OAuthClientConfig.model_validate_json(b"not json")
+        assert exc_info.value.errors()[0]["type"] == "json_invalid"
@@ -5,6 +5,7 @@ Tests for credentials file handling, environment variables, and validation.
 """
 
 import os
+import threading
 from unittest.mock import Mock, patch, mock_open
 
 
@@ -22,46 +23,32 @@ class TestCredentialsFromEnvironmentVariable:
         {"GOOGLE_CREDENTIALS": '{"type": "installed", "client_id": "test"}'},
         clear=False,
     )
-    def test_credentials_from_env_var_creates_file(
+    def test_credentials_from_env_var_used_in_memory(
         self, mock_file, mock_exists, mock_settings
     ):
-        """Credentials from GOOGLE_CREDENTIALS env var should create credentials.json."""
+        """Credentials from GOOGLE_CREDENTIALS should be used without writing a file."""
         mock_settings.credentials_file = "credentials.json"
 
-        def exists_side_effect(path):
-            if "credentials.json" in str(path):
-                return False
-            return False
-
-        mock_exists.side_effect = exists_side_effect
+        mock_exists.return_value = False
 
-        result = auth._get_credentials_path()
+        result = auth._get_credentials_source()
 
-        assert result == "credentials.json"
-        # Verify file was written with env var content
-        mock_file.assert_called_once_with("credentials.json", "w")
-        mock_file.return_value.write.assert_called_once_with(
-            '{"type": "installed", "client_id": "test"}'
-        )
+        assert result == {"type": "installed", "client_id": "test"}
+        # Client secret should never be written to disk
+        mock_file.assert_not_called()
 
     @patch("app.services.auth.settings")
     @patch("os.path.exists")
-    @patch.dict(
-        os.environ, {"GOOGLE_CREDENTIALS": '{"type": "installed"}'}, clear=False
-    )
-    def test_credentials_env_var_write_error(self, mock_exists, mock_settings):
-        """Error writing credentials from env var should be handled."""
-        from unittest.mock import patch
-
+    @patch.dict(os.environ, {"GOOGLE_CREDENTIALS": '["not", "an", "object"]'})
+    def test_credentials_env_var_not_an_object(self, mock_exists, mock_settings):
+        """GOOGLE_CREDENTIALS that is not a JSON object should return None."""
         mock_settings.credentials_file = "credentials.json"
 
         mock_exists.return_value = False
 
-        # File write errors are now caught and return None (fixed behavior)
-        with patch("builtins.open", side_effect=IOError("Permission denied")):
-            result = auth._get_credentials_path()
-            # Should return None when write fails (error is logged)
-            assert result is None
+        result = auth._get_credentials_source()
+
+        assert result is None
 
     @patch("app.services.auth.settings")
     @patch("os.path.exists")
@@ -72,7 +59,7 @@ class TestCredentialsFromEnvironmentVariable:
 
         mock_exists.return_value = False
 
-        result = auth._get_credentials_path()
+        result = auth._get_credentials_source()
 
         # Empty string is falsy, so returns None (fixed behavior)
         assert result is None
@@ -86,11 +73,34 @@ class TestCredentialsFromEnvironmentVariable:
 
         mock_exists.return_value = False
 
-        result = auth._get_credentials_path()
+        result = auth._get_credentials_source()
 
-        # Invalid JSON is validated before writing, so returns None
+        # Invalid JSON is rejected, so returns None
         assert result is None
 
+    @patch("app.services.auth.settings")
+    @patch("os.path.exists")
+    @patch.dict(os.environ, {"GOOGLE_CREDENTIALS": "invalid json"}, clear=False)
+    def test_invalid_env_var_is_not_reported_as_configured(
+        self, mock_exists, mock_settings
+    ):
+        """Invalid JSON in GOOGLE_CREDENTIALS should not count as credentials."""
+        mock_settings.credentials_file = "credentials.json"
+
+        mock_exists.return_value = False
+
+        assert auth.has_client_credentials() is False
+
+    @patch("app.services.auth.settings")
+    @patch("os.path.exists")
+    @patch.dict(os.environ, {"GOOGLE_CREDENTIALS": '{"type": "env"}'}, clear=False)
+    def test_valid_env_var_is_reported_as_configured(self, mock_exists, mock_settings):
+        mock_settings.credentials_file = "credentials.json"
+
+        mock_exists.return_value = False
+
+        assert auth.has_client_credentials() is True
+
 
 class TestCredentialsFilePrecedence:
     """Tests for credentials file precedence over environment variable"""
@@ -116,9 +126,9 @@ class TestCredentialsFilePrecedence:
 
         mock_exists.side_effect = exists_side_effect
 
-        result = auth._get_credentials_path()
+        result = auth._get_credentials_source()
 
-        # Should return file path, not create from env var
+        # Should return file path, not the env var config
         assert result == "credentials.json"
 
 
@@ -128,7 +138,7 @@ class TestCredentialsValidation:
     @patch("app.services.auth.settings")
     @patch("os.path.exists")
     @patch("app.services.auth.InstalledAppFlow")
-    @patch("app.services.auth._auth_in_progress", {"active": False})
+    @patch("app.services.auth._auth_lock", threading.Lock())
     @patch("app.services.auth.is_web_auth_mode", return_value=False)
     def test_credentials_missing_client_id(
         self, mock_web_auth, mock_flow, mock_exists, mock_settings
@@ -163,7 +173,7 @@ class TestCredentialsValidation:
     @patch("app.services.auth.settings")
     @patch("os.path.exists")
     @patch("app.services.auth.InstalledAppFlow")
-    @patch("app.services.auth._auth_in_progress", {"active": False})
+    @patch("app.services.auth._auth_lock", threading.Lock())
     @patch("app.services.auth.is_web_auth_mode", return_value=False)
     def test_credentials_missing_client_secret(
         self, mock_web_auth, mock_flow, mock_exists, mock_settings
@@ -196,7 +206,7 @@ class TestCredentialsValidation:
     @patch("app.services.auth.settings")
     @patch("os.path.exists")
     @patch("app.services.auth.InstalledAppFlow")
-    @patch("app.services.auth._auth_in_progress", {"active": False})
+    @patch("app.services.auth._auth_lock", threading.Lock())
     @patch("app.services.auth.is_web_auth_mode", return_value=False)
     def test_credentials_invalid_redirect_uri(
         self, mock_web_auth, mock_flow, mock_exists, mock_settings
@@ -235,7 +245,7 @@ class TestCredentialsFilePermissions:
     @patch("app.services.auth.settings")
     @patch("os.path.exists")
     @patch("app.services.auth.InstalledAppFlow")
-    @patch("app.services.auth._auth_in_progress", {"active": False})
+    @patch("app.services.auth._auth_lock", threading.Lock())
     @patch("app.services.auth.is_web_auth_mode", return_value=False)
     def test_credentials_file_read_permission_denied(
         self, mock_web_auth, mock_flow, mock_exists, mock_settings
@@ -277,7 +287,7 @@ class TestCredentialsTypeMismatch:
         read_data='{"type": "installed", "client_id": "test"}',
     )
     @patch("app.services.auth.InstalledAppFlow")
-    @patch("app.services.auth._auth_in_progress", {"active": False})
+    @patch("app.services.auth._auth_lock", threading.Lock())
     @patch("app.services.auth.is_web_auth_mode", return_value=True)
     def test_web_credentials_in_docker_mode(
         self, mock_web_auth, mock_flow, mock_file, mock_exists, mock_settings
@@ -316,7 +326,7 @@ class TestCredentialsTypeMismatch:
         read_data='{"type": "installed", "client_id": "test"}',
     )
     @patch("app.services.auth.InstalledAppFlow")
-    @patch("app.services.auth._auth_in_progress", {"active": False})
+    @patch("app.services.auth._auth_lock", threading.Lock())
     @patch("app.services.auth.is_web_auth_mode", return_value=False)
     def test_desktop_credentials_in_local_mode(
         self, mock_web_auth, mock_flow, mock_file, mock_exists, mock_settings
@@ -346,3 +356,25 @@ class TestCredentialsTypeMismatch:
         # Should work with desktop credentials in local mode
         assert service is None
         assert "Sign-in started" in error
+
+
+class TestCredentialsFileValidationCache:
+    """Tests for skipping re-validation of an unchanged credentials file"""
+
+    @patch("app.services.auth._valid_credentials_file", {"key": None})
+    @patch("app.services.auth.settings")
+    def test_unchanged_credentials_file_validated_once(self, mock_settings, tmp_path):
+        """An unchanged, valid credentials file should only be parsed once."""
+        # conftest hides paths named credentials.json, so use another name
+        credentials_file = tmp_path / "client_secret.json"
+        credentials_file.write_text('{"installed": {"client_id": "test"}}')
+        mock_settings.credentials_file = str(credentials_file)
+
+        with patch("app.services.auth.from_json", wraps=auth.from_json) as loads:
+            assert auth._get_credentials_path() == str(credentials_file)
+            assert auth._get_credentials_path() == str(credentials_file)
+            assert loads.call_count == 1
+
+            # A modified file is validated again
+            credentials_file.write_text("not json")
+            assert auth._get_credentials_path() is None
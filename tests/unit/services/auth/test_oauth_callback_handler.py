@@ -0,0 +1,96 @@
+"""
+Tests for OAuth Callback Handler
+--------------------------------
+Tests for the local HTTP handler that receives the OAuth redirect.
+"""
+
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from app.core import state
+from app.services.auth_handlers import OAuthCallbackHandler, OAuthCallbackState
+
+
+@pytest.fixture
+def callback_server():
+    """Run the callback handler on a free local port."""
+    callback_state = OAuthCallbackState()
+    server = ThreadingHTTPServer(("localhost", 0), OAuthCallbackHandler)
+    server.callback_state = callback_state
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server, callback_state
+    finally:
+        server.shutdown()
+        server.server_close()
+        with state.oauth_state_lock:
+            state.oauth_state["state"] = None
+
+
+def _get(server, path):
+    """Send a GET request and return (status, body)."""
+    url = f"http://localhost:{server.server_address[1]}{path}"
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+class TestOAuthCallbackHandler:
+    """Tests for OAuthCallbackHandler.do_GET"""
+
+    def test_matching_state_records_code(self, callback_server):
+        """A callback with the stored state should deliver the code."""
+        server, callback_state = callback_server
+        with state.oauth_state_lock:
+            state.oauth_state["state"] = "expected-state"
+
+        status, body = _get(server, "/?state=expected-state&code=auth-code")
+
+        assert status == 200
+        assert b"Authentication successful" in body
+        assert callback_state.event.is_set()
+        assert callback_state.code == "auth-code"
+        assert state.oauth_state["state"] is None
+
+    def test_mismatched_state_is_rejected(self, callback_server):
+        """A callback with a different state should be treated as CSRF."""
+        server, callback_state = callback_server
+        with state.oauth_state_lock:
+            state.oauth_state["state"] = "expected-state"
+
+        status, _ = _get(server, "/?state=other-state&code=auth-code")
+
+        assert status == 403
+        assert callback_state.event.is_set()
+        assert callback_state.code is None
+        assert "mismatch" in callback_state.error
+
+    def test_non_callback_path_is_ignored(self, callback_server):
+        """Requests for other paths should not count as a callback."""
+        server, callback_state = callback_server
+        with state.oauth_state_lock:
+            state.oauth_state["state"] = "expected-state"
+
+        status, body = _get(server, "/favicon.ico")
+
+        assert status == 204
+        assert body == b""
+        assert not callback_state.event.is_set()
+        assert state.oauth_state["state"] == "expected-state"
+
+    def test_oversized_query_is_rejected(self, callback_server):
+        """Queries with too many fields should be rejected without a result."""
+        server, callback_state = callback_server
+        query = "&".join(f"f{i}=v" for i in range(100))
+
+        status, _ = _get(server, f"/?{query}")
+
+        assert status == 400
+        assert not callback_state.event.is_set()
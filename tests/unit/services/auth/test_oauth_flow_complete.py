@@ -4,6 +4,7 @@ Tests for Complete OAuth Flow Scenarios
 Tests for successful OAuth flows and edge cases not covered in existing tests.
 """
 
+import threading
 from unittest.mock import Mock, patch, mock_open
 
 
@@ -17,7 +18,7 @@ class TestSuccessfulOAuthFlow:
     @patch("app.services.auth._is_file_empty")
     @patch("app.services.auth.os.path.exists")
     @patch("app.services.auth.InstalledAppFlow")
-    @patch("app.services.auth._auth_in_progress", {"active": False})
+    @patch("app.services.auth._auth_lock", threading.Lock())
     @patch("app.services.auth.is_web_auth_mode", return_value=False)
     @patch(
         "builtins.open",
@@ -75,7 +76,7 @@ class TestSuccessfulOAuthFlow:
         read_data='{"type": "installed", "client_id": "test"}',
     )
     @patch("app.services.auth.InstalledAppFlow")
-    @patch("app.services.auth._auth_in_progress", {"active": False})
+    @patch("app.services.auth._auth_lock", threading.Lock())
     @patch("app.services.auth.is_web_auth_mode", return_value=True)
     def test_oauth_flow_web_auth_mode_binds_to_all_interfaces(
         self, mock_web_auth, mock_flow, mock_file, mock_exists, mock_settings
@@ -115,7 +116,7 @@ class TestSuccessfulOAuthFlow:
         read_data='{"type": "installed", "client_id": "test"}',
     )
     @patch("app.services.auth.InstalledAppFlow")
-    @patch("app.services.auth._auth_in_progress", {"active": False})
+    @patch("app.services.auth._auth_lock", threading.Lock())
     @patch("app.services.auth.is_web_auth_mode", return_value=False)
     def test_oauth_flow_desktop_mode_binds_to_localhost(
         self, mock_web_auth, mock_flow, mock_file, mock_exists, mock_settings
@@ -155,7 +156,7 @@ class TestSuccessfulOAuthFlow:
         read_data='{"type": "installed", "client_id": "test"}',
     )
     @patch("app.services.auth.InstalledAppFlow")
-    @patch("app.services.auth._auth_in_progress", {"active": False})
+    @patch("app.services.auth._auth_lock", threading.Lock())
     @patch("app.services.auth.is_web_auth_mode", return_value=False)
     def test_oauth_flow_with_custom_oauth_host(
         self, mock_web_auth, mock_flow, mock_file, mock_exists, mock_settings
@@ -200,7 +201,7 @@ class TestOAuthFlowErrors:
     )
     @patch("app.services.auth._is_file_empty", return_value=False)
     @patch("app.services.auth.InstalledAppFlow")
-    @patch("app.services.auth._auth_in_progress", {"active": False})
+    @patch("app.services.auth._auth_lock", threading.Lock())
     @patch("app.services.auth.is_web_auth_mode", return_value=False)
     def test_oauth_invalid_authorization_code(
         self,
@@ -249,7 +250,7 @@ class TestOAuthFlowErrors:
     )
     @patch("app.services.auth._is_file_empty", return_value=False)
     @patch("app.services.auth.InstalledAppFlow")
-    @patch("app.services.auth._auth_in_progress", {"active": False})
+    @patch("app.services.auth._auth_lock", threading.Lock())
     @patch("app.services.auth.is_web_auth_mode", return_value=False)
     def test_oauth_timeout_handling(
         self,
@@ -296,7 +297,7 @@ class TestOAuthFlowErrors:
     )
     @patch("app.services.auth._is_file_empty", return_value=False)
     @patch("app.services.auth.InstalledAppFlow")
-    @patch("app.services.auth._auth_in_progress", {"active": False})
+    @patch("app.services.auth._auth_lock", threading.Lock())
     @patch("app.services.auth.is_web_auth_mode", return_value=False)
     def test_oauth_resets_auth_in_progress_on_error(
         self,
@@ -328,7 +329,7 @@ class TestOAuthFlowErrors:
         mock_flow_instance.run_local_server.side_effect = Exception("OAuth error")
 
         # Set auth in progress
-        auth._auth_in_progress["active"] = True
+        auth._auth_lock.acquire()
 
         service, error = auth.get_gmail_service()
 
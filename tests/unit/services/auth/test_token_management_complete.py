@@ -4,8 +4,12 @@ Tests for Complete Token Management Scenarios
 Tests for token creation, storage, validation, and security.
 """
 
+import threading
+from concurrent.futures import Future
+from datetime import datetime, timedelta, timezone
 from unittest.mock import Mock, patch, mock_open
 
+from google.auth.exceptions import RefreshError
 from google.oauth2.credentials import Credentials
 
 from app.services import auth
@@ -18,8 +22,9 @@ class TestTokenCreationAndStorage:
     @patch("app.services.auth._is_file_empty")
     @patch("app.services.auth.os.path.exists")
     @patch("app.services.auth.InstalledAppFlow")
-    @patch("app.services.auth._auth_in_progress", {"active": False})
+    @patch("app.services.auth._auth_lock", threading.Lock())
     @patch("app.services.auth.is_web_auth_mode", return_value=False)
+    @patch("app.services.auth._write_token_file")
     @patch(
         "builtins.open",
         new_callable=mock_open,
@@ -28,6 +33,7 @@ class TestTokenCreationAndStorage:
     def test_token_file_created_after_oauth(
         self,
         mock_file,
+        mock_write_token,
         mock_web_auth,
         mock_flow,
         mock_exists,
@@ -65,6 +71,11 @@ class TestTokenCreationAndStorage:
         assert error is not None
         assert "Sign-in started" in error
 
+        # The sign-in thread releases the auth lock once it has finished
+        assert auth._auth_lock.acquire(timeout=5)
+        auth._auth_lock.release()
+        mock_write_token.assert_called_once_with(mock_creds.to_json.return_value)
+
     @patch("app.services.auth.settings")
     @patch("os.path.exists")
     @patch("app.services.auth.Credentials")
@@ -372,6 +383,124 @@ class TestTokenFileErrors:
             assert error is None
             assert mock_creds.refresh.called
 
+    @patch("app.services.auth.settings")
+    def test_token_write_replaces_file_atomically(self, mock_settings, tmp_path):
+        """Token writes should replace the file without leaving temp files."""
+        token_file = tmp_path / "token.json"
+        token_file.write_text('{"token": "old"}')
+        mock_settings.token_file = str(token_file)
+
+        auth._write_token_file('{"token": "new"}')
+
+        assert token_file.read_text() == '{"token": "new"}'
+        assert [p.name for p in tmp_path.iterdir()] == ["token.json"]
+
+
+class TestBackgroundRefresh:
+    """Tests for refreshing tokens shortly before they expire"""
+
+    @staticmethod
+    def _creds_expiring_in(delta):
+        creds = Mock(spec=Credentials)
+        creds.refresh_token = "refresh_token"
+        creds.expiry = datetime.now(timezone.utc).replace(tzinfo=None) + delta
+        return creds
+
+    @patch("app.services.auth._refresh_future", {"future": None})
+    @patch("app.services.auth._try_refresh_creds")
+    def test_stale_token_refreshed_in_background(self, mock_refresh):
+        """A token about to expire should be refreshed once, off-thread."""
+        creds = self._creds_expiring_in(timedelta(minutes=4))
+        done = threading.Event()
+        mock_refresh.side_effect = lambda c, **kwargs: done.wait(5)
+
+        auth._refresh_if_stale(creds)
+        # A second caller while the refresh runs does not start another
+        auth._refresh_if_stale(creds)
+        done.set()
+        auth._refresh_future["future"].result(timeout=5)
+
+        mock_refresh.assert_called_once_with(creds, keep_token_file=True)
+
+    @patch("app.services.auth._refresh_inflight", {})
+    @patch("app.services.auth.os.remove")
+    @patch("app.services.auth.Request")
+    def test_background_refresh_failure_keeps_token_file(
+        self, mock_request, mock_remove
+    ):
+        """A rejected early refresh should not sign out a still-valid session."""
+        creds = self._creds_expiring_in(timedelta(minutes=4))
+        creds.refresh = Mock(side_effect=RefreshError("invalid_grant"))
+
+        auth._refresh_in_background(creds)
+
+        mock_remove.assert_not_called()
+
+    @patch("app.services.auth._refresh_inflight", {})
+    @patch("app.services.auth.Request")
+    def test_background_refresh_logs_other_errors(self, mock_request):
+        """Errors other than RefreshError should be logged, not swallowed."""
+        creds = self._creds_expiring_in(timedelta(minutes=4))
+        creds.refresh = Mock(side_effect=OSError("connection reset"))
+
+        with patch("app.services.auth.logger") as mock_logger:
+            auth._refresh_in_background(creds)
+
+        mock_logger.exception.assert_called_once()
+
+    @patch("app.services.auth._refresh_inflight", {})
+    @patch("app.services.auth._write_token_file")
+    @patch("app.services.auth.Request")
+    def test_concurrent_refreshes_share_one_exchange(
+        self, mock_request, mock_write_token_file
+    ):
+        """Callers refreshing the same token at once should share one refresh."""
+        creds = self._creds_expiring_in(timedelta(0))
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_refresh(request):
+            started.set()
+            release.wait(5)
+
+        creds.refresh = Mock(side_effect=slow_refresh)
+        waiting = threading.Event()
+
+        class TrackedFuture(Future):
+            def result(self, timeout=None):
+                waiting.set()
+                return super().result(timeout)
+
+        results = []
+        with patch("app.services.auth.Future", TrackedFuture):
+            owner = threading.Thread(
+                target=lambda: results.append(auth._try_refresh_creds(creds))
+            )
+            owner.start()
+            assert started.wait(5)
+            waiter = threading.Thread(
+                target=lambda: results.append(auth._try_refresh_creds(creds))
+            )
+            waiter.start()
+            # Let the first refresh finish only once the second caller waits
+            assert waiting.wait(5)
+            release.set()
+            owner.join(5)
+            waiter.join(5)
+
+        assert results == [creds, creds]
+        creds.refresh.assert_called_once()
+        mock_write_token_file.assert_called_once()
+
+    @patch("app.services.auth._refresh_future", {"future": None})
+    @patch("app.services.auth._try_refresh_creds")
+    def test_fresh_token_not_refreshed(self, mock_refresh):
+        """Tokens far from expiry should be served without refreshing."""
+        auth._refresh_if_stale(self._creds_expiring_in(timedelta(minutes=30)))
+
+        assert auth._refresh_future["future"] is None
+        mock_refresh.assert_not_called()
+
 
 class TestTokenSecurity:
     """Tests for token security scenarios"""
@@ -417,3 +546,137 @@ class TestTokenSecurity:
         result = auth.needs_auth_setup()
 
         assert result is True
+
+
+class TestCredentialsCache:
+    """Tests for reusing parsed credentials between auth checks"""
+
+    @patch("app.services.auth._creds_cache", {"entry": None})
+    @patch("app.services.auth.settings")
+    @patch("app.services.auth.Credentials")
+    def test_unchanged_token_file_is_parsed_once(
+        self, mock_creds_class, mock_settings, tmp_path
+    ):
+        """Repeated checks should reuse credentials until the file changes."""
+        token_file = tmp_path / "token.json"
+        token_file.write_text('{"token": "a"}')
+        mock_settings.token_file = str(token_file)
+        mock_settings.scopes = ["scope1"]
+
+        mock_creds = Mock(spec=Credentials)
+        mock_creds.valid = True
+        mock_creds_class.from_authorized_user_file.return_value = mock_creds
+
+        with patch("app.services.auth.os.path.exists", return_value=True):
+            assert auth.needs_auth_setup() is False
+            assert auth.needs_auth_setup() is False
+            assert mock_creds_class.from_authorized_user_file.call_count == 1
+
+            # Rewriting the token file invalidates the cached credentials
+            token_file.write_text('{"token": "changed"}')
+            assert auth.needs_auth_setup() is False
+            assert mock_creds_class.from_authorized_user_file.call_count == 2
+
+    @patch("app.services.auth._web_auth_status_cache", {"entry": None})
+    @patch("app.services.auth.settings")
+    @patch("app.services.auth.needs_auth_setup", return_value=False)
+    def test_web_auth_status_reuses_recent_result(
+        self, mock_needs_auth_setup, mock_settings, tmp_path
+    ):
+        """Polling web auth status should not re-check an unchanged token."""
+        token_file = tmp_path / "token.json"
+        token_file.write_text('{"token": "a"}')
+        mock_settings.token_file = str(token_file)
+        mock_settings.credentials_file = str(tmp_path / "credentials.json")
+
+        assert auth.get_web_auth_status()["needs_setup"] is False
+        assert auth.get_web_auth_status()["needs_setup"] is False
+        assert mock_needs_auth_setup.call_count == 1
+
+        # Removing the token (e.g. signing out) is picked up immediately
+        token_file.unlink()
+        mock_needs_auth_setup.return_value = True
+        assert auth.get_web_auth_status()["needs_setup"] is True
+
+    @patch("app.services.auth._creds_cache", {"entry": None})
+    @patch("app.services.auth.settings")
+    @patch("app.services.auth.Credentials")
+    @patch("app.services.auth.build")
+    def test_service_reused_for_unchanged_credentials(
+        self, mock_build, mock_creds_class, mock_settings, tmp_path
+    ):
+        """The Gmail client should be built once per credentials object."""
+        token_file = tmp_path / "token.json"
+        token_file.write_text('{"token": "a"}')
+        mock_settings.token_file = str(token_file)
+        mock_settings.scopes = ["scope1"]
+
+        mock_creds = Mock(spec=Credentials)
+        mock_creds.valid = True
+        mock_creds_class.from_authorized_user_file.return_value = mock_creds
+
+        with patch("app.services.auth.os.path.exists", return_value=True):
+            first, _ = auth.get_gmail_service()
+            second, _ = auth.get_gmail_service()
+
+        assert first is second
+        assert mock_build.call_count == 1
+
+    @patch("app.services.auth._creds_cache", {"entry": None})
+    @patch("app.services.auth._profile_email_cache", {"entry": None})
+    @patch("app.services.auth.settings")
+    @patch("app.services.auth.Credentials")
+    @patch("app.services.auth.build")
+    def test_login_status_reuses_parsed_token(
+        self, mock_build, mock_creds_class, mock_settings, tmp_path
+    ):
+        """Status polls should not re-parse an unchanged token file."""
+        token_file = tmp_path / "token.json"
+        token_file.write_text('{"token": "a"}')
+        mock_settings.token_file = str(token_file)
+        mock_settings.scopes = ["scope1"]
+
+        mock_creds = Mock(spec=Credentials)
+        mock_creds.valid = True
+        mock_creds.refresh_token = "refresh"
+        mock_creds_class.from_authorized_user_file.return_value = mock_creds
+
+        with patch("app.services.auth.os.path.exists", return_value=True):
+            assert auth.check_login_status()["logged_in"] is True
+            assert auth.check_login_status()["logged_in"] is True
+
+        assert mock_creds_class.from_authorized_user_file.call_count == 1
+
+    @patch("app.services.auth._profile_email_cache", {"entry": None})
+    @patch("app.services.auth.settings")
+    @patch("app.services.auth.Credentials")
+    @patch("app.services.auth.build")
+    def test_login_status_reuses_profile_email(
+        self, mock_build, mock_creds_class, mock_settings
+    ):
+        """Status polls should fetch the profile once per signed-in account."""
+        mock_settings.token_file = "token.json"
+        mock_settings.scopes = ["scope1"]
+
+        mock_creds = Mock(spec=Credentials)
+        mock_creds.valid = True
+        mock_creds.refresh_token = "refresh-a"
+        mock_creds_class.from_authorized_user_file.return_value = mock_creds
+
+        get_profile = mock_build.return_value.users.return_value.getProfile
+        get_profile.return_value.execute.return_value = {
+            "emailAddress": "a@example.com"
+        }
+
+        with patch("app.services.auth.os.path.exists", return_value=True):
+            assert auth.check_login_status()["email"] == "a@example.com"
+            assert auth.check_login_status()["email"] == "a@example.com"
+            assert get_profile.call_count == 1
+
+            # A different account (new refresh token) is looked up again
+            mock_creds.refresh_token = "refresh-b"
+            get_profile.return_value.execute.return_value = {
+                "emailAddress": "b@example.com"
+            }
+            assert auth.check_login_status()["email"] == "b@example.com"
+            assert get_profile.call_count == 2
@@ -0,0 +1,228 @@
+"""
+Tests for Gmail Error Handling
+------------------------------
+Tests for the retry decorator and Retry-After parsing.
+"""
+
+import asyncio
+import inspect
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from googleapiclient.errors import HttpError
+from httplib2 import Response
+
+from app.core.exceptions import AuthError, GmailApiError, QuotaExceededError
+from app.services.gmail.error_handler import (
+    get_retry_after,
+    handle_gmail_errors,
+    with_retry,
+)
+
+
+def _http_error(status: int, **headers) -> HttpError:
+    return HttpError(resp=Response({"status": status, **headers}), content=b"{}")
+
+
+class TestWithRetry:
+    """Tests for the with_retry decorator."""
+
+    def test_backoff_is_jittered_and_capped(self):
+        """Delays should grow exponentially, stay under the cap and vary."""
+        calls = []
+
+        @with_retry(max_retries=4, initial_delay=10, max_delay=30, jitter=0.5)
+        def flaky():
+            calls.append(1)
+            raise _http_error(503)
+
+        with (
+            patch("app.services.gmail.error_handler.time.sleep") as mock_sleep,
+            patch(
+                "app.services.gmail.error_handler.random.uniform",
+                side_effect=[0.5, -0.5, 0.0, 0.25],
+            ),
+        ):
+            with pytest.raises(HttpError):
+                flaky()
+
+        assert len(calls) == 5
+        waits = [c.args[0] for c in mock_sleep.call_args_list]
+        # 10, 20, then capped at 30 for the remaining attempts
+        assert waits == [15.0, 10.0, 30.0, 37.5]
+
+    def test_honors_retry_after(self):
+        """A Retry-After header should replace the computed backoff."""
+        attempts = iter([_http_error(429, **{"retry-after": "7"})])
+
+        @with_retry(max_retries=2)
+        def rate_limited():
+            error = next(attempts, None)
+            if error:
+                raise error
+            return "ok"
+
+        with patch("app.services.gmail.error_handler.time.sleep") as mock_sleep:
+            assert rate_limited() == "ok"
+
+        mock_sleep.assert_called_once_with(7.0)
+
+    def test_gives_up_on_long_retry_after(self):
+        """A Retry-After beyond max_delay should fail instead of sleeping."""
+        calls = []
+
+        @with_retry(max_retries=3, max_delay=30)
+        def rate_limited():
+            calls.append(1)
+            raise _http_error(429, **{"retry-after": "3600"})
+
+        with patch("app.services.gmail.error_handler.time.sleep") as mock_sleep:
+            with pytest.raises(HttpError):
+                rate_limited()
+
+        assert len(calls) == 1
+        mock_sleep.assert_not_called()
+
+    def test_client_errors_are_not_retried(self):
+        """4xx errors other than 429 should fail immediately."""
+        calls = []
+
+        @with_retry(max_retries=3)
+        def bad_request():
+            calls.append(1)
+            raise _http_error(400)
+
+        with patch("app.services.gmail.error_handler.time.sleep") as mock_sleep:
+            with pytest.raises(HttpError):
+                bad_request()
+
+        assert len(calls) == 1
+        mock_sleep.assert_not_called()
+
+    def test_quota_errors_wait_for_retry_after(self):
+        """Quota errors from handle_gmail_errors should be retried."""
+        attempts = iter([_http_error(429, **{"retry-after": "3"})])
+
+        @with_retry(max_retries=2)
+        @handle_gmail_errors
+        def rate_limited():
+            error = next(attempts, None)
+            if error:
+                raise error
+            return "ok"
+
+        with patch("app.services.gmail.error_handler.time.sleep") as mock_sleep:
+            assert rate_limited() == "ok"
+
+        mock_sleep.assert_called_once_with(3.0)
+
+    def test_auth_errors_are_not_retried(self):
+        """Auth errors should fail immediately."""
+        calls = []
+
+        @with_retry(max_retries=3)
+        @handle_gmail_errors
+        def unauthorized():
+            calls.append(1)
+            raise _http_error(401)
+
+        with pytest.raises(AuthError):
+            unauthorized()
+        assert len(calls) == 1
+
+    def test_async_functions_sleep_without_blocking(self):
+        """Async functions should be retried with asyncio.sleep."""
+        attempts = iter([_http_error(503), _http_error(429, **{"retry-after": "2"})])
+
+        @with_retry(max_retries=3, initial_delay=1, jitter=0)
+        async def flaky():
+            error = next(attempts, None)
+            if error:
+                raise error
+            return "ok"
+
+        with (
+            patch("app.services.gmail.error_handler.time.sleep") as mock_sleep,
+            patch(
+                "app.services.gmail.error_handler.asyncio.sleep", new=AsyncMock()
+            ) as mock_async_sleep,
+        ):
+            assert asyncio.run(flaky()) == "ok"
+
+        assert [c.args[0] for c in mock_async_sleep.await_args_list] == [1.0, 2.0]
+        mock_sleep.assert_not_called()
+
+
+class TestHandleGmailErrors:
+    """Tests for the handle_gmail_errors decorator."""
+
+    def test_rate_limit_keeps_retry_after(self):
+        """429 errors should carry the server's Retry-After delay."""
+
+        @handle_gmail_errors
+        def rate_limited():
+            raise _http_error(429, **{"retry-after": "5"})
+
+        with pytest.raises(QuotaExceededError) as exc_info:
+            rate_limited()
+        assert exc_info.value.retry_after == 5.0
+
+    def test_rate_limit_without_retry_after(self):
+        @handle_gmail_errors
+        def rate_limited():
+            raise _http_error(429)
+
+        with pytest.raises(QuotaExceededError) as exc_info:
+            rate_limited()
+        assert exc_info.value.retry_after is None
+
+    def test_forbidden_quota_error(self):
+        """403 errors mentioning quota should become quota errors."""
+
+        @handle_gmail_errors
+        def over_quota():
+            raise HttpError(
+                resp=Response({"status": 403}),
+                content=b'{"error": {"message": "Daily Limit Exceeded", '
+                b'"errors": [{"reason": "QuotaExceeded"}]}}',
+            )
+
+        with pytest.raises(QuotaExceededError):
+            over_quota()
+
+    def test_forbidden_without_quota(self):
+        @handle_gmail_errors
+        def forbidden():
+            raise _http_error(403)
+
+        with pytest.raises(GmailApiError) as exc_info:
+            forbidden()
+        assert exc_info.value.status_code == 403
+
+    def test_async_functions_translate_errors(self):
+        @handle_gmail_errors
+        async def unauthorized():
+            raise _http_error(401)
+
+        assert inspect.iscoroutinefunction(unauthorized)
+        with pytest.raises(AuthError):
+            asyncio.run(unauthorized())
+
+
+class TestGetRetryAfter:
+    """Tests for get_retry_after."""
+
+    def test_seconds(self):
+        assert get_retry_after(_http_error(429, **{"retry-after": "12"})) == 12.0
+
+    def test_missing_header(self):
+        assert get_retry_after(_http_error(429)) is None
+
+    def test_http_date(self):
+        """HTTP-date values should be converted to a delay from now."""
+        error = _http_error(503, **{"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"})
+        # A date in the past means retry immediately
+        assert get_retry_after(error) == 0.0
+
+    def test_invalid_value(self):
+        assert get_retry_after(_http_error(429, **{"retry-after": "soon"})) is None
@@ -4,8 +4,14 @@ Tests for Gmail Service Functions
 Tests for query building and email parsing helpers.
 """
 
+from unittest.mock import MagicMock
+
 from app.services.gmail import (
     build_gmail_query,
+    build_sender_queries,
+    index_headers,
+    iter_message_ids,
+    list_message_ids,
     _get_unsubscribe_from_headers,
     _get_sender_info,
     _get_subject,
@@ -62,6 +68,31 @@ class TestBuildGmailQuery:
         assert build_gmail_query(filters) == "larger:10M"
 
 
+class TestBuildSenderQueries:
+    """Tests for build_sender_queries function."""
+
+    def test_single_sender_uses_plain_query(self):
+        """A lone sender should not be wrapped in an OR group."""
+        assert build_sender_queries(["a@example.com"]) == [
+            (["a@example.com"], "from:a@example.com")
+        ]
+
+    def test_senders_grouped_with_or(self):
+        """Senders should be split into OR'ed groups of the given size."""
+        senders = ["a@example.com", "b@example.com", "c.com"]
+        assert build_sender_queries(senders, group_size=2) == [
+            (
+                ["a@example.com", "b@example.com"],
+                "from:(a@example.com OR b@example.com)",
+            ),
+            (["c.com"], "from:c.com"),
+        ]
+
+    def test_no_senders(self):
+        """No senders should produce no queries."""
+        assert build_sender_queries([]) == []
+
+
 class TestGetUnsubscribeFromHeaders:
     """Tests for _get_unsubscribe_from_headers function."""
 
@@ -124,6 +155,77 @@ class TestGetUnsubscribeFromHeaders:
         link, _method = _get_unsubscribe_from_headers(headers)
         assert link == "https://example.com/unsub"
 
+    def test_indexed_headers(self):
+        """Indexed headers should give the same result as the raw list."""
+        headers = [
+            {"name": "List-Unsubscribe-Post", "value": "List-Unsubscribe=One-Click"},
+            {"name": "List-Unsubscribe", "value": "<https://example.com/unsub>"},
+        ]
+        assert _get_unsubscribe_from_headers(index_headers(headers)) == (
+            "https://example.com/unsub",
+            "one-click",
+        )
+        assert _get_unsubscribe_from_headers(headers) == (
+            "https://example.com/unsub",
+            "one-click",
+        )
+        assert _get_unsubscribe_from_headers({"subject": "Hi"}) == (None, None)
+
+    def test_later_header_used_when_first_has_no_link(self):
+        """A repeated List-Unsubscribe should be searched past an unusable one."""
+        headers = [
+            {"name": "List-Unsubscribe", "value": "no link here"},
+            {"name": "List-Unsubscribe", "value": "<mailto:unsub@example.com>"},
+        ]
+        expected = ("mailto:unsub@example.com", "manual")
+        assert _get_unsubscribe_from_headers(headers) == expected
+        assert _get_unsubscribe_from_headers(index_headers(headers)) == expected
+
+
+class TestIndexHeaders:
+    """Tests for index_headers function."""
+
+    def test_names_lowercased(self):
+        """Header names should be looked up case-insensitively."""
+        headers = [
+            {"name": "From", "value": "a@example.com"},
+            {"name": "DATE", "value": "Mon, 1 Jan 2024"},
+        ]
+        assert index_headers(headers) == {
+            "from": "a@example.com",
+            "date": "Mon, 1 Jan 2024",
+        }
+
+    def test_first_occurrence_wins(self):
+        """Repeated headers should keep the first value, like the list scans."""
+        headers = [
+            {"name": "Subject", "value": "First"},
+            {"name": "subject", "value": "Second"},
+        ]
+        assert index_headers(headers)["subject"] == "First"
+
+    def test_keeps_every_list_unsubscribe_value(self):
+        headers = [
+            {"name": "List-Unsubscribe", "value": "<mailto:a@example.com>"},
+            {"name": "list-unsubscribe", "value": "<https://example.com/u>"},
+        ]
+        assert index_headers(headers)["list-unsubscribe"] == [
+            "<mailto:a@example.com>",
+            "<https://example.com/u>",
+        ]
+
+    def test_helpers_accept_indexed_headers(self):
+        """Sender and subject helpers should accept an indexed dict."""
+        headers = index_headers(
+            [
+                {"name": "From", "value": "John Doe <john@example.com>"},
+                {"name": "Subject", "value": "Hello"},
+            ]
+        )
+        assert _get_sender_info(headers) == ("John Doe", "john@example.com")
+        assert _get_subject(headers) == "Hello"
+        assert _get_subject({}) == "(No Subject)"
+
 
 class TestGetSenderInfo:
     """Tests for _get_sender_info function."""
@@ -218,3 +320,98 @@ class TestGetSubject:
             {"name": "Subject", "value": "🎉 Special Offer! 50% Off 🎁"},
         ]
         assert _get_subject(headers) == "🎉 Special Offer! 50% Off 🎁"
+
+
+class TestUpdateDates:
+    """Tests for the unsubscribe scan's date range tracking."""
+
+    @staticmethod
+    def _entry():
+        return {
+            "first_date": None,
+            "last_date": None,
+            "first_ts": float("inf"),
+            "last_ts": float("-inf"),
+        }
+
+    def test_tracks_earliest_and_latest(self):
+        """Dates should be ordered by time, not by their string form."""
+        from app.services.gmail.scan import _update_dates
+
+        data = self._entry()
+        for date in (
+            "Tue, 02 Jan 2024 10:00:00 +0000",
+            "Sat, 30 Dec 2023 09:00:00 +0000",
+            "Wed, 10 Jan 2024 08:00:00 +0000",
+        ):
+            _update_dates(data, date)
+
+        assert data["first_date"] == "Sat, 30 Dec 2023 09:00:00 +0000"
+        assert data["last_date"] == "Wed, 10 Jan 2024 08:00:00 +0000"
+
+    def test_compares_across_timezones(self):
+        """Offsets should be taken into account when comparing dates."""
+        from app.services.gmail.scan import _update_dates
+
+        data = self._entry()
+        _update_dates(data, "Mon, 01 Jan 2024 12:00:00 +0000")
+        _update_dates(data, "Mon, 01 Jan 2024 13:00:00 +0200")
+
+        assert data["first_date"] == "Mon, 01 Jan 2024 13:00:00 +0200"
+        assert data["last_date"] == "Mon, 01 Jan 2024 12:00:00 +0000"
+
+    def test_ignores_unparseable_dates(self):
+        """Dates that cannot be parsed should leave the range untouched."""
+        from app.services.gmail.scan import _update_dates
+
+        data = self._entry()
+        _update_dates(data, "not a date")
+        assert data["first_date"] is None
+
+        _update_dates(data, "Mon, 01 Jan 2024 12:00:00 +0000")
+        _update_dates(data, "garbage")
+        assert data["first_date"] == data["last_date"]
+        assert data["last_date"] == "Mon, 01 Jan 2024 12:00:00 +0000"
+
+
+class TestListMessageIds:
+    """Tests for list_message_ids."""
+
+    def test_follows_pages_requesting_only_ids(self):
+        """Every page should be fetched with a fields mask for IDs."""
+        service = MagicMock()
+        messages_api = service.users().messages()
+        messages_api.list.return_value.execute.side_effect = [
+            {"messages": [{"id": "a"}], "nextPageToken": "t1"},
+            {"messages": [{"id": "b"}]},
+        ]
+
+        assert list_message_ids(service, "from:x@example.com") == ["a", "b"]
+
+        calls = messages_api.list.call_args_list
+        assert [c.kwargs["pageToken"] for c in calls] == [None, "t1"]
+        assert {c.kwargs["fields"] for c in calls} == {"messages/id,nextPageToken"}
+
+    def test_resumes_from_page_token(self):
+        """A page token should skip the pages already fetched."""
+        service = MagicMock()
+        messages_api = service.users().messages()
+        messages_api.list.return_value.execute.return_value = {"messages": []}
+
+        assert list_message_ids(service, "q", "t5") == []
+        assert messages_api.list.call_args.kwargs["pageToken"] == "t5"
+
+    def test_iter_yields_pages_lazily(self):
+        """The next page should only be requested once the caller needs it."""
+        service = MagicMock()
+        messages_api = service.users().messages()
+        messages_api.list.return_value.execute.side_effect = [
+            {"messages": [{"id": "a"}, {"id": "b"}], "nextPageToken": "t1"},
+            {"messages": [{"id": "c"}]},
+        ]
+
+        pages = iter_message_ids(service, "q")
+        assert next(pages) == ["a", "b"]
+        assert messages_api.list.call_count == 1
+        assert list(pages) == [["c"]]
+        assert messages_api.list.call_count == 2
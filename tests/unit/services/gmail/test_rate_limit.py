@@ -0,0 +1,103 @@
+"""
+Tests for Gmail Rate Limiting
+-----------------------------
+Tests for the client-side quota token bucket.
+"""
+
+from unittest.mock import patch
+
+from app.services.gmail.rate_limit import RateLimiter
+
+
+class FakeClock:
+    """Monotonic clock that only advances when the limiter sleeps."""
+
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _limiter(clock, **kwargs):
+    with patch("app.services.gmail.rate_limit.time.monotonic", clock.monotonic):
+        return RateLimiter(**kwargs)
+
+
+class TestRateLimiter:
+    """Tests for RateLimiter.acquire."""
+
+    def test_burst_does_not_wait(self):
+        """Calls within the bucket's capacity should not sleep."""
+        clock = FakeClock()
+        limiter = _limiter(clock, quota_per_sec=200)
+        with (
+            patch("app.services.gmail.rate_limit.time.monotonic", clock.monotonic),
+            patch("app.services.gmail.rate_limit.time.sleep", clock.sleep),
+        ):
+            for _ in range(4):
+                limiter.acquire(50)
+        assert clock.sleeps == []
+
+    def test_waits_for_refill_when_empty(self):
+        """An empty bucket should wait just long enough to refill the cost."""
+        clock = FakeClock()
+        limiter = _limiter(clock, quota_per_sec=200)
+        with (
+            patch("app.services.gmail.rate_limit.time.monotonic", clock.monotonic),
+            patch("app.services.gmail.rate_limit.time.sleep", clock.sleep),
+        ):
+            limiter.acquire(200)
+            limiter.acquire(50)
+        assert clock.sleeps == [0.25]
+
+    def test_cost_above_capacity_is_capped(self):
+        """A call costing more than the capacity should wait for a full bucket."""
+        clock = FakeClock()
+        limiter = _limiter(clock, quota_per_sec=100)
+        with (
+            patch("app.services.gmail.rate_limit.time.monotonic", clock.monotonic),
+            patch("app.services.gmail.rate_limit.time.sleep", clock.sleep),
+        ):
+            limiter.acquire(100)
+            limiter.acquire(500)
+        assert clock.sleeps == [1.0]
+
+    def test_tracks_usage_over_the_last_minute(self):
+        """Usage should only count units spent within the last 60 seconds."""
+        clock = FakeClock()
+        limiter = _limiter(clock, quota_per_sec=200)
+        with (
+            patch("app.services.gmail.rate_limit.time.monotonic", clock.monotonic),
+            patch("app.services.gmail.rate_limit.time.sleep", clock.sleep),
+        ):
+            limiter.acquire(50)
+            clock.now += 30
+            limiter.acquire(5)
+            assert limiter.usage() == 55
+            clock.now += 30
+            assert limiter.usage() == 5
+
+    def test_warns_once_when_usage_is_high(self):
+        """Passing the usage warning should be logged once per spell."""
+        clock = FakeClock()
+        limiter = _limiter(clock, quota_per_sec=100, usage_warning=250)
+        with (
+            patch("app.services.gmail.rate_limit.time.monotonic", clock.monotonic),
+            patch("app.services.gmail.rate_limit.time.sleep", clock.sleep),
+            patch("app.services.gmail.rate_limit.logger") as mock_logger,
+        ):
+            for _ in range(5):
+                limiter.acquire(100)
+            assert mock_logger.warning.call_count == 1
+
+            # Usage drops back under the threshold, then climbs again
+            clock.now += 60
+            for _ in range(3):
+                limiter.acquire(100)
+        assert mock_logger.warning.call_count == 2